@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Background power mode benchmark for the Karere application.
+
+Runs the real application against a local fixture that animates through
+requestAnimationFrame and CSS, polls a keep-alive endpoint and shows a
+notification every few seconds, like an idle WhatsApp Web session. Each
+run measures the same interval with the window visible and then hidden
+(through on_window_delete_event, as when the user closes it):
+
+    cpu_seconds       CPU time of the process tree during the interval
+    wakeups_per_second voluntary context switches of the process tree per second
+    keepalive_pings   keep-alive requests the fixture server received
+    notifications     notifications that reached app.send_notification
+    resume_ms         present() until the page ran its next animation frame
+
+Run with --no-power-mode to measure the same with background power mode
+disabled. The JSON output includes the git commit so results can be
+compared across commits.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+# Add src to path for benchmarking
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark_common import (
+    FixtureServer, FixtureRequestHandler, get_process_tree_activity,
+    BENCH_NOTIFICATION_PREFIX
+)
+from benchmark_suite import get_git_commit
+
+
+DEFAULT_SECONDS = 20
+SETTLE_SECONDS = 3
+KEEPALIVE_INTERVAL_MS = 2000
+NOTIFICATION_INTERVAL_MS = 5000
+
+FIXTURE_ANIMATING_TITLE = "fixture-animating"
+FIXTURE_RESUMED_TITLE = "fixture-resumed"
+
+ANIMATED_FIXTURE_PAGE = f"""<!DOCTYPE html>
+<html>
+  <head>
+    <meta charset="utf-8">
+    <title>WhatsApp Web fixture</title>
+    <style>
+      @keyframes spin {{ from {{ transform: rotate(0deg); }} to {{ transform: rotate(360deg); }} }}
+      .spinner {{ width: 40px; height: 40px; background: #25d366; animation: spin 1s linear infinite; }}
+    </style>
+  </head>
+  <body>
+    <div class="spinner"></div>
+    <canvas id="canvas" width="400" height="200"></canvas>
+    <script>
+      const context = document.getElementById('canvas').getContext('2d');
+      function draw(now) {{
+        context.clearRect(0, 0, 400, 200);
+        context.fillRect(200 + Math.sin(now / 200) * 150, 90, 20, 20);
+        requestAnimationFrame(draw);
+      }}
+
+      window.addEventListener('load', async () => {{
+        requestAnimationFrame(draw);
+        setInterval(() => fetch('/ping', {{ cache: 'no-store' }}).catch(() => {{}}), {KEEPALIVE_INTERVAL_MS});
+        let sequence = 0;
+        if (await Notification.requestPermission() === 'granted') {{
+          setInterval(() => {{
+            new Notification('Benchmark', {{ body: '{BENCH_NOTIFICATION_PREFIX}' + sequence++ + ':' + Date.now() }});
+          }}, {NOTIFICATION_INTERVAL_MS});
+        }}
+        document.title = '{FIXTURE_ANIMATING_TITLE}';
+      }});
+    </script>
+  </body>
+</html>
+"""
+
+
+class AnimatedFixtureHandler(FixtureRequestHandler):
+    """Serve the animated fixture and record keep-alive requests."""
+
+    pings = []
+
+    def do_GET(self):
+        if self.path in ("/", "/index.html"):
+            self._send(200, "text/html", ANIMATED_FIXTURE_PAGE)
+        elif self.path == "/ping":
+            self.pings.append(time.time())
+            self._send(200, "text/plain", "pong")
+        else:
+            super().do_GET()
+
+
+def run_child(url, seconds, power_mode):
+    """Run Karere against the fixture and print the measurements."""
+    os.environ["KARERE_WEB_URL"] = url
+
+    import gi
+    gi.require_version("Gtk", "4.0")
+    gi.require_version("WebKit", "6.0")
+    from gi.repository import Gio, GLib
+    from karere.application import KarereApplication
+    from karere.settings_service import get_settings
+
+    get_settings().set_boolean("background-power-mode", power_mode)
+
+    result = {"phases": {}}
+    state = {"phase": None, "started_at": 0.0, "activity": None, "notifications": 0}
+    app = KarereApplication()
+    # Never hand the run over to a Karere instance that is already running
+    app.set_flags(app.get_flags() | Gio.ApplicationFlags.NON_UNIQUE)
+
+    original_send_notification = app.send_notification
+
+    def send_notification(title, message, *args, **kwargs):
+        if message.startswith(BENCH_NOTIFICATION_PREFIX) and state["phase"]:
+            state["notifications"] += 1
+        return original_send_notification(title, message, *args, **kwargs)
+
+    app.send_notification = send_notification
+
+    def start_phase(name):
+        state.update(phase=name, started_at=time.time(), notifications=0,
+                     activity=get_process_tree_activity(os.getpid()))
+        GLib.timeout_add_seconds(seconds, end_phase)
+        return False
+
+    def end_phase():
+        cpu_seconds, wakeups = get_process_tree_activity(os.getpid())
+        ended_at = time.time()
+        duration = ended_at - state["started_at"]
+        result["phases"][state["phase"]] = {
+            "started_at": state["started_at"],
+            "ended_at": ended_at,
+            "cpu_seconds": cpu_seconds - state["activity"][0],
+            "wakeups_per_second": (wakeups - state["activity"][1]) / duration,
+            "notifications": state["notifications"],
+        }
+        if state["phase"] == "visible":
+            state["phase"] = None
+            app.on_window_delete_event()
+            GLib.timeout_add_seconds(SETTLE_SECONDS, start_phase, "hidden")
+        else:
+            state["phase"] = None
+            resume()
+        return False
+
+    def resume():
+        window = app.main_window
+        window.webview.evaluate_javascript(
+            f"requestAnimationFrame(() => document.title = '{FIXTURE_RESUMED_TITLE}');",
+            -1, None, None, None, None, None
+        )
+        state["resume_started_at"] = time.monotonic()
+        window.present()
+
+    def on_title_changed(webview, param):
+        title = webview.get_title()
+        if title == FIXTURE_ANIMATING_TITLE and "visible" not in result["phases"] and state["phase"] is None:
+            GLib.timeout_add_seconds(SETTLE_SECONDS, start_phase, "visible")
+        elif title == FIXTURE_RESUMED_TITLE and "resume_ms" not in result:
+            result["resume_ms"] = (time.monotonic() - state["resume_started_at"]) * 1000
+            app.quit_application()
+
+    def on_window_added(application, window):
+        if window is application.main_window:
+            window.webview.connect("notify::title", on_title_changed)
+
+    def on_timeout():
+        result["error"] = "timed out"
+        app.quit_application()
+        return False
+
+    app.connect("window-added", on_window_added)
+    GLib.timeout_add_seconds(2 * seconds + 60, on_timeout)
+    app.run([])
+
+    print(json.dumps(result))
+    return 0 if "error" not in result else 1
+
+
+def run_once(url, seconds, power_mode):
+    """Run the application once in a fresh process and return its measurements."""
+    env = dict(os.environ, GSETTINGS_BACKEND="memory")
+    completed = subprocess.run(
+        [sys.executable, __file__, "--child", url, str(seconds), "1" if power_mode else "0"],
+        capture_output=True, text=True, env=env,
+        timeout=2 * seconds + 90
+    )
+
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith("{"):
+            result = json.loads(line)
+            for phase in result["phases"].values():
+                started_at = phase.pop("started_at")
+                ended_at = phase.pop("ended_at")
+                phase["keepalive_pings"] = sum(
+                    1 for ping in AnimatedFixtureHandler.pings if started_at <= ping < ended_at
+                )
+            return result
+    return {"error": completed.stderr.strip()[-500:]}
+
+
+def summarize_runs(results):
+    """Median of each measurement per phase over successful runs."""
+    summary = {}
+    for phase in ("visible", "hidden"):
+        measurements = [r["phases"][phase] for r in results if "error" not in r and phase in r["phases"]]
+        if measurements:
+            summary[phase] = {
+                key: statistics.median(m[key] for m in measurements)
+                for key in ("cpu_seconds", "wakeups_per_second", "keepalive_pings", "notifications")
+            }
+
+    resume = [r["resume_ms"] for r in results if "resume_ms" in r]
+    if resume:
+        summary["resume_ms"] = statistics.median(resume)
+    if "visible" in summary and "hidden" in summary and summary["visible"]["wakeups_per_second"]:
+        summary["hidden_wakeup_ratio"] = (summary["hidden"]["wakeups_per_second"]
+                                          / summary["visible"]["wakeups_per_second"])
+    return summary
+
+
+def main():
+    """Run the background power mode benchmark."""
+    parser = argparse.ArgumentParser(description="Measure Karere CPU wakeups with the window visible and hidden")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--seconds", type=int, default=DEFAULT_SECONDS,
+                        help="Length of each measured interval")
+    parser.add_argument("--no-power-mode", action="store_true",
+                        help="Disable background power mode for comparison")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--child", nargs=3, metavar=("URL", "SECONDS", "POWER_MODE"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        url, seconds, power_mode = args.child
+        return run_child(url, int(seconds), power_mode == "1")
+
+    power_mode = not args.no_power_mode
+    results = []
+    with FixtureServer(AnimatedFixtureHandler) as server:
+        for run in range(args.runs):
+            measurement = run_once(server.url, args.seconds, power_mode)
+            measurement["run"] = run
+            results.append(measurement)
+            print(f"run {run}: {measurement}", file=sys.stderr)
+
+    output = json.dumps({
+        "benchmark": "background_mode",
+        "commit": get_git_commit(),
+        "power_mode": power_mode,
+        "seconds": args.seconds,
+        "summary": summarize_runs(results),
+        "results": results,
+    }, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
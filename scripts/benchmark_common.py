@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for Karere benchmarks.
+
+Provides a local HTTP fixture server standing in for WhatsApp Web and
+process measurement helpers (RSS, CPU time and wakeups), so benchmarks
+run offline and reproducibly.
+"""
+
+import os
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+FIXTURE_SCRIPT_COUNT = 40
+
+# Records written to IndexedDB before the fixture reports itself interactive
+FIXTURE_INDEXEDDB_RECORDS = 500
+
+# Title the fixture sets once it is interactive
+FIXTURE_INTERACTIVE_TITLE = "fixture-interactive"
+
+# Prefix of benchmark notification bodies: "bench:<sequence>:<Date.now()>"
+BENCH_NOTIFICATION_PREFIX = "bench:"
+
+
+def build_fixture_page(script_count=FIXTURE_SCRIPT_COUNT, notification_burst=0):
+    """
+    Build the fixture index page referencing many script bundles.
+
+    With a notification burst the page also imitates the rest of WhatsApp
+    Web's start-up: it registers a service worker, fills an IndexedDB store,
+    sets its title to FIXTURE_INTERACTIVE_TITLE and then shows
+    ``notification_burst`` notifications whose bodies carry Date.now().
+    """
+    scripts = "\n".join(
+        f'    <script src="/static/bundle_{i}.js"></script>' for i in range(script_count)
+    )
+    if notification_burst:
+        scripts += f'\n    <script src="/static/app.js?burst={notification_burst}"></script>'
+    return f"""<!DOCTYPE html>
+<html>
+  <head>
+    <meta charset="utf-8">
+    <title>WhatsApp Web fixture</title>
+{scripts}
+  </head>
+  <body>
+    <div id="app"></div>
+    <script>
+      window.addEventListener('load', () => {{
+        document.title = 'fixture-ready';
+      }});
+    </script>
+  </body>
+</html>
+"""
+
+
+def build_fixture_script(index):
+    """Build a script bundle that allocates and renders a little DOM."""
+    return f"""
+(function() {{
+  const items = [];
+  for (let i = 0; i < 2000; i++) {{
+    items.push({{ id: i, text: 'message {index}-' + i }});
+  }}
+  window.__fixtureBundles = (window.__fixtureBundles || 0) + 1;
+  document.addEventListener('DOMContentLoaded', () => {{
+    const list = document.createElement('ul');
+    for (const item of items.slice(0, 50)) {{
+      const li = document.createElement('li');
+      li.textContent = item.text;
+      list.appendChild(li);
+    }}
+    document.getElementById('app').appendChild(list);
+  }});
+}})();
+"""
+
+
+def build_fixture_app_script(notification_burst):
+    """Build the script imitating WhatsApp Web's storage, worker and notifications."""
+    return f"""
+(function() {{
+  function openStore() {{
+    return new Promise((resolve, reject) => {{
+      const request = indexedDB.open('fixture', 1);
+      request.onupgradeneeded = () => request.result.createObjectStore('messages', {{ keyPath: 'id' }});
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => reject(request.error);
+    }});
+  }}
+
+  function fillStore(db) {{
+    return new Promise((resolve, reject) => {{
+      const tx = db.transaction('messages', 'readwrite');
+      const store = tx.objectStore('messages');
+      for (let i = 0; i < {FIXTURE_INDEXEDDB_RECORDS}; i++) {{
+        store.put({{ id: i, chat: i % 20, text: 'stored message ' + i, at: Date.now() }});
+      }}
+      tx.oncomplete = () => resolve();
+      tx.onerror = () => reject(tx.error);
+    }});
+  }}
+
+  function registerWorker() {{
+    if (!('serviceWorker' in navigator)) {{
+      return Promise.resolve();
+    }}
+    return navigator.serviceWorker.register('/sw.js').catch(() => {{}});
+  }}
+
+  function burst() {{
+    let sequence = 0;
+    const timer = setInterval(() => {{
+      new Notification('Benchmark', {{
+        body: '{BENCH_NOTIFICATION_PREFIX}' + sequence + ':' + Date.now(),
+        tag: 'bench-' + sequence
+      }});
+      if (++sequence >= {notification_burst}) {{
+        clearInterval(timer);
+      }}
+    }}, 50);
+  }}
+
+  window.addEventListener('load', async () => {{
+    await Promise.all([registerWorker(), openStore().then(fillStore)]);
+    document.title = '{FIXTURE_INTERACTIVE_TITLE}';
+    const permission = await Notification.requestPermission();
+    if (permission === 'granted') {{
+      setTimeout(burst, 1000);
+    }}
+  }});
+}})();
+"""
+
+
+FIXTURE_SERVICE_WORKER = """
+self.addEventListener('install', event => {
+  event.waitUntil(caches.open('fixture-v1').then(cache => cache.addAll(['/'])));
+});
+self.addEventListener('fetch', event => {
+  event.respondWith(fetch(event.request).catch(() => caches.match(event.request)));
+});
+"""
+
+
+class FixtureRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serve the fixture page and its script bundles.
+
+    Subclasses set ``notification_burst`` to serve the full start-up
+    profile (service worker, IndexedDB and notifications).
+    """
+
+    notification_burst = 0
+
+    def do_GET(self):
+        if self.path in ("/", "/index.html"):
+            self._send(200, "text/html", build_fixture_page(notification_burst=self.notification_burst))
+        elif self.path.startswith("/static/bundle_") and self.path.endswith(".js"):
+            index = self.path[len("/static/bundle_"):-len(".js")]
+            self._send(200, "application/javascript", build_fixture_script(index))
+        elif self.path.startswith("/static/app.js"):
+            self._send(200, "application/javascript", build_fixture_app_script(self.notification_burst))
+        elif self.path == "/sw.js":
+            self._send(200, "application/javascript", FIXTURE_SERVICE_WORKER)
+        else:
+            self._send(404, "text/plain", "not found")
+
+    def _send(self, status, content_type, body):
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        """Keep benchmark output clean."""
+        pass
+
+
+class FixtureServer:
+    """Local HTTP server running in a background thread."""
+
+    def __init__(self, handler_class=FixtureRequestHandler):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler_class)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}/"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def get_child_pids(pid):
+    """Get all descendant process IDs of a process."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                # The command name may contain spaces; fields follow the last ')'
+                fields = f.read().rsplit(")", 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+
+    descendants = []
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        for child in children.get(current, []):
+            descendants.append(child)
+            pending.append(child)
+    return descendants
+
+
+def get_rss_bytes(pid):
+    """Get the resident set size of a single process in bytes."""
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def get_process_tree_rss(pid):
+    """Get the combined RSS of a process and all its descendants in bytes."""
+    return sum(get_rss_bytes(p) for p in [pid] + get_child_pids(pid))
+
+
+def get_cpu_seconds(pid):
+    """Get the user plus system CPU time of a process in seconds."""
+    try:
+        with open(f"/proc/{pid}/stat", "r") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        # utime and stime are fields 14 and 15 of the full stat line
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def get_wakeups(pid):
+    """
+    Get the number of wakeups of a process, summed over its threads.
+
+    Voluntary context switches count how often a thread went to sleep
+    waiting for a timer, poll or futex, so their rate approximates the
+    CPU wakeups the process causes.
+    """
+    total = 0
+    try:
+        threads = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return 0
+    for tid in threads:
+        try:
+            with open(f"/proc/{pid}/task/{tid}/status", "r") as f:
+                for line in f:
+                    if line.startswith("voluntary_ctxt_switches:"):
+                        total += int(line.split()[1])
+                        break
+        except (OSError, ValueError, IndexError):
+            continue
+    return total
+
+
+def get_process_tree_activity(pid):
+    """Get the combined CPU seconds and wakeups of a process and its descendants."""
+    pids = [pid] + get_child_pids(pid)
+    return sum(get_cpu_seconds(p) for p in pids), sum(get_wakeups(p) for p in pids)
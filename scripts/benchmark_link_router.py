@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark Karere link routing.
+
+Replays a synthetic navigation log through the link router and through the
+previous urlparse-based implementation, and reports per-decision timings as
+JSON. The log mixes WhatsApp, media CDN, external and internal-scheme URIs
+with the repetition typical of a chat session.
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+from pathlib import Path
+from urllib.parse import urlparse
+
+# Add src to path for benchmarking
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from karere.link_router import LinkRouter, INTERNAL_DOMAINS
+
+
+URI_TEMPLATES = [
+    "https://web.whatsapp.com/",
+    "https://web.whatsapp.com/send?phone={n}",
+    "https://mmg.whatsapp.net/v/t62.{n}/file.enc",
+    "https://pps.whatsapp.net/v/t61.{n}/photo.jpg",
+    "https://static.whatsapp.net/rsrc.php/v{n}/icon.png",
+    "https://faq.whatsapp.com/{n}",
+    "https://www.youtube.com/watch?v={n}",
+    "https://github.com/user{n}/repo",
+    "https://news{n}.example.com/article",
+    "https://maps.google.com/?q={n}",
+    "blob:https://web.whatsapp.com/{n}",
+    "data:image/png;base64,{n}",
+    "mailto:contact{n}@example.com",
+]
+
+
+def legacy_should_open_externally(uri):
+    """The previous implementation, kept for comparison."""
+    if not uri:
+        return False
+    try:
+        parsed = urlparse(uri)
+        domain = parsed.netloc.lower()
+        scheme = parsed.scheme.lower()
+        if scheme in ['data', 'blob', 'javascript', 'about']:
+            return False
+        whatsapp_domains = list(INTERNAL_DOMAINS)
+        if any(domain == wd or domain.endswith('.' + wd) for wd in whatsapp_domains):
+            return False
+        if not domain:
+            return False
+        return True
+    except Exception:
+        return False
+
+
+def build_uri_log(count, distinct, seed=0):
+    """Build a reproducible navigation log with repeated URIs."""
+    rng = random.Random(seed)
+    pool = [rng.choice(URI_TEMPLATES).format(n=rng.randrange(distinct)) for _ in range(distinct)]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def time_router(decide, uris, rounds):
+    """Time a routing function over the log, returning the best round."""
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for uri in uris:
+            decide(uri)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return {
+        "total_seconds": best,
+        "ns_per_decision": best / len(uris) * 1e9,
+    }
+
+
+def main():
+    """Run the link routing benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark Karere link routing")
+    parser.add_argument("--count", type=int, default=20000, help="URIs in the replayed log")
+    parser.add_argument("--distinct", type=int, default=500, help="Distinct URIs in the log")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    uris = build_uri_log(args.count, args.distinct)
+
+    # The new router must agree with the legacy one for every URI
+    router = LinkRouter()
+    mismatches = [u for u in set(uris) if router.should_open_externally(u) != legacy_should_open_externally(u)]
+
+    results = {
+        "legacy": time_router(legacy_should_open_externally, uris, args.rounds),
+        "router": time_router(LinkRouter().should_open_externally, uris, args.rounds),
+        "router_uncached": time_router(LinkRouter(cache_size=0).should_open_externally, uris, args.rounds),
+    }
+
+    output = json.dumps({
+        "benchmark": "link_router",
+        "count": args.count,
+        "distinct": args.distinct,
+        "mismatches": sorted(mismatches),
+        "results": results,
+    }, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+    return 0 if not mismatches else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
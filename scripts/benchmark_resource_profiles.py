@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark Karere resource profiles.
+
+Loads a local WhatsApp Web stand-in page once per resource profile, each in
+a fresh process, and reports page load time and the RSS of the process tree
+(UI process plus WebKit web and network processes) as JSON.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from pathlib import Path
+
+# Add src to path for benchmarking
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark_common import FixtureServer, get_process_tree_rss
+
+
+SETTLE_SECONDS = 3
+LOAD_TIMEOUT_SECONDS = 60
+
+
+def run_child(profile_name, url):
+    """Load the fixture page with one profile and print the measurements."""
+    import gi
+    gi.require_version("Gtk", "4.0")
+    gi.require_version("WebKit", "6.0")
+    from gi.repository import Gtk, GLib, WebKit
+    from karere.resource_profiles import (
+        configure_network_process, create_web_context, apply_to_webview_settings
+    )
+
+    Gtk.init()
+    loop = GLib.MainLoop()
+    result = {"profile": profile_name}
+
+    configure_network_process(profile_name)
+    web_context = create_web_context(profile_name)
+    webview = WebKit.WebView(web_context=web_context)
+    apply_to_webview_settings(webview.get_settings(), profile_name)
+
+    window = Gtk.Window()
+    window.set_default_size(1024, 768)
+    window.set_child(webview)
+    window.present()
+
+    def measure():
+        result["rss_bytes"] = get_process_tree_rss(os.getpid())
+        loop.quit()
+        return False
+
+    def on_load_changed(view, load_event):
+        if load_event == WebKit.LoadEvent.FINISHED and "load_seconds" not in result:
+            result["load_seconds"] = time.monotonic() - start
+            GLib.timeout_add_seconds(SETTLE_SECONDS, measure)
+
+    def on_timeout():
+        result["error"] = "load timed out"
+        loop.quit()
+        return False
+
+    webview.connect("load-changed", on_load_changed)
+    GLib.timeout_add_seconds(LOAD_TIMEOUT_SECONDS, on_timeout)
+
+    start = time.monotonic()
+    webview.load_uri(url)
+    loop.run()
+
+    print(json.dumps(result))
+    return 0 if "error" not in result else 1
+
+
+def run_profile(profile_name, url):
+    """Run one profile in a fresh process and return its measurements."""
+    env = dict(os.environ, GSETTINGS_BACKEND="memory")
+    completed = subprocess.run(
+        [sys.executable, __file__, "--child", profile_name, url],
+        capture_output=True, text=True, env=env,
+        timeout=LOAD_TIMEOUT_SECONDS + SETTLE_SECONDS + 30
+    )
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    return {"profile": profile_name, "error": completed.stderr.strip()[-500:]}
+
+
+def main():
+    """Run the resource profile benchmark."""
+    from karere.resource_profiles import RESOURCE_PROFILES
+
+    parser = argparse.ArgumentParser(description="Benchmark Karere resource profiles")
+    parser.add_argument("--profiles", nargs="+", default=list(RESOURCE_PROFILES))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--child", nargs=2, metavar=("PROFILE", "URL"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return run_child(*args.child)
+
+    results = []
+    with FixtureServer() as server:
+        for profile_name in args.profiles:
+            for run in range(args.runs):
+                measurement = run_profile(profile_name, server.url)
+                measurement["run"] = run
+                results.append(measurement)
+                print(f"{profile_name} run {run}: {measurement}", file=sys.stderr)
+
+    output = json.dumps({"benchmark": "resource_profiles", "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
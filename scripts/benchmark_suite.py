@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the Karere application.
+
+Starts a local HTTP fixture imitating WhatsApp Web's load profile (many
+script bundles, IndexedDB, a service worker and a notification burst),
+points KarereWindow at it through KARERE_WEB_URL and runs the real
+application once per run in a fresh process. Each run reports:
+
+    cold_start_seconds      process spawn until the main window is mapped
+    tti_seconds             process spawn until the fixture is interactive
+    rss_bytes               RSS of the process tree after the notification burst
+    notification_latency_ms Date.now() in the page until app.send_notification returns
+    shutdown_seconds        duration of quit_application()
+    exit_seconds            quit_application() until the process exited
+
+The JSON output includes the git commit so results can be compared across
+commits.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+# Add src to path for benchmarking
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark_common import (
+    FixtureServer, FixtureRequestHandler, get_process_tree_rss,
+    FIXTURE_INTERACTIVE_TITLE, BENCH_NOTIFICATION_PREFIX
+)
+
+
+DEFAULT_NOTIFICATIONS = 20
+SETTLE_SECONDS = 1
+RUN_TIMEOUT_SECONDS = 90
+
+
+def run_child(url, spawned_at, notification_count):
+    """Run Karere against the fixture and print the measurements."""
+    os.environ["KARERE_WEB_URL"] = url
+
+    import gi
+    gi.require_version("Gtk", "4.0")
+    gi.require_version("WebKit", "6.0")
+    from gi.repository import Gio, GLib
+    from karere.application import KarereApplication
+    from karere.metrics import get_metrics
+
+    result = {}
+    latencies = []
+    app = KarereApplication()
+    # Never hand the run over to a Karere instance that is already running
+    app.set_flags(app.get_flags() | Gio.ApplicationFlags.NON_UNIQUE)
+
+    def elapsed():
+        return time.time() - spawned_at
+
+    def shutdown():
+        result["rss_bytes"] = get_process_tree_rss(os.getpid())
+        result["metrics"] = get_metrics().snapshot()
+        result["quit_started_at"] = time.time()
+        start = time.monotonic()
+        app.quit_application()
+        result["shutdown_seconds"] = time.monotonic() - start
+        if app.shutdown_result is not None:
+            result["shutdown_steps"] = app.shutdown_result.durations
+        return False
+
+    original_send_notification = app.send_notification
+
+    def send_notification(title, message, *args, **kwargs):
+        sent = original_send_notification(title, message, *args, **kwargs)
+        if message.startswith(BENCH_NOTIFICATION_PREFIX):
+            created_ms = int(message.rsplit(":", 1)[1])
+            latencies.append(time.time() * 1000 - created_ms)
+            if len(latencies) == notification_count:
+                GLib.timeout_add_seconds(SETTLE_SECONDS, shutdown)
+        return sent
+
+    app.send_notification = send_notification
+
+    def on_title_changed(webview, param):
+        if webview.get_title() == FIXTURE_INTERACTIVE_TITLE and "tti_seconds" not in result:
+            result["tti_seconds"] = elapsed()
+
+    def on_map(window):
+        if "cold_start_seconds" not in result:
+            result["cold_start_seconds"] = elapsed()
+
+    def on_window_added(application, window):
+        if window is application.main_window:
+            window.connect("map", on_map)
+            window.webview.connect("notify::title", on_title_changed)
+
+    def on_timeout():
+        result["error"] = f"timed out with {len(latencies)} of {notification_count} notifications"
+        shutdown()
+        return False
+
+    app.connect("window-added", on_window_added)
+    GLib.timeout_add_seconds(RUN_TIMEOUT_SECONDS, on_timeout)
+    app.run([])
+
+    result["notifications"] = len(latencies)
+    if latencies:
+        result["notification_latency_ms"] = summarize(latencies)
+    print(json.dumps(result))
+    return 0 if "error" not in result else 1
+
+
+def summarize(values):
+    """Summarize a list of measurements."""
+    values = sorted(values)
+    return {
+        "median": statistics.median(values),
+        "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+        "max": values[-1],
+    }
+
+
+def run_once(url, notification_count):
+    """Run the application once in a fresh process and return its measurements."""
+    env = dict(os.environ, GSETTINGS_BACKEND="memory")
+    spawned_at = time.time()
+    completed = subprocess.run(
+        [sys.executable, __file__, "--child", url, repr(spawned_at), str(notification_count)],
+        capture_output=True, text=True, env=env,
+        timeout=RUN_TIMEOUT_SECONDS + 30
+    )
+    finished_at = time.time()
+
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith("{"):
+            result = json.loads(line)
+            quit_started_at = result.pop("quit_started_at", None)
+            if quit_started_at is not None:
+                result["exit_seconds"] = finished_at - quit_started_at
+            return result
+    return {"error": completed.stderr.strip()[-500:]}
+
+
+def get_git_commit():
+    """Get the commit being benchmarked, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize_runs(results):
+    """Median of each scalar measurement over successful runs."""
+    keys = ("cold_start_seconds", "tti_seconds", "rss_bytes", "shutdown_seconds", "exit_seconds")
+    summary = {}
+    for key in keys:
+        values = [r[key] for r in results if key in r and "error" not in r]
+        if values:
+            summary[key] = statistics.median(values)
+
+    latencies = [r["notification_latency_ms"]["median"] for r in results
+                 if "notification_latency_ms" in r and "error" not in r]
+    if latencies:
+        summary["notification_latency_ms"] = statistics.median(latencies)
+    return summary
+
+
+def main():
+    """Run the benchmark suite."""
+    parser = argparse.ArgumentParser(description="Benchmark Karere against a local WhatsApp Web stand-in")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--notifications", type=int, default=DEFAULT_NOTIFICATIONS)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--child", nargs=3, metavar=("URL", "SPAWNED_AT", "NOTIFICATIONS"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        url, spawned_at, notification_count = args.child
+        return run_child(url, float(spawned_at), int(notification_count))
+
+    handler_class = type("BenchmarkFixtureHandler", (FixtureRequestHandler,),
+                         {"notification_burst": args.notifications})
+
+    results = []
+    with FixtureServer(handler_class) as server:
+        for run in range(args.runs):
+            measurement = run_once(server.url, args.notifications)
+            measurement["run"] = run
+            results.append(measurement)
+            print(f"run {run}: {measurement}", file=sys.stderr)
+
+    output = json.dumps({
+        "benchmark": "suite",
+        "commit": get_git_commit(),
+        "notifications": args.notifications,
+        "summary": summarize_runs(results),
+        "results": results,
+    }, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test script for the WhatsApp account list.
+
+This script tests parsing of the stored account list, the per-account
+data directories and removal of account data.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from karere.accounts import (
+    DEFAULT_ACCOUNT_ID, Account, load_accounts, new_account, parse_accounts,
+    remove_account_data, serialize_accounts
+)
+
+
+class FakeVariant:
+    """Minimal stand-in for GLib.Variant."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def unpack(self):
+        return self.value
+
+
+class FakeSettings:
+    """Minimal stand-in for Gio.Settings."""
+
+    def __init__(self, accounts):
+        self.accounts = accounts
+
+    def get_value(self, key):
+        assert key == "accounts"
+        return FakeVariant(self.accounts)
+
+
+def test_parse_accounts():
+    """Test that invalid entries are dropped and the default account always exists."""
+    print("Testing account list parsing...")
+
+    try:
+        accounts = load_accounts(FakeSettings([("default", "Personal"), ("account-2", "Work")]))
+        assert [(a.id, a.name) for a in accounts] == [("default", "Personal"), ("account-2", "Work")]
+
+        accounts = parse_accounts([("account-2", "Work"), ("account-2", "Copy"),
+                                   ("../escape", "Bad"), ("", "Empty"), ("broken",)])
+        assert [a.id for a in accounts] == [DEFAULT_ACCOUNT_ID, "account-2"]
+        assert accounts[1].name == "Work"
+
+        assert serialize_accounts(accounts) == [("default", "WhatsApp"), ("account-2", "Work")]
+        print("  ✅ Account list parsed")
+        return True
+    except Exception as e:
+        print(f"  ❌ Parsing failed: {e}")
+        return False
+
+
+def test_new_account():
+    """Test that new accounts get unused ids."""
+    print("Testing new account ids...")
+
+    try:
+        accounts = parse_accounts([("default", "WhatsApp"), ("account-2", "Work")])
+        account = new_account(accounts)
+        assert account.id == "account-3"
+        assert account.name == "Account 3"
+        assert new_account(accounts, "Shop").name == "Shop"
+        print("  ✅ New account ids are unique")
+        return True
+    except Exception as e:
+        print(f"  ❌ New account failed: {e}")
+        return False
+
+
+def test_account_directories():
+    """Test that other accounts live outside the default account's directories."""
+    print("Testing account directories...")
+
+    old_data = os.environ.get('XDG_DATA_HOME')
+    old_cache = os.environ.get('XDG_CACHE_HOME')
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.environ['XDG_DATA_HOME'] = os.path.join(temp_dir, 'data')
+            os.environ['XDG_CACHE_HOME'] = os.path.join(temp_dir, 'cache')
+
+            default = Account(DEFAULT_ACCOUNT_ID, "WhatsApp")
+            work = Account("account-2", "Work")
+            assert default.data_dir == os.path.join(temp_dir, 'data', 'karere')
+            assert work.data_dir == os.path.join(temp_dir, 'data', 'karere-accounts', 'account-2')
+            assert work.cache_dir == os.path.join(temp_dir, 'cache', 'karere-accounts', 'account-2')
+            assert not work.data_dir.startswith(default.data_dir + os.sep)
+            assert not work.cache_dir.startswith(default.cache_dir + os.sep)
+
+            for path in (default.data_dir, work.data_dir, work.cache_dir):
+                os.makedirs(path, exist_ok=True)
+            Path(work.data_dir, 'cookies.sqlite').write_text("cookies")
+
+            assert remove_account_data(work)
+            assert not os.path.exists(work.data_dir)
+            assert not os.path.exists(work.cache_dir)
+
+            # The default account shares its directory and is never removed
+            assert not remove_account_data(default)
+            assert os.path.isdir(default.data_dir)
+        print("  ✅ Account data isolated and removable")
+        return True
+    except Exception as e:
+        print(f"  ❌ Account directories failed: {e}")
+        return False
+    finally:
+        for name, value in (('XDG_DATA_HOME', old_data), ('XDG_CACHE_HOME', old_cache)):
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def main():
+    """Run all account tests."""
+    print("Account List Test Suite")
+    print("=" * 50)
+
+    tests = [
+        ("Account Parsing", test_parse_accounts),
+        ("New Account", test_new_account),
+        ("Account Directories", test_account_directories),
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ UNEXPECTED ERROR in {test_name}: {e}")
+            failed += 1
+
+    print("=" * 50)
+    print(f"Results: {passed} passed, {failed} failed")
+
+    if failed == 0:
+        print("🎉 All account tests passed!")
+        return 0
+    else:
+        print(f"❌ {failed} test(s) failed")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
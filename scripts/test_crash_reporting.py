@@ -7,6 +7,7 @@ This script tests the crash reporting system to ensure it works correctly.
 
 import os
 import sys
+import time
 import tempfile
 import json
 from pathlib import Path
@@ -53,6 +54,99 @@ def test_system_info_collection():
         return False
 
 
+def test_static_system_info_snapshot():
+    """Test that static system information is collected once and frozen."""
+    print("Testing static system info snapshot...")
+    
+    try:
+        crash_reporter = CrashReporter("TestApp", enable_reporting=True)
+        
+        # Without a snapshot, only cheap fallback fields are reported
+        fallback_info = crash_reporter._get_system_info()
+        assert 'processor' not in fallback_info, "Fallback info should not query the processor"
+        assert fallback_info['snapshot_time'] is None
+        
+        snapshot = crash_reporter.collect_static_system_info()
+        assert crash_reporter.collect_static_system_info() is snapshot, "Snapshot should be collected once"
+        
+        try:
+            snapshot['platform'] = 'modified'
+            print("  ❌ Snapshot should be read-only")
+            return False
+        except TypeError:
+            pass
+        
+        # Volatile fields are sampled on every call
+        system_info = crash_reporter._get_system_info()
+        assert 'processor' in system_info
+        assert 'uptime' in system_info
+        assert 'memory_info' in system_info
+        assert 'uptime' not in snapshot
+        
+        print("  ✅ Static system info snapshot working")
+        return True
+    except Exception as e:
+        print(f"  ❌ Static system info snapshot failed: {e}")
+        return False
+
+
+def test_crash_report_time_budget():
+    """Test that report generation honours its time budget."""
+    print("Testing crash report time budget...")
+    
+    try:
+        import karere.crash_reporter as crash_reporter_module
+        
+        crash_reporter = CrashReporter("TestApp", enable_reporting=True)
+        original_budget = crash_reporter_module.REPORT_TIME_BUDGET
+        crash_reporter_module.REPORT_TIME_BUDGET = 0
+        
+        try:
+            try:
+                raise ValueError("Budget test exception")
+            except ValueError:
+                exc_type, exc_value, exc_traceback = sys.exc_info()
+                crash_id = crash_reporter.generate_crash_report(exc_type, exc_value, exc_traceback)
+        finally:
+            crash_reporter_module.REPORT_TIME_BUDGET = original_budget
+        
+        report_file = crash_reporter.get_report_path(crash_id)
+        crash_data = crash_reporter.load_crash_report(report_file)
+        
+        # The exception is mandatory, optional sections are skipped
+        assert crash_data['exception']['type'] == "ValueError"
+        assert 'system_info' in crash_data['skipped_sections']
+        assert crash_data['runtime_info'] == {}
+        assert crash_data['truncated_by_time_budget'] is True
+        
+        # A probe that hangs is abandoned once the budget runs out
+        def slow_build_info():
+            time.sleep(2)
+            return {"slow": True}
+        crash_reporter._get_build_info = slow_build_info
+        crash_reporter_module.REPORT_TIME_BUDGET = 0.2
+        try:
+            try:
+                raise ValueError("Slow probe exception")
+            except ValueError:
+                started = time.monotonic()
+                crash_id = crash_reporter.generate_crash_report(*sys.exc_info())
+                elapsed = time.monotonic() - started
+        finally:
+            crash_reporter_module.REPORT_TIME_BUDGET = original_budget
+        
+        crash_data = crash_reporter.load_crash_report(crash_reporter.get_report_path(crash_id))
+        assert elapsed < 1, f"report took {elapsed:.2f}s"
+        assert 'build_info' in crash_data['skipped_sections']
+        assert crash_data['truncated_by_time_budget'] is True
+        
+        print("  ✅ Crash report time budget working")
+        return True
+    except Exception as e:
+        print(f"  ❌ Crash report time budget test failed: {e}")
+        return False
+
+
 def test_crash_report_generation():
     """Test crash report generation."""
     print("Testing crash report generation...")
@@ -72,12 +166,12 @@ def test_crash_report_generation():
         assert len(crash_id) > 0
         
         # Check that crash report file exists
-        report_file = crash_reporter.reports_dir / f"crash_{crash_id}.json"
-        assert report_file.exists(), f"Crash report file not found: {report_file}"
+        report_file = crash_reporter.get_report_path(crash_id)
+        assert report_file is not None, f"Crash report file not found for {crash_id}"
+        assert report_file.name.endswith(".json.gz"), "Crash report should be compressed"
         
         # Check crash report content
-        with open(report_file, 'r') as f:
-            crash_data = json.load(f)
+        crash_data = crash_reporter.load_crash_report(report_file)
         
         assert crash_data['crash_id'] == crash_id
         assert crash_data['app_name'] == "TestApp"
@@ -94,6 +188,35 @@ def test_crash_report_generation():
         return False
 
 
+def test_total_crash_count():
+    """Test that the crash counter is seeded once and only grows."""
+    print("Testing total crash count...")
+    
+    try:
+        crash_reporter = CrashReporter("TestApp", enable_reporting=True)
+        crash_reporter.clear_crash_reports()
+        crash_reporter = CrashReporter("TestApp", enable_reporting=True)
+        assert crash_reporter.total_crash_count == 0
+        
+        for _ in range(2):
+            try:
+                raise ValueError("Counted exception")
+            except ValueError:
+                crash_reporter.generate_crash_report(*sys.exc_info())
+        assert crash_reporter.total_crash_count == 2
+        
+        # Removing reports does not lower the count; a new start is seeded from disk
+        crash_reporter.clear_crash_reports()
+        assert crash_reporter.total_crash_count == 2
+        assert CrashReporter("TestApp", enable_reporting=True).total_crash_count == 0
+        
+        print("  ✅ Total crash count working")
+        return True
+    except Exception as e:
+        print(f"  ❌ Total crash count test failed: {e}")
+        return False
+
+
 def test_crash_report_management():
     """Test crash report management."""
     print("Testing crash report management...")
@@ -135,6 +258,54 @@ def test_crash_report_management():
         return False
 
 
+def test_crash_report_retention():
+    """Test size and age based crash report retention."""
+    print("Testing crash report retention...")
+    
+    try:
+        import karere.crash_reporter as crash_reporter_module
+        
+        crash_reporter = CrashReporter("TestApp", enable_reporting=True)
+        crash_reporter.clear_crash_reports()
+        
+        # A legacy uncompressed report older than the age limit
+        legacy_file = crash_reporter.reports_dir / "crash_legacy.json"
+        with open(legacy_file, 'w') as f:
+            json.dump({"crash_id": "legacy", "timestamp": "2000-01-01T00:00:00"}, f)
+        
+        reports = crash_reporter.get_crash_reports()
+        assert [r['crash_id'] for r in reports] == ["legacy"], "Legacy reports should be readable"
+        
+        expired = crash_reporter_module.time.time() - crash_reporter_module.REPORT_MAX_AGE - 60
+        os.utime(legacy_file, (expired, expired))
+        
+        original_budget = crash_reporter_module.REPORTS_BYTE_BUDGET
+        crash_reporter_module.REPORTS_BYTE_BUDGET = 1
+        try:
+            for i in range(3):
+                try:
+                    raise RuntimeError(f"Retention crash {i}")
+                except RuntimeError:
+                    exc_type, exc_value, exc_traceback = sys.exc_info()
+                    crash_id = crash_reporter.generate_crash_report(exc_type, exc_value, exc_traceback)
+        finally:
+            crash_reporter_module.REPORTS_BYTE_BUDGET = original_budget
+        
+        # Only the newest report fits the budget, the expired one is gone
+        assert not legacy_file.exists(), "Expired report should be deleted"
+        stats = crash_reporter.get_storage_statistics()
+        assert stats['count'] == 1, f"Expected 1 report, got {stats['count']}"
+        assert crash_reporter.get_report_path(crash_id) is not None, "Newest report should be kept"
+        
+        crash_reporter.clear_crash_reports()
+        
+        print("  ✅ Crash report retention working")
+        return True
+    except Exception as e:
+        print(f"  ❌ Crash report retention test failed: {e}")
+        return False
+
+
 def test_privacy_features():
     """Test privacy-aware features."""
     print("Testing privacy features...")
@@ -151,9 +322,8 @@ def test_privacy_features():
             crash_id = crash_reporter.generate_crash_report(exc_type, exc_value, exc_traceback)
         
         # Check crash report
-        report_file = crash_reporter.reports_dir / f"crash_{crash_id}.json"
-        with open(report_file, 'r') as f:
-            crash_data = json.load(f)
+        report_file = crash_reporter.get_report_path(crash_id)
+        crash_data = crash_reporter.load_crash_report(report_file)
         
         # System info should be empty when collection is disabled
         assert crash_data['system_info'] == {}, "System info should be empty when collection is disabled"
@@ -227,8 +397,12 @@ def main():
     tests = [
         ("Crash Reporter Initialization", test_crash_reporter_initialization),
         ("System Info Collection", test_system_info_collection),
+        ("Static System Info Snapshot", test_static_system_info_snapshot),
+        ("Crash Report Time Budget", test_crash_report_time_budget),
         ("Crash Report Generation", test_crash_report_generation),
+        ("Total Crash Count", test_total_crash_count),
         ("Crash Report Management", test_crash_report_management),
+        ("Crash Report Retention", test_crash_report_retention),
         ("Privacy Features", test_privacy_features),
         ("Error Handling", test_error_handling),
         ("Global Crash Handler", test_global_crash_handler),
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Test script for download deduplication.
+
+This script tests the content hash index and the link-based replacement
+of duplicate downloads.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from karere.dedup_index import (
+    DedupIndex, replace_with_link, DEDUP_HARDLINK, DEDUP_REFLINK, DEDUP_DROP
+)
+from karere.media_processing import hash_file
+
+
+def test_index_lookup():
+    """Test adding and looking up files by content hash."""
+    print("Testing index lookup...")
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index = DedupIndex(os.path.join(temp_dir, "data", "downloads.db"))
+            original = Path(temp_dir, "meme.jpg")
+            original.write_bytes(b"funny picture")
+            content_hash = hash_file(str(original))
+
+            assert index.lookup(content_hash) is None
+            index.add(content_hash, str(original))
+            assert index.lookup(content_hash) == str(original)
+            assert len(index) == 1
+            index.close()
+
+            # The index persists across instances
+            reopened = DedupIndex(os.path.join(temp_dir, "data", "downloads.db"))
+            assert reopened.lookup(content_hash) == str(original)
+            reopened.close()
+        print("  ✅ Files found by content hash")
+        return True
+    except Exception as e:
+        print(f"  ❌ Index lookup failed: {e}")
+        return False
+
+
+def test_stale_entries():
+    """Test that deleted or modified files are not returned."""
+    print("Testing stale entries...")
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index = DedupIndex(os.path.join(temp_dir, "downloads.db"))
+            deleted = Path(temp_dir, "deleted.pdf")
+            deleted.write_bytes(b"document")
+            modified = Path(temp_dir, "modified.txt")
+            modified.write_bytes(b"original text")
+
+            index.add("hash-deleted", str(deleted))
+            index.add("hash-modified", str(modified))
+            deleted.unlink()
+            modified.write_bytes(b"edited text, longer")
+
+            assert index.lookup("hash-deleted") is None
+            assert index.lookup("hash-modified") is None
+            assert len(index) == 0
+            index.close()
+        print("  ✅ Stale entries removed on lookup")
+        return True
+    except Exception as e:
+        print(f"  ❌ Stale entries failed: {e}")
+        return False
+
+
+def test_hardlink_replacement():
+    """Test replacing a duplicate with a hardlink."""
+    print("Testing hardlink replacement...")
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            original = Path(temp_dir, "video.mp4")
+            duplicate = Path(temp_dir, "video_1.mp4")
+            original.write_bytes(b"x" * 4096)
+            duplicate.write_bytes(b"x" * 4096)
+
+            path = replace_with_link(str(duplicate), str(original), DEDUP_HARDLINK)
+            assert path == str(duplicate)
+            assert os.path.samefile(original, duplicate)
+            assert not Path(temp_dir, "video_1.mp4.dedup").exists()
+        print("  ✅ Duplicate shares the original's inode")
+        return True
+    except Exception as e:
+        print(f"  ❌ Hardlink replacement failed: {e}")
+        return False
+
+
+def test_reflink_replacement():
+    """Test reflink replacement, which keeps the copy where unsupported."""
+    print("Testing reflink replacement...")
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            original = Path(temp_dir, "doc.pdf")
+            duplicate = Path(temp_dir, "doc_1.pdf")
+            original.write_bytes(b"pdf content")
+            duplicate.write_bytes(b"pdf content")
+
+            path = replace_with_link(str(duplicate), str(original), DEDUP_REFLINK)
+            assert path == str(duplicate)
+            assert duplicate.read_bytes() == b"pdf content"
+            assert not os.path.samefile(original, duplicate)
+            assert sorted(os.listdir(temp_dir)) == ["doc.pdf", "doc_1.pdf"]
+        print("  ✅ Content preserved with or without reflink support")
+        return True
+    except Exception as e:
+        print(f"  ❌ Reflink replacement failed: {e}")
+        return False
+
+
+def test_drop_replacement():
+    """Test dropping a duplicate in favour of the original."""
+    print("Testing drop replacement...")
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            original = Path(temp_dir, "a.jpg")
+            duplicate = Path(temp_dir, "a_1.jpg")
+            original.write_bytes(b"img")
+            duplicate.write_bytes(b"img")
+
+            path = replace_with_link(str(duplicate), str(original), DEDUP_DROP)
+            assert path == str(original)
+            assert not duplicate.exists()
+            assert original.exists()
+        print("  ✅ Duplicate removed, original returned")
+        return True
+    except Exception as e:
+        print(f"  ❌ Drop replacement failed: {e}")
+        return False
+
+
+def main():
+    """Run all deduplication tests."""
+    print("Download Deduplication Test Suite")
+    print("=" * 50)
+
+    tests = [
+        ("Index Lookup", test_index_lookup),
+        ("Stale Entries", test_stale_entries),
+        ("Hardlink Replacement", test_hardlink_replacement),
+        ("Reflink Replacement", test_reflink_replacement),
+        ("Drop Replacement", test_drop_replacement),
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ UNEXPECTED ERROR in {test_name}: {e}")
+            failed += 1
+
+    print("=" * 50)
+    print(f"Results: {passed} passed, {failed} failed")
+
+    if failed == 0:
+        print("🎉 All deduplication tests passed!")
+        return 0
+    else:
+        print(f"❌ {failed} test(s) failed")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Test script for the download manager.
+
+This script drives the download queue with stand-in WebView and download
+objects to verify concurrency limits, progress tracking, integrity checks,
+cancellation and resuming from the download journal.
+"""
+
+import os
+import sys
+import base64
+import hashlib
+import shutil
+import tempfile
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from karere.download_manager import DownloadManager, DownloadJob, PROGRESS_INTERVAL
+from karere.download_journal import DownloadJournal, check_validators, get_validators
+
+
+class FakeHeaders:
+    """Minimal stand-in for Soup.MessageHeaders."""
+
+    def __init__(self, headers):
+        self.headers = {name.lower(): value for name, value in headers.items()}
+
+    def get_one(self, name):
+        return self.headers.get(name.lower())
+
+
+class FakeResponse:
+    def __init__(self, content_length, headers=None):
+        self.content_length = content_length
+        self.headers = FakeHeaders(headers or {})
+
+    def get_content_length(self):
+        return self.content_length
+
+    def get_http_headers(self):
+        return self.headers
+
+
+class FakeDownload:
+    """Minimal stand-in for WebKit.Download signal handling."""
+
+    def __init__(self, uri, content_length=1000):
+        self.uri = uri
+        self.destination = None
+        self.cancelled = False
+        self.response = FakeResponse(content_length)
+        self.handlers = {}
+        self._next_id = 1
+
+    def connect(self, signal, callback, *user_data):
+        handler_id = self._next_id
+        self._next_id += 1
+        self.handlers[handler_id] = (signal, callback, user_data)
+        return handler_id
+
+    def disconnect(self, handler_id):
+        del self.handlers[handler_id]
+
+    def emit(self, signal, *args):
+        result = None
+        for name, callback, user_data in list(self.handlers.values()):
+            if name == signal:
+                result = callback(self, *args, *user_data)
+        return result
+
+    def set_allow_overwrite(self, allowed):
+        self.allow_overwrite = allowed
+
+    def set_destination(self, destination):
+        self.destination = destination
+
+    def get_response(self):
+        return self.response
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class FakeWebView:
+    def __init__(self):
+        self.downloads = []
+
+    def download_uri(self, uri):
+        download = FakeDownload(uri)
+        self.downloads.append(download)
+        return download
+
+
+class FakeTransfer:
+    """Stand-in for a resumed transfer."""
+
+    def __init__(self, job, progress_callback, done_callback):
+        self.job = job
+        self.progress_callback = progress_callback
+        self.done_callback = done_callback
+        self.started = False
+        self.cancelled = False
+
+    def start(self):
+        self.started = True
+
+    def cancel(self):
+        self.cancelled = True
+
+
+def complete(download, job, data=b""):
+    """Write the partial file WebKit would produce and finish the download."""
+    Path(job.part_path).write_bytes(data)
+    download.emit("finished")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_concurrency_limit():
+    """Test that only max_concurrent downloads run at once, in FIFO order."""
+    print("Testing concurrency limit...")
+
+    try:
+        temp_dir = tempfile.mkdtemp()
+        webview = FakeWebView()
+        finished = []
+        manager = DownloadManager(webview, max_concurrent=2, finished_callback=finished.append)
+
+        jobs = [manager.enqueue(f"https://example.com/{i}", os.path.join(temp_dir, f"file{i}"))
+                for i in range(5)]
+        assert len(webview.downloads) == 2
+        assert manager.queue_depth == 3
+        assert [j.state for j in jobs[:3]] == [DownloadJob.RUNNING, DownloadJob.RUNNING, DownloadJob.QUEUED]
+
+        # Finishing one download starts the next queued one
+        complete(webview.downloads[0], jobs[0])
+        assert jobs[0].state == DownloadJob.COMPLETED
+        assert len(webview.downloads) == 3
+        assert webview.downloads[2].uri == "https://example.com/2"
+
+        # A failure also releases its slot
+        webview.downloads[1].emit("failed", Exception("network down"))
+        webview.downloads[1].emit("finished")
+        assert jobs[1].state == DownloadJob.FAILED
+        assert jobs[1].error == "network down"
+        assert len(webview.downloads) == 4
+        assert [j.state for j in finished] == [DownloadJob.COMPLETED, DownloadJob.FAILED]
+
+        # Raising the limit starts waiting downloads immediately
+        manager.set_max_concurrent(5)
+        assert len(webview.downloads) == 5
+        assert manager.queue_depth == 0
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        print("  ✅ Concurrency limit and queue order respected")
+        return True
+    except Exception as e:
+        print(f"  ❌ Concurrency limit failed: {e}")
+        return False
+
+
+def test_destination():
+    """Test that downloads are pointed at their queued destination."""
+    print("Testing download destination...")
+
+    try:
+        webview = FakeWebView()
+        manager = DownloadManager(webview)
+        manager.enqueue("https://example.com/a.jpg", "/tmp/downloads/a.jpg")
+        download = webview.downloads[0]
+        assert download.emit("decide-destination", "a.jpg") is True
+        assert download.destination == "/tmp/downloads/a.jpg.part"
+        assert download.allow_overwrite is True
+        print("  ✅ Partial file set on decide-destination")
+        return True
+    except Exception as e:
+        print(f"  ❌ Download destination failed: {e}")
+        return False
+
+
+def test_progress_tracking():
+    """Test throttled progress updates, throughput and ETA."""
+    print("Testing progress tracking...")
+
+    try:
+        webview = FakeWebView()
+        clock = FakeClock()
+        updates = []
+        manager = DownloadManager(webview, progress_callback=updates.append, clock=clock)
+        job = manager.enqueue("https://example.com/video.mp4", "/tmp/video.mp4")
+        download = webview.downloads[0]
+
+        # Many chunks within one interval produce no update
+        for _ in range(10):
+            clock.now += PROGRESS_INTERVAL / 20
+            download.emit("received-data", 10)
+        assert updates == []
+        assert job.bytes_received == 100
+
+        # Once the interval elapses a single update is emitted
+        clock.now = 1.0
+        download.emit("received-data", 100)
+        assert len(updates) == 1
+        assert job.total_bytes == 1000
+        assert abs(job.fraction - 0.2) < 1e-9
+        assert abs(job.bytes_per_second - 200.0) < 1e-6
+        assert abs(job.eta_seconds - 4.0) < 1e-6
+        print("  ✅ Progress throttled with throughput and ETA")
+        return True
+    except Exception as e:
+        print(f"  ❌ Progress tracking failed: {e}")
+        return False
+
+
+def test_cancel_all():
+    """Test that shutdown cancels running and queued downloads."""
+    print("Testing cancellation on shutdown...")
+
+    try:
+        webview = FakeWebView()
+        manager = DownloadManager(webview, max_concurrent=1)
+        jobs = [manager.enqueue(f"https://example.com/{i}", f"/tmp/file{i}") for i in range(3)]
+
+        manager.cancel_all()
+        assert webview.downloads[0].cancelled
+        assert len(webview.downloads) == 1
+        assert all(j.state == DownloadJob.CANCELLED for j in jobs)
+        assert not manager.active and manager.queue_depth == 0
+
+        # Nothing new starts after shutdown
+        late = manager.enqueue("https://example.com/late", "/tmp/late")
+        assert late.state == DownloadJob.CANCELLED
+        assert len(webview.downloads) == 1
+        print("  ✅ Downloads cancelled cleanly")
+        return True
+    except Exception as e:
+        print(f"  ❌ Cancellation failed: {e}")
+        return False
+
+
+def test_integrity_check():
+    """Test that only complete files are moved into place."""
+    print("Testing integrity check...")
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            webview = FakeWebView()
+            manager = DownloadManager(webview)
+            good = manager.enqueue("https://example.com/good", os.path.join(temp_dir, "good.bin"))
+            bad = manager.enqueue("https://example.com/bad", os.path.join(temp_dir, "bad.bin"))
+
+            for download in webview.downloads:
+                download.emit("received-data", 1000)
+            complete(webview.downloads[0], good, b"x" * 1000)
+            complete(webview.downloads[1], bad, b"x" * 10)
+
+            assert good.state == DownloadJob.COMPLETED
+            assert Path(temp_dir, "good.bin").read_bytes() == b"x" * 1000
+            assert bad.state == DownloadJob.FAILED
+            assert "size mismatch" in bad.error
+            assert sorted(os.listdir(temp_dir)) == ["good.bin"]
+        print("  ✅ Truncated download rejected before rename")
+        return True
+    except Exception as e:
+        print(f"  ❌ Integrity check failed: {e}")
+        return False
+
+
+def test_response_validators():
+    """Test that changed resources and digest mismatches are rejected."""
+    print("Testing response validators...")
+
+    try:
+        original = get_validators(FakeHeaders({"ETag": '"v1"', "Content-Type": "video/mp4"}))
+        assert original == {"etag": '"v1"', "content_type": "video/mp4"}
+        assert check_validators(original, get_validators(FakeHeaders({"ETag": '"v1"'}))) is None
+        assert "etag" in check_validators(original, {"etag": '"v2"'})
+        assert "content type" in check_validators(original, {"content_type": "image/jpeg"})
+        assert "HTML" in check_validators({}, {"content_type": "text/html; charset=utf-8"})
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            webview = FakeWebView()
+            manager = DownloadManager(webview)
+            data = b"x" * 1000
+            digest = base64.b64encode(hashlib.sha256(data).digest()).decode()
+            good = manager.enqueue("https://example.com/good", os.path.join(temp_dir, "good.bin"))
+            bad = manager.enqueue("https://example.com/bad", os.path.join(temp_dir, "bad.bin"))
+            webview.downloads[0].response = FakeResponse(1000, {"Repr-Digest": f"sha-256=:{digest}:"})
+            webview.downloads[1].response = FakeResponse(1000, {"Digest": f"SHA-256={digest}"})
+
+            for download in webview.downloads:
+                download.emit("received-data", 1000)
+            complete(webview.downloads[0], good, data)
+            complete(webview.downloads[1], bad, b"y" * 1000)
+
+            assert good.state == DownloadJob.COMPLETED
+            assert bad.state == DownloadJob.FAILED
+            assert "digest" in bad.error
+            assert sorted(os.listdir(temp_dir)) == ["good.bin"]
+        print("  ✅ Changed or corrupted responses rejected")
+        return True
+    except Exception as e:
+        print(f"  ❌ Response validators failed: {e}")
+        return False
+
+
+def test_journal_resume():
+    """Test that downloads interrupted by shutdown resume on the next start."""
+    print("Testing journal and resume...")
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            journal_path = os.path.join(temp_dir, "journal.json")
+            video = os.path.join(temp_dir, "video.mp4")
+            photo = os.path.join(temp_dir, "photo.jpg")
+            Path(video).touch()
+            Path(photo).touch()
+
+            # First session: two downloads interrupted by quitting
+            manager = DownloadManager(FakeWebView(), journal=DownloadJournal(journal_path))
+            manager.enqueue("https://example.com/video.mp4", video, account_id="account-2")
+            webview = manager.webview
+            webview.downloads[0].response = FakeResponse(500, {"ETag": '"v1"'})
+            webview.downloads[0].emit("received-data", 100)
+            manager.enqueue("blob:https://web.whatsapp.com/1234", photo)
+            manager.cancel_all()
+            assert len(DownloadJournal(journal_path).pending()) == 2
+
+            # Next session: the http download resumes, the blob one is discarded
+            transfers = []
+            def factory(job, progress_callback, done_callback):
+                transfers.append(FakeTransfer(job, progress_callback, done_callback))
+                return transfers[-1]
+
+            finished = []
+            webview = FakeWebView()
+            manager = DownloadManager(webview, journal=DownloadJournal(journal_path),
+                                      resume_factory=factory, finished_callback=finished.append)
+            manager.resume_pending()
+            assert len(transfers) == 1 and transfers[0].started
+            # The resumed transfer knows whose cookies to send and what to expect
+            assert transfers[0].job.account_id == "account-2"
+            assert transfers[0].job.validators == {"etag": '"v1"'}
+            assert webview.downloads == []
+            assert not os.path.exists(photo)
+
+            transfer = transfers[0]
+            Path(transfer.job.part_path).write_bytes(b"v" * 500)
+            transfer.progress_callback(transfer.job, 500, 500)
+            transfer.done_callback(transfer.job, None)
+
+            assert finished[0].state == DownloadJob.COMPLETED
+            assert Path(video).read_bytes() == b"v" * 500
+            assert DownloadJournal(journal_path).pending() == []
+        print("  ✅ Interrupted downloads resumed from the journal")
+        return True
+    except Exception as e:
+        print(f"  ❌ Journal and resume failed: {e}")
+        return False
+
+
+def main():
+    """Run all download manager tests."""
+    print("Download Manager Test Suite")
+    print("=" * 50)
+
+    tests = [
+        ("Concurrency Limit", test_concurrency_limit),
+        ("Download Destination", test_destination),
+        ("Progress Tracking", test_progress_tracking),
+        ("Integrity Check", test_integrity_check),
+        ("Response Validators", test_response_validators),
+        ("Cancellation", test_cancel_all),
+        ("Journal and Resume", test_journal_resume),
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ UNEXPECTED ERROR in {test_name}: {e}")
+            failed += 1
+
+    print("=" * 50)
+    print(f"Results: {passed} passed, {failed} failed")
+
+    if failed == 0:
+        print("🎉 All download manager tests passed!")
+        return 0
+    else:
+        print(f"❌ {failed} test(s) failed")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
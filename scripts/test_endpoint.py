@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test script for the WhatsApp Web endpoint configuration.
+
+This script tests the precedence of the command line, environment and
+settings overrides and the endpoint checks derived from them.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from karere.endpoint import (
+    DEFAULT_WEB_URL, WEB_URL_ENV, get_web_url, set_web_url_override,
+    get_internal_domains, is_on_endpoint
+)
+from karere.link_router import LinkRouter, INTERNAL_DOMAINS
+
+
+class FakeSettings:
+    """Minimal stand-in for Gio.Settings."""
+
+    def __init__(self, web_url=""):
+        self.web_url = web_url
+
+    def get_string(self, key):
+        assert key == "web-url"
+        return self.web_url
+
+
+def test_precedence():
+    """Test command line > environment > settings > default."""
+    print("Testing override precedence...")
+
+    try:
+        os.environ.pop(WEB_URL_ENV, None)
+        set_web_url_override(None)
+        assert get_web_url() == DEFAULT_WEB_URL
+        assert get_web_url(FakeSettings("")) == DEFAULT_WEB_URL
+        assert get_web_url(FakeSettings("localhost:8000")) == "https://localhost:8000"
+
+        os.environ[WEB_URL_ENV] = "http://127.0.0.1:9000/"
+        assert get_web_url(FakeSettings("localhost:8000")) == "http://127.0.0.1:9000/"
+
+        set_web_url_override("http://fixture.test/")
+        assert get_web_url(FakeSettings("localhost:8000")) == "http://fixture.test/"
+        print("  ✅ Overrides applied in order")
+        return True
+    except Exception as e:
+        print(f"  ❌ Precedence failed: {e}")
+        return False
+    finally:
+        os.environ.pop(WEB_URL_ENV, None)
+        set_web_url_override(None)
+
+
+def test_internal_domains():
+    """Test that the endpoint host stays inside the app."""
+    print("Testing internal domains...")
+
+    try:
+        assert get_internal_domains(DEFAULT_WEB_URL) == INTERNAL_DOMAINS
+        domains = get_internal_domains("http://127.0.0.1:8000/")
+        assert "127.0.0.1" in domains
+
+        router = LinkRouter(internal_domains=domains)
+        assert not router.should_open_externally("http://127.0.0.1:8000/static/app.js")
+        assert not router.should_open_externally("https://web.whatsapp.com/")
+        assert router.should_open_externally("https://example.com/")
+        print("  ✅ Endpoint host routed internally")
+        return True
+    except Exception as e:
+        print(f"  ❌ Internal domains failed: {e}")
+        return False
+
+
+def test_is_on_endpoint():
+    """Test the WebView health check against the configured endpoint."""
+    print("Testing endpoint check...")
+
+    try:
+        assert is_on_endpoint("https://web.whatsapp.com/", DEFAULT_WEB_URL)
+        assert is_on_endpoint("https://www.whatsapp.com/download", DEFAULT_WEB_URL)
+        assert not is_on_endpoint("https://example.com/?q=whatsapp.com", DEFAULT_WEB_URL)
+        assert not is_on_endpoint(None, DEFAULT_WEB_URL)
+        assert not is_on_endpoint("about:blank", DEFAULT_WEB_URL)
+
+        fixture = "http://127.0.0.1:8000/"
+        assert is_on_endpoint("http://127.0.0.1:8000/index.html", fixture)
+        assert not is_on_endpoint("https://web.whatsapp.com/", fixture)
+        print("  ✅ Endpoint URIs recognized")
+        return True
+    except Exception as e:
+        print(f"  ❌ Endpoint check failed: {e}")
+        return False
+
+
+def main():
+    """Run all endpoint tests."""
+    print("Endpoint Configuration Test Suite")
+    print("=" * 50)
+
+    tests = [
+        ("Override Precedence", test_precedence),
+        ("Internal Domains", test_internal_domains),
+        ("Endpoint Check", test_is_on_endpoint),
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ UNEXPECTED ERROR in {test_name}: {e}")
+            failed += 1
+
+    print("=" * 50)
+    print(f"Results: {passed} passed, {failed} failed")
+
+    if failed == 0:
+        print("🎉 All endpoint tests passed!")
+        return 0
+    else:
+        print(f"❌ {failed} test(s) failed")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
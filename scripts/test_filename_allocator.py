@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Test script for download filename allocation.
+
+This script tests that unique download filenames are allocated without
+collisions, including for names already present in the directory.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from karere.filename_allocator import FilenameAllocator, split_filename
+
+
+def test_split_filename():
+    """Test splitting filenames into base, suffix and extension."""
+    print("Testing filename splitting...")
+
+    try:
+        assert split_filename("photo_3.jpg") == ("photo", 3, ".jpg")
+        assert split_filename("photo.jpg") == ("photo", None, ".jpg")
+        assert split_filename("photo_03.jpg") == ("photo_03", None, ".jpg")
+        assert split_filename("_3.jpg") == ("_3", None, ".jpg")
+        assert split_filename("archive.tar.gz") == ("archive.tar", None, ".gz")
+        print("  ✅ Filenames split correctly")
+        return True
+    except Exception as e:
+        print(f"  ❌ Filename splitting failed: {e}")
+        return False
+
+
+def test_sequential_allocation():
+    """Test allocating the same name repeatedly."""
+    print("Testing sequential allocation...")
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            allocator = FilenameAllocator(temp_dir)
+            paths = [allocator.allocate("WhatsApp Image.jpg") for _ in range(3)]
+            names = [os.path.basename(p) for p in paths]
+            assert names == ["WhatsApp Image.jpg", "WhatsApp Image_1.jpg", "WhatsApp Image_2.jpg"]
+            assert all(os.path.exists(p) for p in paths)
+        print("  ✅ Names allocated in sequence and reserved on disk")
+        return True
+    except Exception as e:
+        print(f"  ❌ Sequential allocation failed: {e}")
+        return False
+
+
+def test_existing_files():
+    """Test that existing files are indexed by a single scan."""
+    print("Testing allocation with existing files...")
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name in ["clip.mp4", "clip_1.mp4", "clip_1500.mp4", "doc.pdf"]:
+                Path(temp_dir, name).touch()
+
+            allocator = FilenameAllocator(temp_dir)
+            assert os.path.basename(allocator.allocate("clip.mp4")) == "clip_1501.mp4"
+            assert os.path.basename(allocator.allocate("doc.pdf")) == "doc_1.pdf"
+            assert os.path.basename(allocator.allocate("new.txt")) == "new.txt"
+            assert os.path.basename(allocator.allocate("../../etc/passwd")) == "passwd"
+        print("  ✅ Existing names skipped without probing each candidate")
+        return True
+    except Exception as e:
+        print(f"  ❌ Existing file allocation failed: {e}")
+        return False
+
+
+def test_free_bare_name():
+    """Test that a free unsuffixed name is used even when suffixed names exist."""
+    print("Testing free bare names next to suffixed ones...")
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name in ["photo_5.jpg", "IMG_2024.jpg"]:
+                Path(temp_dir, name).touch()
+
+            allocator = FilenameAllocator(temp_dir)
+            assert os.path.basename(allocator.allocate("photo.jpg")) == "photo.jpg"
+            assert os.path.basename(allocator.allocate("IMG.jpg")) == "IMG.jpg"
+
+            # Once the bare name is taken, numbering continues above the highest suffix
+            assert os.path.basename(allocator.allocate("photo.jpg")) == "photo_6.jpg"
+        print("  ✅ Free bare names are not skipped")
+        return True
+    except Exception as e:
+        print(f"  ❌ Bare name allocation failed: {e}")
+        return False
+
+
+def test_external_race():
+    """Test that names created after the scan are not reused."""
+    print("Testing names created after the scan...")
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            allocator = FilenameAllocator(temp_dir)
+            allocator.allocate("voice.ogg")
+
+            # Another process takes the next names behind the allocator's back
+            Path(temp_dir, "voice_1.ogg").write_text("other")
+            Path(temp_dir, "voice_2.ogg").write_text("other")
+
+            path = allocator.allocate("voice.ogg")
+            assert os.path.basename(path) == "voice_3.ogg"
+            assert Path(temp_dir, "voice_1.ogg").read_text() == "other"
+        print("  ✅ Exclusive create prevents collisions")
+        return True
+    except Exception as e:
+        print(f"  ❌ Race handling failed: {e}")
+        return False
+
+
+def test_release():
+    """Test that failed downloads give back their empty reservation."""
+    print("Testing reservation release...")
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            allocator = FilenameAllocator(temp_dir)
+            empty = allocator.allocate("a.bin")
+            partial = allocator.allocate("b.bin")
+            Path(partial).write_bytes(b"partial data")
+
+            allocator.release(empty)
+            allocator.release(partial)
+            assert not os.path.exists(empty)
+            assert os.path.exists(partial)
+        print("  ✅ Only empty reservations are removed")
+        return True
+    except Exception as e:
+        print(f"  ❌ Reservation release failed: {e}")
+        return False
+
+
+def main():
+    """Run all filename allocation tests."""
+    print("Filename Allocation Test Suite")
+    print("=" * 50)
+
+    tests = [
+        ("Filename Splitting", test_split_filename),
+        ("Sequential Allocation", test_sequential_allocation),
+        ("Existing Files", test_existing_files),
+        ("Free Bare Name", test_free_bare_name),
+        ("External Race", test_external_race),
+        ("Reservation Release", test_release),
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ UNEXPECTED ERROR in {test_name}: {e}")
+            failed += 1
+
+    print("=" * 50)
+    print(f"Results: {passed} passed, {failed} failed")
+
+    if failed == 0:
+        print("🎉 All filename allocation tests passed!")
+        return 0
+    else:
+        print(f"❌ {failed} test(s) failed")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
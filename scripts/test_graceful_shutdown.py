@@ -12,6 +12,7 @@ import json
 import signal
 import time
 import subprocess
+import threading
 from pathlib import Path
 
 # Add src to path for testing
@@ -20,6 +21,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 # Set environment variable to avoid GSettings issues
 os.environ['GSETTINGS_BACKEND'] = 'memory'
 
+from karere.shutdown import ShutdownOrchestrator
+from karere.temp_files import TempFileRegistry, TEMP_PREFIX
+
 try:
     from karere.logging_config import setup_logging
     from karere.crash_reporter import get_crash_reporter
@@ -187,49 +191,46 @@ def test_temporary_files_cleanup():
     print("Testing temporary files cleanup...")
     
     try:
-        # Create some test temporary files
-        temp_dir = Path(tempfile.gettempdir())
-        test_files = []
-        
-        for i in range(3):
-            temp_file = temp_dir / f"karere_test_{i}.tmp"
-            temp_file.write_text(f"Test content {i}")
-            test_files.append(temp_file)
-        
-        # Verify files exist
-        for temp_file in test_files:
-            if not temp_file.exists():
-                print(f"  ❌ Test file not created: {temp_file}")
+        with tempfile.TemporaryDirectory() as system_temp:
+            # Another process's file with our prefix must survive
+            foreign_file = Path(system_temp) / "karere_other_process.tmp"
+            foreign_file.write_text("Not ours")
+            
+            registry = TempFileRegistry(parent_dir=system_temp)
+            private_files = [Path(registry.create_file(suffix=".tmp")) for _ in range(3)]
+            view_copy = Path(registry.get_path("crash_test.json"))
+            view_copy.write_text("{}")
+            
+            outside_file = Path(system_temp) / "registered_elsewhere.tmp"
+            outside_file.write_text("Registered")
+            registry.register(str(outside_file))
+            
+            private_dir = Path(registry.directory)
+            if not private_dir.name.startswith(TEMP_PREFIX) or private_dir.parent != Path(system_temp):
+                print(f"  ❌ Unexpected private directory: {private_dir}")
+                return False
+            
+            removed = registry.cleanup()
+            
+            remaining = [p for p in private_files + [view_copy, outside_file, private_dir] if p.exists()]
+            if remaining:
+                print(f"  ❌ Temporary files not cleaned up: {remaining}")
+                return False
+            if removed != 2:
+                print(f"  ❌ Expected 2 removals (directory and registered file), got {removed}")
+                return False
+            if not foreign_file.exists():
+                print("  ❌ Cleanup removed a file it did not create")
                 return False
+            
+            # The registry can be reused after cleanup
+            if not Path(registry.create_file()).parent.exists():
+                print("  ❌ Private directory not recreated")
+                return False
+            registry.cleanup()
         
-        # Mock cleanup - simulate cleanup behavior
-        def mock_cleanup_temporary_files():
-            temp_dir = Path(tempfile.gettempdir())
-            karere_temp_files = temp_dir.glob("karere_test_*.tmp")
-            for temp_file in karere_temp_files:
-                try:
-                    if temp_file.exists():
-                        temp_file.unlink()
-                except Exception:
-                    pass
-        
-        mock_cleanup_temporary_files()
-        
-        # Verify files are cleaned up
-        remaining_files = []
-        for temp_file in test_files:
-            if temp_file.exists():
-                remaining_files.append(temp_file)
-        
-        if remaining_files:
-            print(f"  ❌ Temporary files not cleaned up: {remaining_files}")
-            # Clean up manually
-            for temp_file in remaining_files:
-                temp_file.unlink()
-            return False
-        else:
-            print("  ✅ Temporary files cleanup working")
-            return True
+        print("  ✅ Temporary files cleanup working")
+        return True
             
     except Exception as e:
         print(f"  ❌ Temporary files cleanup test failed: {e}")
@@ -334,6 +335,117 @@ def test_error_handling_during_shutdown():
         return False
 
 
+def test_concurrent_shutdown_steps():
+    """Test that threaded steps overlap with each other and the main thread."""
+    print("Testing concurrent shutdown steps...")
+    
+    try:
+        orchestrator = ShutdownOrchestrator(deadline=2.0)
+        orchestrator.add_step("main", lambda: time.sleep(0.2))
+        orchestrator.add_step("io-1", lambda: time.sleep(0.2), threaded=True)
+        orchestrator.add_step("io-2", lambda: time.sleep(0.2), threaded=True)
+        
+        result = orchestrator.run()
+        
+        if not result.completed:
+            print(f"  ❌ Shutdown did not complete: {result.timed_out}")
+            return False
+        if result.elapsed >= 0.5:
+            print(f"  ❌ Steps ran sequentially: {result.elapsed:.2f}s")
+            return False
+        if set(result.durations) != {"main", "io-1", "io-2"}:
+            print(f"  ❌ Missing step durations: {result.durations}")
+            return False
+        
+        print(f"  ✅ Three 0.2s steps finished in {result.elapsed:.2f}s")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Concurrent shutdown test failed: {e}")
+        return False
+
+
+def test_shutdown_step_ordering():
+    """Test that a threaded step waits for the main-thread step it depends on."""
+    print("Testing shutdown step ordering...")
+    
+    try:
+        order = []
+        orchestrator = ShutdownOrchestrator(deadline=2.0)
+        orchestrator.add_step("window-state", lambda: (time.sleep(0.1), order.append("window-state")))
+        orchestrator.add_step("settings", lambda: order.append("settings"), threaded=True, after="window-state")
+        
+        result = orchestrator.run()
+        
+        if order != ["window-state", "settings"] or not result.completed:
+            print(f"  ❌ Unexpected order: {order}")
+            return False
+        
+        print("  ✅ Settings synced after window state was saved")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Shutdown ordering test failed: {e}")
+        return False
+
+
+def test_shutdown_deadline():
+    """Test that a hung step does not hold shutdown past the deadline."""
+    print("Testing shutdown deadline...")
+    
+    try:
+        hang = threading.Event()
+        orchestrator = ShutdownOrchestrator(deadline=0.3)
+        orchestrator.add_step("hung-io", hang.wait, threaded=True)
+        orchestrator.add_step("slow-main", lambda: time.sleep(0.4))
+        orchestrator.add_step("late-main", lambda: None)
+        orchestrator.add_step("failing", lambda: 1 / 0)
+        
+        result = orchestrator.run()
+        hang.set()
+        
+        if result.completed:
+            print("  ❌ Deadline not reported as exceeded")
+            return False
+        if result.timed_out != ["hung-io"] or result.skipped != ["late-main", "failing"]:
+            print(f"  ❌ Unexpected result: timed out {result.timed_out}, skipped {result.skipped}")
+            return False
+        if result.elapsed > 0.6:
+            print(f"  ❌ Shutdown took too long: {result.elapsed:.2f}s")
+            return False
+        
+        print(f"  ✅ Gave up after {result.elapsed:.2f}s with hung step still running")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Shutdown deadline test failed: {e}")
+        return False
+
+
+def test_shutdown_step_errors():
+    """Test that a failing step is recorded without stopping the others."""
+    print("Testing shutdown step errors...")
+    
+    try:
+        ran = []
+        orchestrator = ShutdownOrchestrator(deadline=1.0)
+        orchestrator.add_step("failing", lambda: 1 / 0)
+        orchestrator.add_step("next", lambda: ran.append("next"))
+        
+        result = orchestrator.run()
+        
+        if "failing" not in result.failed or ran != ["next"] or not result.completed:
+            print(f"  ❌ Unexpected result: failed {result.failed}, ran {ran}")
+            return False
+        
+        print("  ✅ Error recorded and remaining steps ran")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Shutdown step errors test failed: {e}")
+        return False
+
+
 def main():
     """Run all graceful shutdown tests."""
     print("Graceful Shutdown Test Suite")
@@ -348,6 +460,10 @@ def main():
         ("Signal Handling", test_signal_handling),
         ("Logging Shutdown", test_logging_shutdown),
         ("Error Handling During Shutdown", test_error_handling_during_shutdown),
+        ("Concurrent Shutdown Steps", test_concurrent_shutdown_steps),
+        ("Shutdown Step Ordering", test_shutdown_step_ordering),
+        ("Shutdown Deadline", test_shutdown_deadline),
+        ("Shutdown Step Errors", test_shutdown_step_errors),
     ]
     
     passed = 0
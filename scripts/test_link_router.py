@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Test script for link routing.
+
+This script tests that navigations are routed to the WebView or the
+external browser as expected.
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from karere.link_router import LinkRouter, split_uri
+
+
+def test_uri_splitting():
+    """Test scheme and host extraction."""
+    print("Testing URI splitting...")
+
+    try:
+        assert split_uri("https://Web.WhatsApp.com/send?x=1") == ("https", "web.whatsapp.com")
+        assert split_uri("https://user:pw@example.com:8443/path") == ("https", "example.com")
+        assert split_uri("http://[::1]:8080/") == ("http", "[::1]")
+        assert split_uri("https://example.com.#frag") == ("https", "example.com")
+        assert split_uri("mailto:someone@example.com") == ("mailto", "")
+        assert split_uri("/relative/path") == ("", "")
+        print("  ✅ URIs split correctly")
+        return True
+    except Exception as e:
+        print(f"  ❌ URI splitting failed: {e}")
+        return False
+
+
+def test_builtin_routing():
+    """Test routing with the built-in WhatsApp domains."""
+    print("Testing built-in routing...")
+
+    try:
+        router = LinkRouter()
+        assert router.should_open_externally("https://web.whatsapp.com/") is False
+        assert router.should_open_externally("https://media.fbsb1-1.fna.whatsapp.net/") is True
+        assert router.should_open_externally("https://mmg.pps.whatsapp.net/v/t62") is False
+        assert router.should_open_externally("https://faq.whatsapp.com/") is False
+        assert router.should_open_externally("https://notwhatsapp.com/") is True
+        assert router.should_open_externally("https://example.com/") is True
+        assert router.should_open_externally("blob:https://web.whatsapp.com/abc") is False
+        assert router.should_open_externally("data:text/plain,hi") is False
+        assert router.should_open_externally("/relative") is False
+        assert router.should_open_externally("") is False
+        assert router.should_open_externally(None) is False
+        print("  ✅ Built-in domains routed correctly")
+        return True
+    except Exception as e:
+        print(f"  ❌ Built-in routing failed: {e}")
+        return False
+
+
+def test_user_rules():
+    """Test user allow/deny rules and their precedence."""
+    print("Testing user rules...")
+
+    try:
+        router = LinkRouter(
+            user_internal_domains=["*.Example.org", ""],
+            user_external_domains=["faq.whatsapp.com", "secret.example.org"]
+        )
+        assert router.should_open_externally("https://docs.example.org/") is False
+        assert router.should_open_externally("https://secret.example.org/") is True
+        assert router.should_open_externally("https://faq.whatsapp.com/help") is True
+        assert router.should_open_externally("https://web.whatsapp.com/") is False
+
+        # Changing the rules invalidates cached decisions
+        router.set_user_rules([], [])
+        assert router.should_open_externally("https://docs.example.org/") is True
+        assert router.should_open_externally("https://faq.whatsapp.com/help") is False
+        print("  ✅ User rules applied with correct precedence")
+        return True
+    except Exception as e:
+        print(f"  ❌ User rules failed: {e}")
+        return False
+
+
+def test_decision_cache():
+    """Test that the decision cache stays bounded."""
+    print("Testing decision cache...")
+
+    try:
+        router = LinkRouter(cache_size=8)
+        for i in range(50):
+            router.should_open_externally(f"https://host{i}.example.com/")
+        assert len(router._cache) == 8
+
+        # Recently used entries survive eviction
+        router.should_open_externally("https://host45.example.com/page")
+        router.should_open_externally("https://new.example.com/")
+        assert ("https", "host45.example.com") in router._cache
+        assert ("https", "host42.example.com") not in router._cache
+        print("  ✅ Cache bounded with LRU eviction")
+        return True
+    except Exception as e:
+        print(f"  ❌ Decision cache failed: {e}")
+        return False
+
+
+def main():
+    """Run all link routing tests."""
+    print("Link Routing Test Suite")
+    print("=" * 50)
+
+    tests = [
+        ("URI Splitting", test_uri_splitting),
+        ("Built-in Routing", test_builtin_routing),
+        ("User Rules", test_user_rules),
+        ("Decision Cache", test_decision_cache),
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ UNEXPECTED ERROR in {test_name}: {e}")
+            failed += 1
+
+    print("=" * 50)
+    print(f"Results: {passed} passed, {failed} failed")
+
+    if failed == 0:
+        print("🎉 All link routing tests passed!")
+        return 0
+    else:
+        print(f"❌ {failed} test(s) failed")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Test script for download media processing.
+
+This script tests hashing, EXIF stripping and media-type sorting used by
+the post-download pipeline.
+"""
+
+import os
+import sys
+import zlib
+import hashlib
+import tempfile
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from karere.media_processing import (
+    hash_file, strip_exif, strip_jpeg_exif, strip_png_exif, sort_by_media_type,
+    EXIF_HEADER, JPEG_SIGNATURE, PNG_SIGNATURE
+)
+from karere.filename_allocator import FilenameAllocator
+
+
+def jpeg_segment(marker, payload):
+    return bytes([0xFF, marker]) + (len(payload) + 2).to_bytes(2, 'big') + payload
+
+
+def build_jpeg(with_exif=True):
+    """Build a minimal JPEG-structured byte string."""
+    parts = [JPEG_SIGNATURE, jpeg_segment(0xE0, b"JFIF\x00\x01\x01")]
+    if with_exif:
+        parts.append(jpeg_segment(0xE1, EXIF_HEADER + b"GPS secret location"))
+    parts.append(jpeg_segment(0xE1, b"http://ns.adobe.com/xap/1.0/\x00<xmp/>"))
+    parts.append(jpeg_segment(0xDA, b"\x00\x01") + b"\xff\x00scan-data\xff\xd9")
+    return b"".join(parts)
+
+
+def png_chunk(chunk_type, payload):
+    crc = zlib.crc32(chunk_type + payload).to_bytes(4, 'big')
+    return len(payload).to_bytes(4, 'big') + chunk_type + payload + crc
+
+
+def build_png(with_exif=True):
+    """Build a minimal PNG-structured byte string."""
+    parts = [PNG_SIGNATURE, png_chunk(b"IHDR", b"\x00" * 13)]
+    if with_exif:
+        parts.append(png_chunk(b"eXIf", b"MM\x00*GPS secret location"))
+    parts.append(png_chunk(b"IDAT", b"pixels"))
+    parts.append(png_chunk(b"IEND", b""))
+    return b"".join(parts)
+
+
+def test_hashing():
+    """Test chunked file hashing."""
+    print("Testing content hashing...")
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir, "data.bin")
+            data = os.urandom(3 * 1024 * 1024 + 17)
+            path.write_bytes(data)
+            assert hash_file(str(path)) == hashlib.sha256(data).hexdigest()
+        print("  ✅ Hash matches across chunk boundaries")
+        return True
+    except Exception as e:
+        print(f"  ❌ Content hashing failed: {e}")
+        return False
+
+
+def test_jpeg_exif_stripping():
+    """Test EXIF removal from JPEG data."""
+    print("Testing JPEG EXIF stripping...")
+
+    try:
+        stripped = strip_jpeg_exif(build_jpeg())
+        assert stripped == build_jpeg(with_exif=False)
+        assert b"secret" not in stripped
+        assert b"<xmp/>" in stripped
+        assert strip_jpeg_exif(build_jpeg(with_exif=False)) is None
+        assert strip_jpeg_exif(b"not a jpeg") is None
+        print("  ✅ EXIF segment removed, other segments kept")
+        return True
+    except Exception as e:
+        print(f"  ❌ JPEG EXIF stripping failed: {e}")
+        return False
+
+
+def test_png_exif_stripping():
+    """Test eXIf chunk removal from PNG data."""
+    print("Testing PNG EXIF stripping...")
+
+    try:
+        stripped = strip_png_exif(build_png())
+        assert stripped == build_png(with_exif=False)
+        assert strip_png_exif(build_png(with_exif=False)) is None
+        print("  ✅ eXIf chunk removed")
+        return True
+    except Exception as e:
+        print(f"  ❌ PNG EXIF stripping failed: {e}")
+        return False
+
+
+def test_strip_in_place():
+    """Test stripping a file on disk."""
+    print("Testing in-place stripping...")
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir, "photo.jpg")
+            path.write_bytes(build_jpeg())
+            assert strip_exif(str(path)) is True
+            assert path.read_bytes() == build_jpeg(with_exif=False)
+            assert strip_exif(str(path)) is False
+            assert os.listdir(temp_dir) == ["photo.jpg"]
+        print("  ✅ File rewritten atomically")
+        return True
+    except Exception as e:
+        print(f"  ❌ In-place stripping failed: {e}")
+        return False
+
+
+def test_sort_by_media_type():
+    """Test moving files into media type folders."""
+    print("Testing media type sorting...")
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name in ["a.jpg", "b.mp4", "c.pdf", "d.jpg"]:
+                Path(temp_dir, name).write_text(name)
+            Path(temp_dir, "Images").mkdir()
+            Path(temp_dir, "Images", "d.jpg").write_text("existing")
+
+            image = sort_by_media_type(os.path.join(temp_dir, "a.jpg"))
+            video = sort_by_media_type(os.path.join(temp_dir, "b.mp4"))
+            document = sort_by_media_type(os.path.join(temp_dir, "c.pdf"))
+            renamed = sort_by_media_type(os.path.join(temp_dir, "d.jpg"))
+
+            assert image == os.path.join(temp_dir, "Images", "a.jpg")
+            assert video == os.path.join(temp_dir, "Videos", "b.mp4")
+            assert document == os.path.join(temp_dir, "Documents", "c.pdf")
+            assert renamed == os.path.join(temp_dir, "Images", "d_1.jpg")
+            assert Path(renamed).read_text() == "d.jpg"
+            assert Path(temp_dir, "Images", "d.jpg").read_text() == "existing"
+            assert not Path(temp_dir, "a.jpg").exists()
+
+            # A shared allocator reuses its scan and skips names it handed out
+            allocators = {}
+            def get_allocator(directory):
+                return allocators.setdefault(directory, FilenameAllocator(directory))
+            for name in ["e.jpg", "f.jpg"]:
+                Path(temp_dir, name).write_text(name)
+                Path(temp_dir, "Images", name).write_text("existing")
+            assert sort_by_media_type(os.path.join(temp_dir, "e.jpg"), get_allocator).endswith("e_1.jpg")
+            assert sort_by_media_type(os.path.join(temp_dir, "f.jpg"), get_allocator).endswith("f_1.jpg")
+            assert len(allocators) == 1
+        print("  ✅ Files moved without overwriting")
+        return True
+    except Exception as e:
+        print(f"  ❌ Media type sorting failed: {e}")
+        return False
+
+
+def main():
+    """Run all media processing tests."""
+    print("Media Processing Test Suite")
+    print("=" * 50)
+
+    tests = [
+        ("Content Hashing", test_hashing),
+        ("JPEG EXIF Stripping", test_jpeg_exif_stripping),
+        ("PNG EXIF Stripping", test_png_exif_stripping),
+        ("In-place Stripping", test_strip_in_place),
+        ("Media Type Sorting", test_sort_by_media_type),
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ UNEXPECTED ERROR in {test_name}: {e}")
+            failed += 1
+
+    print("=" * 50)
+    print(f"Results: {passed} passed, {failed} failed")
+
+    if failed == 0:
+        print("🎉 All media processing tests passed!")
+        return 0
+    else:
+        print(f"❌ {failed} test(s) failed")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test script for runtime metrics.
+
+This script tests the counters, gauges and timings exposed through the
+D-Bus health interface.
+"""
+
+import sys
+import json
+import threading
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from karere.metrics import Metrics, get_metrics, get_rss_bytes
+
+
+def test_counters_and_gauges():
+    """Test counter increments and gauge updates."""
+    print("Testing counters and gauges...")
+
+    try:
+        metrics = Metrics()
+        assert metrics.get_counter("notifications_sent") == 0
+        metrics.increment("notifications_sent")
+        metrics.increment("notifications_sent", 2)
+        assert metrics.get_counter("notifications_sent") == 3
+
+        assert metrics.get_gauge("main_loop_lag", -1.0) == -1.0
+        metrics.set_gauge("main_loop_lag", 0.25)
+        assert metrics.get_gauge("main_loop_lag") == 0.25
+        print("  ✅ Counters and gauges updated")
+        return True
+    except Exception as e:
+        print(f"  ❌ Counters and gauges failed: {e}")
+        return False
+
+
+def test_timings():
+    """Test timing summaries."""
+    print("Testing timings...")
+
+    try:
+        metrics = Metrics()
+        assert metrics.get_timing("page_load").count == 0
+        for seconds in (1.0, 3.0, 2.0):
+            metrics.record_timing("page_load", seconds)
+
+        timing = metrics.get_timing("page_load")
+        assert timing.count == 3
+        assert timing.last == 2.0
+        assert timing.maximum == 3.0
+        assert timing.average == 2.0
+        print("  ✅ Timing count, last, average and max tracked")
+        return True
+    except Exception as e:
+        print(f"  ❌ Timings failed: {e}")
+        return False
+
+
+def test_thread_safety_and_snapshot():
+    """Test concurrent updates and JSON-serializable snapshots."""
+    print("Testing concurrent updates and snapshot...")
+
+    try:
+        metrics = Metrics()
+
+        def worker():
+            for _ in range(1000):
+                metrics.increment("downloads_processed")
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        metrics.record_timing("notification_dispatch", 0.004)
+        snapshot = json.loads(json.dumps(metrics.snapshot()))
+        assert snapshot["counters"]["downloads_processed"] == 8000
+        assert snapshot["timings"]["notification_dispatch"]["count"] == 1
+        assert get_metrics() is get_metrics()
+        assert get_rss_bytes() > 0
+        print("  ✅ No lost updates; snapshot serializes")
+        return True
+    except Exception as e:
+        print(f"  ❌ Concurrent updates failed: {e}")
+        return False
+
+
+def main():
+    """Run all metrics tests."""
+    print("Metrics Test Suite")
+    print("=" * 50)
+
+    tests = [
+        ("Counters and Gauges", test_counters_and_gauges),
+        ("Timings", test_timings),
+        ("Thread Safety and Snapshot", test_thread_safety_and_snapshot),
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ UNEXPECTED ERROR in {test_name}: {e}")
+            failed += 1
+
+    print("=" * 50)
+    print(f"Results: {passed} passed, {failed} failed")
+
+    if failed == 0:
+        print("🎉 All metrics tests passed!")
+        return 0
+    else:
+        print(f"❌ {failed} test(s) failed")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test script for the runtime profiler.
+
+This script tests starting and stopping cProfile and tracemalloc and the
+files written for each profiling session.
+"""
+
+import os
+import sys
+import pstats
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from karere.profiler import RuntimeProfiler
+from karere._build_config import should_allow_runtime_profiling, is_development_build
+
+
+def busy_work():
+    """Allocate and compute something worth profiling."""
+    return [str(i) * 10 for i in range(20000)]
+
+
+def test_profile_session():
+    """Test that a session writes a cProfile file and a memory snapshot."""
+    print("Testing profiling session...")
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            profiler = RuntimeProfiler(os.path.join(temp_dir, "profiles"), top_allocations=5)
+            assert not profiler.is_running
+            assert profiler.start()
+            assert profiler.is_running
+            data = busy_work()
+            paths = profiler.stop()
+            assert not profiler.is_running
+            assert not tracemalloc.is_tracing()
+
+            stats = pstats.Stats(paths["profile"])
+            assert any(func[2] == "busy_work" for func in stats.stats)
+
+            lines = Path(paths["memory"]).read_text().splitlines()
+            entries = [line for line in lines if line.startswith("#")]
+            assert 0 < len(entries) <= 5
+            del data
+        print("  ✅ Profile and allocation snapshot written")
+        return True
+    except Exception as e:
+        print(f"  ❌ Profiling session failed: {e}")
+        return False
+
+
+def test_start_stop_idempotent():
+    """Test that repeated start and stop calls are harmless."""
+    print("Testing repeated start and stop...")
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            profiler = RuntimeProfiler(temp_dir)
+            assert profiler.stop() == {}
+            assert profiler.start()
+            assert not profiler.start()
+            assert profiler.stop()
+            assert profiler.stop() == {}
+        print("  ✅ Repeated calls ignored")
+        return True
+    except Exception as e:
+        print(f"  ❌ Repeated start and stop failed: {e}")
+        return False
+
+
+def test_existing_tracemalloc_left_running():
+    """Test that tracemalloc started elsewhere is not stopped."""
+    print("Testing externally started tracemalloc...")
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            tracemalloc.start()
+            try:
+                profiler = RuntimeProfiler(temp_dir)
+                profiler.start()
+                paths = profiler.stop()
+                assert "memory" in paths
+                assert tracemalloc.is_tracing()
+            finally:
+                tracemalloc.stop()
+        print("  ✅ External tracemalloc kept running")
+        return True
+    except Exception as e:
+        print(f"  ❌ External tracemalloc failed: {e}")
+        return False
+
+
+def test_build_gating():
+    """Test that production builds need the explicit setting."""
+    print("Testing build gating...")
+
+    try:
+        assert should_allow_runtime_profiling(True)
+        assert should_allow_runtime_profiling(False) == is_development_build()
+
+        os.environ['KARERE_PRODUCTION'] = '1'
+        try:
+            assert not should_allow_runtime_profiling(False)
+            assert should_allow_runtime_profiling(True)
+        finally:
+            del os.environ['KARERE_PRODUCTION']
+        print("  ✅ Production requires allow-runtime-profiling")
+        return True
+    except Exception as e:
+        print(f"  ❌ Build gating failed: {e}")
+        return False
+
+
+def main():
+    """Run all profiler tests."""
+    print("Runtime Profiler Test Suite")
+    print("=" * 50)
+
+    tests = [
+        ("Profiling Session", test_profile_session),
+        ("Repeated Start and Stop", test_start_stop_idempotent),
+        ("External Tracemalloc", test_existing_tracemalloc_left_running),
+        ("Build Gating", test_build_gating),
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ UNEXPECTED ERROR in {test_name}: {e}")
+            failed += 1
+
+    print("=" * 50)
+    print(f"Results: {passed} passed, {failed} failed")
+
+    if failed == 0:
+        print("🎉 All profiler tests passed!")
+        return 0
+    else:
+        print(f"❌ {failed} test(s) failed")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
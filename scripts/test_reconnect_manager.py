@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Test script for connectivity-aware reconnection.
+
+This script tests load error classification, the jittered exponential
+backoff and how network changes affect a pending reconnect. Without
+PyGObject, small stand-ins for the Gio, GLib and WebKit names the manager
+uses are installed, so the suite runs anywhere.
+"""
+
+import sys
+import types
+import random
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+
+def install_fake_gi():
+    """Provide the Gio, GLib and WebKit names used by reconnect_manager."""
+    def enum(name, *members):
+        return type(name, (), {member: member for member in members})
+
+    Gio = types.SimpleNamespace(
+        IOErrorEnum=enum("IOErrorEnum", "NETWORK_UNREACHABLE", "HOST_UNREACHABLE",
+                         "CONNECTION_REFUSED", "CONNECTION_CLOSED", "TIMED_OUT",
+                         "BROKEN_PIPE", "NOT_CONNECTED", "PERMISSION_DENIED"),
+        NetworkConnectivity=enum("NetworkConnectivity", "LOCAL", "LIMITED", "PORTAL", "FULL"),
+        ResolverError=enum("ResolverError", "NOT_FOUND"),
+        NetworkMonitor=types.SimpleNamespace(get_default=lambda: FakeNetworkMonitor()),
+        io_error_quark=lambda: "g-io-error-quark",
+        resolver_error_quark=lambda: "g-resolver-error-quark",
+    )
+    GLib = types.SimpleNamespace(
+        quark_to_string=lambda quark: quark,
+        timeout_add=lambda delay_ms, callback: 0,
+        source_remove=lambda source_id: True,
+    )
+    WebKit = types.SimpleNamespace(
+        NetworkError=enum("NetworkError", "FAILED", "TRANSPORT", "UNKNOWN_PROTOCOL",
+                          "CANCELLED", "FILE_DOES_NOT_EXIST"),
+        PolicyError=enum("PolicyError", "FRAME_LOAD_INTERRUPTED_BY_POLICY_CHANGE"),
+        network_error_quark=lambda: "WebKitNetworkError",
+        policy_error_quark=lambda: "WebKitPolicyError",
+    )
+
+    gi = types.ModuleType("gi")
+    gi.require_version = lambda namespace, version: None
+    repository = types.ModuleType("gi.repository")
+    repository.Gio, repository.GLib, repository.WebKit = Gio, GLib, WebKit
+    gi.repository = repository
+    sys.modules["gi"] = gi
+    sys.modules["gi.repository"] = repository
+
+
+try:
+    import gi
+except ImportError:
+    print("PyGObject not available, using stand-ins for Gio, GLib and WebKit")
+    install_fake_gi()
+
+from karere import reconnect_manager
+from karere.reconnect_manager import ReconnectManager
+
+Gio = reconnect_manager.Gio
+GLib = reconnect_manager.GLib
+WebKit = reconnect_manager.WebKit
+
+
+class FakeError:
+    """GError stand-in with a domain and a code."""
+
+    def __init__(self, quark, code):
+        self.domain = GLib.quark_to_string(quark)
+        self.code = code
+
+    def matches(self, quark, code):
+        return self.domain == GLib.quark_to_string(quark) and self.code == code
+
+
+class FakeNetworkMonitor:
+    """Network monitor with controllable connectivity."""
+
+    def __init__(self, online=True):
+        self.online = online
+
+    def get_network_available(self):
+        return self.online
+
+    def get_connectivity(self):
+        return Gio.NetworkConnectivity.FULL if self.online else Gio.NetworkConnectivity.LOCAL
+
+    def connect(self, signal, callback):
+        return 1
+
+    def disconnect(self, handler_id):
+        pass
+
+
+class ScheduledTimeouts:
+    """Records GLib.timeout_add calls instead of running them."""
+
+    def __init__(self):
+        self.delays = []
+        self.removed = []
+        self._original_add = reconnect_manager.GLib.timeout_add
+        self._original_remove = reconnect_manager.GLib.source_remove
+
+    def __enter__(self):
+        reconnect_manager.GLib.timeout_add = self.add
+        reconnect_manager.GLib.source_remove = self.removed.append
+        return self
+
+    def __exit__(self, *exc_info):
+        reconnect_manager.GLib.timeout_add = self._original_add
+        reconnect_manager.GLib.source_remove = self._original_remove
+
+    def add(self, delay_ms, callback):
+        self.delays.append(delay_ms)
+        return len(self.delays)
+
+
+def create_manager(online=True):
+    """Create a manager whose reloads are counted."""
+    reloads = []
+    manager = ReconnectManager(lambda: reloads.append(True))
+    manager.network_monitor.disconnect(manager._network_handler_id)
+    manager._network_handler_id = None
+    manager.network_monitor = FakeNetworkMonitor(online)
+    return manager, reloads
+
+
+def network_error(code):
+    return FakeError(WebKit.network_error_quark(), code)
+
+
+def test_classify_error():
+    """Test classification by GError domain and code."""
+    print("Testing error classification...")
+
+    try:
+        manager, _ = create_manager()
+        assert manager.classify_error(network_error(WebKit.NetworkError.CANCELLED)) == "ignore"
+        assert manager.classify_error(network_error(WebKit.NetworkError.FAILED)) == "retry"
+        assert manager.classify_error(network_error(WebKit.NetworkError.UNKNOWN_PROTOCOL)) == "fatal"
+
+        io_error = FakeError(Gio.io_error_quark(), Gio.IOErrorEnum.TIMED_OUT)
+        assert manager.classify_error(io_error) == "retry"
+        io_error = FakeError(Gio.io_error_quark(), Gio.IOErrorEnum.PERMISSION_DENIED)
+        assert manager.classify_error(io_error) == "fatal"
+
+        resolver_error = FakeError(Gio.resolver_error_quark(), Gio.ResolverError.NOT_FOUND)
+        assert manager.classify_error(resolver_error) == "retry"
+        print("  ✅ Errors classified")
+        return True
+    except Exception as e:
+        print(f"  ❌ Classification failed: {e}")
+        return False
+
+
+def test_backoff():
+    """Test that retry delays grow exponentially with jitter up to the maximum."""
+    print("Testing jittered backoff...")
+
+    try:
+        random.seed(1)
+        manager, _ = create_manager()
+        with ScheduledTimeouts() as timeouts:
+            for _ in range(12):
+                manager.on_load_failed(network_error(WebKit.NetworkError.FAILED))
+
+        for attempt, delay_ms in enumerate(timeouts.delays):
+            ceiling = min(ReconnectManager.MAX_DELAY, ReconnectManager.BASE_DELAY * 2 ** attempt) * 1000
+            assert ceiling / 2 <= delay_ms <= ceiling, f"attempt {attempt}: {delay_ms}ms"
+        assert max(timeouts.delays) <= ReconnectManager.MAX_DELAY * 1000
+
+        manager.on_load_committed()
+        assert manager.attempt == 0
+        print("  ✅ Backoff grows with jitter and resets")
+        return True
+    except Exception as e:
+        print(f"  ❌ Backoff failed: {e}")
+        return False
+
+
+def test_network_changes():
+    """Test that only a return from offline skips the backoff."""
+    print("Testing network change handling...")
+
+    try:
+        manager, reloads = create_manager()
+        with ScheduledTimeouts() as timeouts:
+            manager.on_load_failed(network_error(WebKit.NetworkError.FAILED))
+            assert len(timeouts.delays) == 1
+
+            # Route or VPN change while still online keeps the pending retry
+            manager._on_network_changed(manager.network_monitor, True)
+            assert not reloads
+            assert manager._retry_source_id
+
+            # Going offline cancels the retry until connectivity returns
+            manager.network_monitor.online = False
+            manager._on_network_changed(manager.network_monitor, False)
+            assert manager._waiting_for_network and not manager._retry_source_id
+
+            manager.network_monitor.online = True
+            manager._on_network_changed(manager.network_monitor, True)
+            assert len(reloads) == 1
+            assert not manager._waiting_for_network
+        print("  ✅ Reloads at once only when coming back online")
+        return True
+    except Exception as e:
+        print(f"  ❌ Network change handling failed: {e}")
+        return False
+
+
+def main():
+    """Run all reconnect manager tests."""
+    print("Reconnect Manager Test Suite")
+    print("=" * 50)
+
+    tests = [
+        ("Error Classification", test_classify_error),
+        ("Backoff", test_backoff),
+        ("Network Changes", test_network_changes),
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ UNEXPECTED ERROR in {test_name}: {e}")
+            failed += 1
+
+    print("=" * 50)
+    print(f"Results: {passed} passed, {failed} failed")
+
+    if failed == 0:
+        print("🎉 All reconnect manager tests passed!")
+        return 0
+    else:
+        print(f"❌ {failed} test(s) failed")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Test script for the spell checking dictionary catalog.
+
+This script tests dictionary discovery, the mtime-keyed cache and the
+validation of requested languages.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from karere.spell_dictionaries import DictionaryCatalog, normalize_language, scan_directories
+
+
+def install_dictionary(directory, name, affix=True):
+    """Create an empty hunspell dictionary."""
+    Path(directory, f"{name}.dic").write_text("1\nword\n")
+    if affix:
+        Path(directory, f"{name}.aff").write_text("SET UTF-8\n")
+
+
+def test_normalize_language():
+    """Test normalization of locale names and language tags."""
+    print("Testing language normalization...")
+
+    try:
+        assert normalize_language("en_US.UTF-8") == "en_US"
+        assert normalize_language("de-de") == "de_DE"
+        assert normalize_language("ca_ES@valencia") == "ca_ES"
+        assert normalize_language("PT") == "pt"
+        print("  ✅ Locale names normalized")
+        return True
+    except Exception as e:
+        print(f"  ❌ Language normalization failed: {e}")
+        return False
+
+
+def test_scan_directories():
+    """Test that only complete dictionaries are found."""
+    print("Testing dictionary scan...")
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            system = Path(temp_dir, "hunspell")
+            user = Path(temp_dir, "user")
+            system.mkdir()
+            user.mkdir()
+            install_dictionary(system, "en_US")
+            install_dictionary(system, "fr_FR", affix=False)
+            install_dictionary(user, "pt")
+
+            languages = scan_directories([str(system), str(user), str(Path(temp_dir, "missing"))])
+            assert languages == {"en_US", "pt"}
+        print("  ✅ Dictionaries with .dic and .aff found")
+        return True
+    except Exception as e:
+        print(f"  ❌ Dictionary scan failed: {e}")
+        return False
+
+
+def test_cache_keyed_on_mtime():
+    """Test that the cache is reused until a directory changes."""
+    print("Testing catalog cache...")
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dictionaries = Path(temp_dir, "hunspell")
+            dictionaries.mkdir()
+            install_dictionary(dictionaries, "en_US")
+            cache_path = os.path.join(temp_dir, "cache", "spell-dictionaries.json")
+
+            assert DictionaryCatalog([str(dictionaries)], cache_path).load() == {"en_US"}
+            assert os.path.exists(cache_path)
+
+            # A cached result is used while the directory is unchanged
+            Path(cache_path).write_text(Path(cache_path).read_text().replace("en_US", "xx_XX"))
+            assert DictionaryCatalog([str(dictionaries)], cache_path).load() == {"xx_XX"}
+
+            # Installing a dictionary changes the mtime and triggers a rescan
+            install_dictionary(dictionaries, "de_DE")
+            stat = os.stat(dictionaries)
+            os.utime(dictionaries, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            assert DictionaryCatalog([str(dictionaries)], cache_path).load() == {"en_US", "de_DE"}
+        print("  ✅ Cache reused until directories change")
+        return True
+    except Exception as e:
+        print(f"  ❌ Catalog cache failed: {e}")
+        return False
+
+
+def test_resolve_languages():
+    """Test validation of requested languages."""
+    print("Testing language resolution...")
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            install_dictionary(temp_dir, "en_US")
+            install_dictionary(temp_dir, "en_GB")
+            install_dictionary(temp_dir, "de_DE")
+            install_dictionary(temp_dir, "pt")
+            catalog = DictionaryCatalog([temp_dir], os.path.join(temp_dir, "cache.json"))
+
+            # An empty catalog passes the languages through for enchant
+            assert catalog.resolve(["en-us"]) == (["en-us"], [])
+
+            catalog.load()
+            assert catalog.resolve(["en_US"]) == (["en_US"], [])
+            assert catalog.resolve(["de"]) == (["de_DE"], [])
+            assert catalog.resolve(["pt_BR"]) == (["pt"], [])
+            assert catalog.resolve(["en-gb", "en_GB", "xx_YY"]) == (["en_GB"], ["xx_YY"])
+            # Nothing matched: still requested, still reported
+            assert catalog.resolve(["xx_YY"]) == (["xx_YY"], ["xx_YY"])
+        print("  ✅ Missing languages reported, variants matched, unmatched passed through")
+        return True
+    except Exception as e:
+        print(f"  ❌ Language resolution failed: {e}")
+        return False
+
+
+def test_load_async():
+    """Test loading on a worker thread with one scan for concurrent requests."""
+    print("Testing asynchronous loading...")
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            install_dictionary(temp_dir, "es_ES")
+            catalog = DictionaryCatalog([temp_dir], os.path.join(temp_dir, "cache.json"))
+            results = []
+            done = threading.Event()
+
+            def callback(languages):
+                results.append((languages, threading.current_thread() is threading.main_thread()))
+                if len(results) == 2:
+                    done.set()
+
+            catalog.load_async(callback)
+            catalog.load_async(callback)
+            assert done.wait(5)
+            assert all(languages == {"es_ES"} and not on_main for languages, on_main in results)
+
+            # Once loaded, callbacks are dispatched immediately
+            catalog.load_async(callback)
+            assert len(results) == 3
+        print("  ✅ Catalog loaded off the main thread")
+        return True
+    except Exception as e:
+        print(f"  ❌ Asynchronous loading failed: {e}")
+        return False
+
+
+def main():
+    """Run all dictionary catalog tests."""
+    print("Spell Checking Dictionary Test Suite")
+    print("=" * 50)
+
+    tests = [
+        ("Language Normalization", test_normalize_language),
+        ("Dictionary Scan", test_scan_directories),
+        ("Catalog Cache", test_cache_keyed_on_mtime),
+        ("Language Resolution", test_resolve_languages),
+        ("Asynchronous Loading", test_load_async),
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ UNEXPECTED ERROR in {test_name}: {e}")
+            failed += 1
+
+    print("=" * 50)
+    print(f"Results: {passed} passed, {failed} failed")
+
+    if failed == 0:
+        print("🎉 All dictionary catalog tests passed!")
+        return 0
+    else:
+        print(f"❌ {failed} test(s) failed")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -138,6 +138,24 @@ def should_show_developer_settings():
     return True
 
 
+def should_allow_runtime_profiling(setting_enabled=False):
+    """
+    Determine if runtime profiling may be started.
+    
+    Args:
+        setting_enabled: Value of the allow-runtime-profiling setting
+    
+    Returns:
+        bool: True if profiling may be started, False otherwise
+    """
+    # Always allow in development builds
+    if is_development_build():
+        return True
+    
+    # Production builds require the explicit setting
+    return bool(setting_enabled)
+
+
 def get_default_log_level():
     """
     Get the default log level for the current build.
@@ -0,0 +1,184 @@
+"""
+WhatsApp account list for Karere application.
+
+Each account gets a tab in the main window and its own website data, so
+cookies, IndexedDB and service workers never mix between accounts. The
+"default" account keeps WebKit's default NetworkSession, which held the
+login before multi-account support, so existing logins survive the
+upgrade. Other accounts get a NetworkSession on their own directory tree,
+``karere-accounts/<id>`` next to the karere data and cache directories,
+which never overlaps the default session's storage.
+
+The list is stored in the "accounts" setting as (id, name) pairs.
+"""
+
+import os
+import re
+import shutil
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from .logging_config import get_logger
+
+
+DEFAULT_ACCOUNT_ID = "default"
+DEFAULT_ACCOUNT_NAME = "WhatsApp"
+
+ACCOUNTS_DIRNAME = "karere-accounts"
+
+_ACCOUNT_ID_PATTERN = re.compile(r"^[a-z0-9][a-z0-9-]*$")
+
+logger = get_logger('accounts')
+
+
+def get_base_data_dir() -> str:
+    """Get the karere data directory."""
+    data_dir = os.environ.get('XDG_DATA_HOME', os.path.expanduser('~/.local/share'))
+    return os.path.join(data_dir, 'karere')
+
+
+def get_base_cache_dir() -> str:
+    """Get the karere cache directory."""
+    cache_dir = os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache'))
+    return os.path.join(cache_dir, 'karere')
+
+
+def get_accounts_data_dir() -> str:
+    """Get the directory holding the data of the non-default accounts."""
+    data_dir = os.environ.get('XDG_DATA_HOME', os.path.expanduser('~/.local/share'))
+    return os.path.join(data_dir, ACCOUNTS_DIRNAME)
+
+
+def get_accounts_cache_dir() -> str:
+    """Get the directory holding the caches of the non-default accounts."""
+    cache_dir = os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache'))
+    return os.path.join(cache_dir, ACCOUNTS_DIRNAME)
+
+
+def is_valid_account_id(account_id: str) -> bool:
+    """Check that an account id is safe to use as a directory name."""
+    return bool(account_id) and bool(_ACCOUNT_ID_PATTERN.match(account_id))
+
+
+class Account:
+    """A WhatsApp account and the directories holding its website data."""
+
+    def __init__(self, account_id: str, name: str):
+        self.id = account_id
+        self.name = name
+
+    @property
+    def is_default(self) -> bool:
+        return self.id == DEFAULT_ACCOUNT_ID
+
+    @property
+    def data_dir(self) -> str:
+        """Website data directory; the default account's session keeps WebKit's own directories."""
+        if self.is_default:
+            return get_base_data_dir()
+        return os.path.join(get_accounts_data_dir(), self.id)
+
+    @property
+    def cache_dir(self) -> str:
+        if self.is_default:
+            return get_base_cache_dir()
+        return os.path.join(get_accounts_cache_dir(), self.id)
+
+    def __eq__(self, other):
+        return isinstance(other, Account) and (self.id, self.name) == (other.id, other.name)
+
+    def __repr__(self):
+        return f"Account({self.id!r}, {self.name!r})"
+
+
+def parse_accounts(entries: Iterable[Sequence[str]]) -> List[Account]:
+    """
+    Build the account list from the stored (id, name) pairs.
+
+    Invalid and duplicate ids are dropped, and the default account is
+    added in front if it is missing, so there is always at least one tab.
+
+    Args:
+        entries: (id, name) pairs from the "accounts" setting
+
+    Returns:
+        The accounts in tab order
+    """
+    accounts = []
+    seen = set()
+    for entry in entries:
+        try:
+            account_id, name = entry
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring malformed account entry: {entry!r}")
+            continue
+        if not is_valid_account_id(account_id) or account_id in seen:
+            logger.warning(f"Ignoring invalid or duplicate account id: {account_id!r}")
+            continue
+        seen.add(account_id)
+        accounts.append(Account(account_id, name or DEFAULT_ACCOUNT_NAME))
+
+    if DEFAULT_ACCOUNT_ID not in seen:
+        accounts.insert(0, Account(DEFAULT_ACCOUNT_ID, DEFAULT_ACCOUNT_NAME))
+    return accounts
+
+
+def serialize_accounts(accounts: Iterable[Account]) -> List[Tuple[str, str]]:
+    """Get the (id, name) pairs to store in the "accounts" setting."""
+    return [(account.id, account.name) for account in accounts]
+
+
+def load_accounts(settings) -> List[Account]:
+    """
+    Load the account list from the settings.
+
+    Args:
+        settings: Settings of the application
+
+    Returns:
+        The accounts in tab order
+    """
+    return parse_accounts(settings.get_value("accounts").unpack())
+
+
+def new_account(accounts: Sequence[Account], name: Optional[str] = None) -> Account:
+    """
+    Create an account with an id not used by any existing account.
+
+    Args:
+        accounts: Existing accounts
+        name: Display name; defaults to "Account <n>"
+
+    Returns:
+        The new account; it is not added to the list
+    """
+    used = {account.id for account in accounts}
+    number = 2
+    while f"account-{number}" in used:
+        number += 1
+    return Account(f"account-{number}", name or f"Account {number}")
+
+
+def remove_account_data(account: Account) -> bool:
+    """
+    Delete the data and cache directories of a removed account.
+
+    The default account shares its directories with the rest of karere and
+    is never removed. Clear the account's website data through its
+    NetworkSession first, so nothing writes to the directories any more.
+
+    Returns:
+        True if the directories are gone
+    """
+    if account.is_default:
+        return False
+
+    removed = True
+    for path in (account.data_dir, account.cache_dir):
+        try:
+            shutil.rmtree(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Failed to remove data of account {account.id}: {e}")
+            removed = False
+    return removed
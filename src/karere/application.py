@@ -13,9 +13,16 @@ gi.require_version("WebKit", "6.0")
 
 from gi.repository import Gtk, Adw, Gio, GLib
 from .logging_config import setup_logging, get_logger, set_log_level, disable_console_logging, enable_console_logging
-from ._build_config import get_default_log_level, should_enable_debug_features
+from ._build_config import get_default_log_level, should_enable_debug_features, should_allow_runtime_profiling
 from .crash_reporter import get_crash_reporter
 from .notification_manager import NotificationManager
+from .dbus_service import HealthService
+from .metrics import get_metrics
+from .profiler import RuntimeProfiler
+from .shutdown import ShutdownOrchestrator
+from .temp_files import get_temp_registry
+from .settings_service import get_settings, SettingsService
+from .endpoint import get_web_url, set_web_url_override, is_on_endpoint
 
 # Determine app ID based on environment (for dev/prod distinction)
 def get_app_id():
@@ -42,6 +49,9 @@ class KarereApplication(Adw.Application):
         super().__init__(application_id=BUS_NAME)
         self.main_window = None
         self.notification_enabled = True
+        self.health_service = None
+        self.profiler = RuntimeProfiler()
+        self.shutdown_result = None
         
         # Set up logging
         self._setup_logging()
@@ -51,6 +61,12 @@ class KarereApplication(Adw.Application):
         # Set up application to run in background
         self.set_flags(Gio.ApplicationFlags.HANDLES_OPEN)
         
+        # Endpoint override for tests and local stand-ins
+        self.add_main_option(
+            "web-url", 0, GLib.OptionFlags.NONE, GLib.OptionArg.STRING,
+            "Load WhatsApp Web from this URL instead of https://web.whatsapp.com", "URL"
+        )
+        
     def _setup_logging(self):
         """Set up logging based on settings and build configuration with error handling."""
         # Default settings for fallback
@@ -60,7 +76,7 @@ class KarereApplication(Adw.Application):
         
         try:
             # Get logging settings from GSettings
-            settings = Gio.Settings.new("io.github.tobagin.karere")
+            settings = get_settings()
             
             # Get configured log level, with production-aware default
             try:
@@ -109,6 +125,16 @@ class KarereApplication(Adw.Application):
         except Exception as e:
             print(f"Warning: Could not disable console logging: {e}", file=sys.stderr)
         
+    def do_handle_local_options(self, options):
+        """Apply command line options before the application is registered."""
+        web_url = options.lookup_value("web-url", GLib.VariantType.new("s"))
+        if web_url is not None:
+            set_web_url_override(web_url.get_string())
+            self.logger.info(f"WhatsApp Web URL overridden: {web_url.get_string()}")
+        
+        # Continue with the default processing
+        return -1
+    
     def do_activate(self):
         """Called when the application is activated with error handling."""
         self.logger.info("Application activated")
@@ -195,6 +221,30 @@ class KarereApplication(Adw.Application):
         
         # Initialize notification manager
         self._setup_notification_manager()
+        
+        # Collect static crash report facts once the main loop is idle
+        crash_reporter = get_crash_reporter()
+        if crash_reporter:
+            crash_reporter.schedule_system_info_collection()
+    
+    def do_dbus_register(self, connection, object_path):
+        """Export the health interface alongside the application object."""
+        if not Adw.Application.do_dbus_register(self, connection, object_path):
+            return False
+        
+        try:
+            self.health_service = HealthService(self)
+            self.health_service.register(connection, object_path)
+        except Exception as e:
+            # Monitoring is optional; never block startup on it
+            self.logger.error(f"Failed to set up health interface: {e}")
+        return True
+    
+    def do_dbus_unregister(self, connection, object_path):
+        """Remove the health interface from the bus."""
+        if self.health_service:
+            self.health_service.unregister()
+        Adw.Application.do_dbus_unregister(self, connection, object_path)
     
     def _setup_actions(self):
         """Set up application-level actions."""
@@ -205,6 +255,11 @@ class KarereApplication(Adw.Application):
         show_action.connect("activate", self._on_show_window_action)
         self.add_action(show_action)
         
+        # Show account action (for notifications of a specific account)
+        show_account_action = Gio.SimpleAction.new("show-account", GLib.VariantType.new("s"))
+        show_account_action.connect("activate", self._on_show_account_action)
+        self.add_action(show_account_action)
+        
         # Quit action
         quit_action = Gio.SimpleAction.new("quit", None)
         quit_action.connect("activate", self._on_quit_action)
@@ -215,6 +270,15 @@ class KarereApplication(Adw.Application):
         crash_reports_action.connect("activate", self._on_crash_reports_action)
         self.add_action(crash_reports_action)
         
+        # Runtime profiling actions
+        start_profiling_action = Gio.SimpleAction.new("start-profiling", None)
+        start_profiling_action.connect("activate", self._on_start_profiling_action)
+        self.add_action(start_profiling_action)
+        
+        stop_profiling_action = Gio.SimpleAction.new("stop-profiling", None)
+        stop_profiling_action.connect("activate", self._on_stop_profiling_action)
+        self.add_action(stop_profiling_action)
+        
         # Set up keyboard shortcuts
         self.set_accels_for_action("app.quit", ["<Control>q"])
         self.logger.info("Application actions configured")
@@ -222,8 +286,7 @@ class KarereApplication(Adw.Application):
     def _setup_notification_manager(self):
         """Initialize the notification manager."""
         try:
-            settings = Gio.Settings.new("io.github.tobagin.karere")
-            self.notification_manager = NotificationManager(self, settings)
+            self.notification_manager = NotificationManager(self, get_settings())
             self.logger.info("NotificationManager initialized successfully")
         except Exception as e:
             self.logger.error(f"Failed to initialize NotificationManager: {e}")
@@ -235,6 +298,14 @@ class KarereApplication(Adw.Application):
         self.logger.info("Show window action triggered")
         self.do_activate()
     
+    def _on_show_account_action(self, action, param):
+        """Show the window on the tab of the account a notification came from."""
+        account_id = param.get_string()
+        self.logger.info(f"Show account action triggered for {account_id}")
+        self.do_activate()
+        if self.main_window and hasattr(self.main_window, 'select_account'):
+            self.main_window.select_account(account_id)
+    
     def _on_quit_action(self, action, param):
         """Handle quit action."""
         self.logger.info("Quit action triggered")
@@ -245,6 +316,55 @@ class KarereApplication(Adw.Application):
         self.logger.info("Crash reports action triggered")
         self._show_crash_reports_dialog()
     
+    def _on_start_profiling_action(self, action, param):
+        """Handle start profiling action."""
+        try:
+            self.start_profiling()
+        except PermissionError as e:
+            self.logger.warning(str(e))
+    
+    def _on_stop_profiling_action(self, action, param):
+        """Handle stop profiling action."""
+        paths = self.stop_profiling()
+        for kind, path in paths.items():
+            self.logger.info(f"Runtime {kind} profile written to {path}")
+    
+    def is_profiling_allowed(self):
+        """Check whether runtime profiling may be started in this build."""
+        try:
+            setting_enabled = get_settings().get_boolean("allow-runtime-profiling")
+        except Exception as e:
+            self.logger.error(f"Failed to read profiling setting: {e}")
+            setting_enabled = False
+        return should_allow_runtime_profiling(setting_enabled)
+    
+    def start_profiling(self):
+        """
+        Start cProfile and tracemalloc in the running process.
+        
+        Returns:
+            True if profiling started, False if it was already running
+        
+        Raises:
+            PermissionError: If profiling is not allowed in this build
+        """
+        if not self.is_profiling_allowed():
+            raise PermissionError("Runtime profiling is disabled; enable the allow-runtime-profiling setting")
+        return self.profiler.start()
+    
+    def stop_profiling(self):
+        """
+        Stop profiling and write the results.
+        
+        Returns:
+            Dictionary of output kind ('profile', 'memory') to file path
+        """
+        try:
+            return self.profiler.stop()
+        except Exception as e:
+            self.logger.error(f"Failed to write profiling results: {e}")
+            return {}
+    
     def _show_crash_reports_dialog(self):
         """Show crash reports dialog."""
         try:
@@ -318,10 +438,11 @@ class KarereApplication(Adw.Application):
             # Fallback to console error
             print(f"Error: {title} - {message}", file=sys.stderr)
     
-    def send_notification(self, title, message, icon_name=None, notification_type="system", **kwargs):
+    def send_notification(self, title, message, icon_name=None, notification_type="system", icon_file=None, **kwargs):
         """Send a desktop notification with error recovery and filtering."""
         if not self.notification_enabled:
             self.logger.debug("Notifications disabled, skipping")
+            get_metrics().increment("notifications_filtered")
             return
         
         # Use NotificationManager for filtering if available
@@ -330,6 +451,7 @@ class KarereApplication(Adw.Application):
                 # Check if notification should be sent
                 if not self.notification_manager.should_show_notification(notification_type, **kwargs):
                     self.logger.debug(f"Notification filtered by NotificationManager: {title}")
+                    get_metrics().increment("notifications_filtered")
                     return
                 
                 # Process message content through NotificationManager
@@ -357,8 +479,19 @@ class KarereApplication(Adw.Application):
                 else:
                     icon_name = BUS_NAME
             
-            # Add action to show window when notification is clicked
-            notification.add_button("Show", "app.show-window")
+            # Use an image file, such as a download thumbnail, as the icon
+            if icon_file:
+                notification.set_icon(Gio.FileIcon.new(Gio.File.new_for_path(icon_file)))
+            
+            # Add action to show window when notification is clicked,
+            # on the tab of the account it came from
+            account_id = kwargs.get("account_id")
+            if account_id:
+                target = GLib.Variant("s", account_id)
+                notification.set_default_action_and_target_value("app.show-account", target)
+                notification.add_button_with_target_value("Show", "app.show-account", target)
+            else:
+                notification.add_button("Show", "app.show-window")
             
             # Use simple ID for portal compatibility
             notification_id = f"msg-{int(GLib.get_monotonic_time())}"
@@ -370,6 +503,7 @@ class KarereApplication(Adw.Application):
             self.logger.info(f"Application ID: {self.get_application_id()}")
             
             super().send_notification(notification_id, notification)
+            get_metrics().increment("notifications_sent")
             self.logger.info("Notification sent successfully via Gio.Application.send_notification")
             
         except Exception as e:
@@ -407,7 +541,8 @@ class KarereApplication(Adw.Application):
             if hasattr(self.main_window, 'webview') and self.main_window.webview:
                 try:
                     uri = self.main_window.webview.get_uri()
-                    if not uri or "whatsapp.com" not in uri:
+                    web_url = getattr(self.main_window, 'web_url', None) or get_web_url()
+                    if not is_on_endpoint(uri, web_url):
                         self.logger.warning("WebView not on WhatsApp Web, reloading")
                         self._reload_whatsapp_web()
                 except Exception as e:
@@ -467,86 +602,64 @@ class KarereApplication(Adw.Application):
         
         try:
             # Perform graceful shutdown procedures
-            self._graceful_shutdown()
+            self.shutdown_result = self._graceful_shutdown()
             
         except Exception as e:
             self.logger.error(f"Error during graceful shutdown: {e}")
             # Continue with shutdown even if graceful shutdown fails
         
-        finally:
-            # Final cleanup and quit
-            self.logger.info("Completing application shutdown")
-            if self.main_window:
-                try:
-                    self.main_window.destroy()
-                except Exception as e:
-                    self.logger.error(f"Error destroying main window: {e}")
-            
-            self.quit()
-    
-    def _graceful_shutdown(self):
-        """Perform graceful shutdown procedures."""
-        self.logger.info("Performing graceful shutdown procedures")
+        # Don't wait any longer for steps that missed the deadline
+        if self.shutdown_result is None or not self.shutdown_result.completed:
+            self.force_quit()
+            return
         
-        # Step 1: Save window state
-        self._save_window_state()
+        # Final cleanup and quit
+        self.logger.info("Completing application shutdown")
+        if self.main_window:
+            try:
+                self.main_window.destroy()
+            except Exception as e:
+                self.logger.error(f"Error destroying main window: {e}")
         
-        # Step 2: Clean up WebView resources
-        self._cleanup_webview()
+        self.quit()
+    
+    def _graceful_shutdown(self):
+        """
+        Perform graceful shutdown procedures under a deadline.
         
-        # Step 3: Close crash reporter
-        self._cleanup_crash_reporter()
+        Steps touching GTK run in order on the main thread while the
+        blocking I/O steps run on worker threads.
         
-        # Step 4: Clean up notification manager
-        self._cleanup_notification_manager()
+        Returns:
+            ShutdownResult with per-step durations
+        """
+        self.logger.info("Performing graceful shutdown procedures")
         
-        # Step 5: Clean up logging
+        orchestrator = ShutdownOrchestrator()
+        orchestrator.add_step("window-state", self._save_window_state)
+        orchestrator.add_step("webview", self._cleanup_webview)
+        orchestrator.add_step("notification-manager", self._cleanup_notification_manager)
+        orchestrator.add_step("crash-reporter", self._cleanup_crash_reporter, threaded=True)
+        orchestrator.add_step("temporary-files", self._cleanup_temporary_files, threaded=True)
+        # A single settings sync, once the window state is written
+        orchestrator.add_step("settings", self._cleanup_settings, threaded=True, after="window-state")
+        result = orchestrator.run()
+        
+        # Flush logs last so the steps above are recorded
         self._cleanup_logging()
         
-        # Step 6: Clean up settings
-        self._cleanup_settings()
-        
-        # Step 7: Clean up temporary files
-        self._cleanup_temporary_files()
-        
         self.logger.info("Graceful shutdown procedures completed")
+        return result
     
     def _save_window_state(self):
-        """Save window state before shutdown."""
+        """Write any window state change that is still pending."""
         try:
-            if self.main_window:
+            if self.main_window and hasattr(self.main_window, 'flush_window_state'):
                 self.logger.info("Saving window state")
-                
-                # Get window geometry
-                width = self.main_window.get_width()
-                height = self.main_window.get_height()
-                is_maximized = self.main_window.is_maximized()
-                
-                # Get window position (only if not maximized)
-                x, y = -1, -1
-                if not is_maximized:
-                    # Get the window position
-                    try:
-                        surface = self.main_window.get_surface()
-                        if surface:
-                            # For Wayland/X11 compatibility, we'll use the surface position
-                            # Note: Position saving might not work on all Wayland compositors
-                            pass  # GTK4 doesn't provide direct position access
-                    except Exception as e:
-                        self.logger.debug(f"Could not get window position: {e}")
-                
-                # Save to settings
-                settings = Gio.Settings.new("io.github.tobagin.karere")
-                settings.set_int("window-width", width)
-                settings.set_int("window-height", height)
-                settings.set_boolean("window-maximized", is_maximized)
-                settings.set_int("window-x", x)
-                settings.set_int("window-y", y)
-                
-                # Force settings sync
-                settings.sync()
-                
-                self.logger.info(f"Window state saved: {width}x{height} at ({x},{y}), maximized: {is_maximized}")
+                self.main_window.flush_window_state()
+            
+            # Apply writes batched by a still-open settings dialog
+            get_settings().flush()
                 
         except Exception as e:
             self.logger.error(f"Failed to save window state: {e}")
@@ -557,6 +670,10 @@ class KarereApplication(Adw.Application):
             if self.main_window and hasattr(self.main_window, 'cleanup_webview'):
                 self.logger.info("Cleaning up WebView resources")
                 
+                # Cancel downloads before the WebView goes away
+                if hasattr(self.main_window, 'cleanup_downloads'):
+                    self.main_window.cleanup_downloads()
+                
                 # Use window's cleanup method
                 self.main_window.cleanup_webview()
                     
@@ -624,9 +741,8 @@ class KarereApplication(Adw.Application):
         try:
             self.logger.info("Cleaning up settings resources")
             
-            # Force settings sync
-            settings = Gio.Settings.new("io.github.tobagin.karere")
-            settings.sync()
+            # Wait for applied writes to reach the backend
+            SettingsService.sync()
             
             self.logger.info("Settings cleanup completed")
             
@@ -638,36 +754,33 @@ class KarereApplication(Adw.Application):
         try:
             self.logger.info("Cleaning up temporary files")
             
-            import os
-            import tempfile
-            from pathlib import Path
-            
-            # Clean up any temporary files we might have created
-            temp_dir = Path(tempfile.gettempdir())
-            karere_temp_files = temp_dir.glob("karere_*")
-            
-            for temp_file in karere_temp_files:
-                try:
-                    if temp_file.exists():
-                        temp_file.unlink()
-                        self.logger.debug(f"Removed temporary file: {temp_file}")
-                except Exception as e:
-                    self.logger.warning(f"Could not remove temporary file {temp_file}: {e}")
+            # Only remove what this process created; never scan the temp dir
+            removed = get_temp_registry().cleanup()
             
-            self.logger.info("Temporary files cleanup completed")
+            self.logger.info(f"Temporary files cleanup completed ({removed} removed)")
             
         except Exception as e:
             self.logger.error(f"Failed to clean up temporary files: {e}")
     
     def force_quit(self):
-        """Force quit the application without graceful shutdown."""
+        """
+        Force quit the application without graceful shutdown.
+        
+        No further shutdown steps run, not even destroying the window, since
+        any of them may hang like the one that missed the deadline. Only the
+        settings and the temporary file registry are flushed before exiting.
+        """
         self.logger.warning("Force quitting application without graceful shutdown")
         
-        if self.main_window:
-            try:
-                self.main_window.destroy()
-            except Exception:
-                pass
+        try:
+            SettingsService.sync()
+        except Exception as e:
+            self.logger.error(f"Failed to sync settings: {e}")
+        
+        try:
+            get_temp_registry().cleanup()
+        except Exception as e:
+            self.logger.error(f"Failed to clean up temporary files: {e}")
         
         self.quit()
     
@@ -0,0 +1,170 @@
+"""
+Content filtering for Karere application.
+
+Blocks analytics, telemetry beacons and, optionally, auto-loaded media
+previews using a WebKit content blocker rule set. The rule set is compiled
+once per version into a UserContentFilterStore in the karere data directory
+and loaded from disk on later starts.
+"""
+
+import gi
+import os
+import json
+import hashlib
+from typing import Any, Dict, List, Optional
+
+gi.require_version("WebKit", "6.0")
+
+from gi.repository import GLib, WebKit
+from .logging_config import get_logger
+
+
+# Bump when the rules below change in a way that needs a recompile
+RULESET_VERSION = 1
+
+IDENTIFIER_PREFIX = "karere-filter-"
+
+TRACKING_RULES: List[Dict[str, Any]] = [
+    # Beacons (navigator.sendBeacon, hyperlink auditing) are telemetry only
+    {"trigger": {"url-filter": ".*", "resource-type": ["ping"]},
+     "action": {"type": "block"}},
+    # WhatsApp crash logging and de-identified telemetry endpoints
+    {"trigger": {"url-filter": "^https?://([^/]+\\.)?crashlogs\\.whatsapp\\.net/"},
+     "action": {"type": "block"}},
+    {"trigger": {"url-filter": "^https?://dit\\.whatsapp\\.net/deidentified_telemetry"},
+     "action": {"type": "block"}},
+    # Third-party analytics
+    {"trigger": {"url-filter": "^https?://([^/]+\\.)?facebook\\.com/tr", "load-type": ["third-party"]},
+     "action": {"type": "block"}},
+    {"trigger": {"url-filter": "^https?://([^/]+\\.)?google-analytics\\.com/"},
+     "action": {"type": "block"}},
+    {"trigger": {"url-filter": "^https?://([^/]+\\.)?doubleclick\\.net/"},
+     "action": {"type": "block"}},
+]
+
+MEDIA_PREVIEW_RULES: List[Dict[str, Any]] = [
+    # Animated previews from GIF and sticker providers
+    {"trigger": {"url-filter": "^https?://([^/]+\\.)?(giphy|tenor)\\.com/", "resource-type": ["image", "media"]},
+     "action": {"type": "block"}},
+    # Third-party audio and video auto-loaded by link previews
+    {"trigger": {"url-filter": ".*", "resource-type": ["media"], "load-type": ["third-party"]},
+     "action": {"type": "block"}},
+]
+
+
+def build_rules(block_media_previews: bool) -> List[Dict[str, Any]]:
+    """Build the content blocker rule list."""
+    rules = list(TRACKING_RULES)
+    if block_media_previews:
+        rules.extend(MEDIA_PREVIEW_RULES)
+    return rules
+
+
+def get_rules_identifier(rules_json: str) -> str:
+    """Get the store identifier for a serialized rule set."""
+    digest = hashlib.sha256(rules_json.encode('utf-8')).hexdigest()[:12]
+    return f"{IDENTIFIER_PREFIX}v{RULESET_VERSION}-{digest}"
+
+
+class ContentFilterManager:
+    """
+    Compiles, caches and installs the content filter for a WebView.
+
+    Compilation is asynchronous and happens only when the store has no
+    filter for the current rule set; otherwise the compiled filter is
+    loaded from disk.
+    """
+
+    def __init__(self, user_content_manager: WebKit.UserContentManager):
+        """
+        Initialize the content filter manager.
+
+        Args:
+            user_content_manager: The WebView's user content manager
+        """
+        self.user_content_manager = user_content_manager
+        self.logger = get_logger('content_filter')
+
+        data_dir = os.environ.get('XDG_DATA_HOME', os.path.expanduser('~/.local/share'))
+        self.store_path = os.path.join(data_dir, 'karere', 'content-filters')
+        os.makedirs(self.store_path, exist_ok=True)
+        self.store = WebKit.UserContentFilterStore.new(self.store_path)
+
+        self.enabled = False
+        self._current_identifier: Optional[str] = None
+
+    def apply(self, enabled: bool, block_media_previews: bool):
+        """
+        Install or remove the content filter.
+
+        Args:
+            enabled: Whether content filtering is enabled
+            block_media_previews: Whether to also block auto-loaded media previews
+        """
+        self.enabled = enabled
+        if not enabled:
+            self._current_identifier = None
+            self.user_content_manager.remove_all_filters()
+            self.logger.info("Content filter disabled")
+            return
+
+        rules_json = json.dumps(build_rules(block_media_previews), separators=(',', ':'))
+        identifier = get_rules_identifier(rules_json)
+        if identifier == self._current_identifier:
+            return
+
+        self._current_identifier = identifier
+        # The rules travel with their identifier, so a later apply() can never
+        # get compiled under this one's name
+        self.store.load(identifier, None, self._on_filter_loaded, (identifier, rules_json))
+
+    def _on_filter_loaded(self, store, result, request):
+        """Install a previously compiled filter, or compile it if missing."""
+        identifier, rules_json = request
+        try:
+            content_filter = store.load_finish(result)
+        except GLib.Error:
+            if identifier != self._current_identifier:
+                # Superseded by a later apply() before it was compiled
+                return
+            self.logger.info(f"Compiling content filter {identifier}")
+            rules = GLib.Bytes.new(rules_json.encode('utf-8'))
+            store.save(identifier, rules, None, self._on_filter_saved, identifier)
+            return
+
+        self.logger.info(f"Loaded compiled content filter {identifier}")
+        self._install(content_filter, identifier)
+
+    def _on_filter_saved(self, store, result, identifier):
+        """Install a freshly compiled filter and drop stale ones."""
+        try:
+            content_filter = store.save_finish(result)
+        except GLib.Error as e:
+            self.logger.error(f"Failed to compile content filter: {e.message}")
+            return
+
+        self._install(content_filter, identifier)
+        store.fetch_identifiers(None, self._on_identifiers_fetched)
+
+    def _install(self, content_filter, identifier):
+        """Install a filter unless the configuration changed meanwhile."""
+        if not self.enabled or identifier != self._current_identifier:
+            return
+
+        self.user_content_manager.remove_all_filters()
+        self.user_content_manager.add_filter(content_filter)
+        self.logger.info(f"Content filter {identifier} installed")
+
+    def _on_identifiers_fetched(self, store, result):
+        """Remove compiled filters left behind by older rule set versions."""
+        try:
+            identifiers = store.fetch_identifiers_finish(result)
+        except GLib.Error as e:
+            self.logger.debug(f"Could not list compiled content filters: {e.message}")
+            return
+
+        current_version = f"{IDENTIFIER_PREFIX}v{RULESET_VERSION}-"
+        for identifier in identifiers or []:
+            if identifier.startswith(IDENTIFIER_PREFIX) and not identifier.startswith(current_version):
+                store.remove(identifier, None, None)
+                self.logger.debug(f"Removed stale content filter {identifier}")
@@ -10,15 +10,18 @@ import os
 import sys
 import time
 import json
+import gzip
 import uuid
 import traceback
 import platform
 import threading
 import tempfile
 import hashlib
+import itertools
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from types import MappingProxyType
+from typing import Optional, Dict, Any, List, Mapping
 
 try:
     import gi
@@ -31,9 +34,23 @@ except ImportError:
 
 from .logging_config import get_logger
 from ._build_config import is_production_build, get_build_info
+from .temp_files import get_temp_registry
 from . import __version__
 
 
+# Maximum wall-clock time (seconds) spent assembling a crash report. Optional
+# sections that do not fit in the budget are skipped and listed in the report;
+# sections that probe the filesystem run on a worker thread and are abandoned
+# when they overrun it.
+REPORT_TIME_BUDGET = 0.5
+
+# Crash report storage format and retention policy
+REPORT_SUFFIX = ".json.gz"
+LEGACY_REPORT_SUFFIX = ".json"
+REPORTS_BYTE_BUDGET = 2 * 1024 * 1024  # Total size of stored reports
+REPORT_MAX_AGE = 30 * 24 * 60 * 60  # 30 days
+
+
 class CrashReporter:
     """
     Comprehensive crash reporting system for production applications.
@@ -70,15 +87,26 @@ class CrashReporter:
         self.crash_count = 0
         self.last_crash_time = 0
         
+        # Crashes on record: reports found at startup plus those written
+        # since. Unlike the stored report count, retention never lowers it.
+        self.total_crash_count = sum(1 for _ in self._iter_report_files())
+        
         # Privacy settings
         self.collect_system_info = True
         self.collect_user_data = False  # Never collect user data by default
         self.auto_submit = False  # Never auto-submit in production
         
-        # Initialize system info cache
-        self._system_info = None
+        # Static host facts, collected once after startup (see
+        # schedule_system_info_collection) and frozen for the process lifetime
+        self._static_system_info: Optional[Mapping[str, Any]] = None
         self._build_info = None
         
+        # Process facts that never change after startup
+        self._static_runtime_info = {
+            "argv": tuple(sys.argv),
+            "path": tuple(sys.path[:5]),  # First 5 paths only
+        }
+        
         self.logger.info(f"Crash reporter initialized for {app_name}")
         
     def _get_crash_directory(self) -> Path:
@@ -131,11 +159,13 @@ class CrashReporter:
             Crash report ID
         """
         try:
+            deadline = time.monotonic() + REPORT_TIME_BUDGET
+            
             # Generate unique crash ID
             crash_id = str(uuid.uuid4())
             timestamp = datetime.now().isoformat()
             
-            # Collect crash data
+            # Mandatory crash data, always collected
             crash_data = {
                 "crash_id": crash_id,
                 "timestamp": timestamp,
@@ -146,17 +176,37 @@ class CrashReporter:
                     "message": str(exc_value),
                     "traceback": traceback.format_exception(exc_type, exc_value, exc_traceback)
                 },
-                "system_info": self._get_system_info() if self.collect_system_info else {},
-                "build_info": self._get_build_info(),
-                "runtime_info": self._get_runtime_info(),
-                "environment": self._get_environment_info(),
-                "crash_context": self._get_crash_context()
             }
             
+            # Optional sections, collected in priority order while time allows.
+            # Those that can block on the filesystem get only the time left.
+            sections = [
+                ("system_info", self._get_system_info if self.collect_system_info else dict, True),
+                ("build_info", self._get_build_info, True),
+                ("runtime_info", self._get_runtime_info, False),
+                ("environment", self._get_environment_info, False),
+                ("crash_context", self._get_crash_context, True),
+            ]
+            skipped_sections = []
+            for name, collect, probes in sections:
+                section = None
+                if time.monotonic() < deadline:
+                    section = self._collect_before(collect, deadline) if probes else collect()
+                if section is None:
+                    skipped_sections.append(name)
+                    section = {}
+                crash_data[name] = section
+            
+            if skipped_sections:
+                crash_data["skipped_sections"] = skipped_sections
+                crash_data["truncated_by_time_budget"] = True
+                self.logger.warning(f"Crash report time budget exceeded, skipped: {skipped_sections}")
+            
             # Save crash report
             if self._save_crash_report(crash_id, crash_data):
                 # Update crash statistics only if save was successful
                 self.crash_count += 1
+                self.total_crash_count += 1
                 self.last_crash_time = time.time()
                 return crash_id
             else:
@@ -167,31 +217,118 @@ class CrashReporter:
             self.logger.error(f"Failed to generate crash report: {e}")
             return "unknown"
     
-    def _get_system_info(self) -> Dict[str, Any]:
-        """Collect system information for crash report."""
-        if self._system_info is None:
+    def _collect_before(self, collect, deadline: float) -> Optional[Dict[str, Any]]:
+        """
+        Run a section collector on a worker thread, waiting until the deadline.
+        
+        Args:
+            collect: Section collector
+            deadline: time.monotonic() value to give up at
+            
+        Returns:
+            The section, or None if it did not finish in time
+        """
+        result = {}
+        
+        def run():
             try:
-                self._system_info = {
-                    "platform": platform.platform(),
-                    "system": platform.system(),
-                    "release": platform.release(),
-                    "version": platform.version(),
-                    "machine": platform.machine(),
-                    "processor": platform.processor(),
-                    "python_version": platform.python_version(),
-                    "python_implementation": platform.python_implementation(),
-                    "architecture": platform.architecture(),
-                    "hostname": platform.node(),  # This might be sensitive
-                    "uptime": time.time() - self.start_time,
-                    "memory_info": self._get_memory_info(),
-                    "disk_info": self._get_disk_info(),
-                    "gtk_version": self._get_gtk_version()
-                }
+                result["section"] = collect()
             except Exception as e:
-                self.logger.error(f"Failed to collect system info: {e}")
-                self._system_info = {"error": str(e)}
+                result["section"] = {"error": str(e)}
+        
+        # A daemon thread, so a probe stuck on a dead mount never blocks exit
+        worker = threading.Thread(target=run, name="karere-crash-report", daemon=True)
+        worker.start()
+        worker.join(max(0.0, deadline - time.monotonic()))
+        return result.get("section")
+    
+    def schedule_system_info_collection(self):
+        """
+        Collect static system information on an idle callback.
+        
+        Host facts such as the platform string and processor name are
+        expensive to query (platform.processor() may spawn uname), so they
+        are gathered once after startup instead of while crashing.
+        """
+        if self._static_system_info is not None:
+            return
+        
+        if GTK_AVAILABLE:
+            GLib.idle_add(self._on_idle_collect_system_info, priority=GLib.PRIORITY_LOW)
+        else:
+            self.collect_static_system_info()
+    
+    def _on_idle_collect_system_info(self):
+        """Idle callback collecting the static system info snapshot."""
+        self.collect_static_system_info()
+        return False  # Run once
+    
+    def collect_static_system_info(self) -> Mapping[str, Any]:
+        """
+        Collect static host facts and store them as a frozen snapshot.
+        
+        Returns:
+            Read-only mapping with the static system information
+        """
+        if self._static_system_info is not None:
+            return self._static_system_info
+        
+        try:
+            info = {
+                "platform": platform.platform(),
+                "system": platform.system(),
+                "release": platform.release(),
+                "version": platform.version(),
+                "machine": platform.machine(),
+                "processor": platform.processor(),
+                "python_version": platform.python_version(),
+                "python_implementation": platform.python_implementation(),
+                "architecture": platform.architecture(),
+                "hostname": platform.node(),  # This might be sensitive
+                "disk_info": self._get_disk_info(),
+                "gtk_version": self._get_gtk_version(),
+                "snapshot_time": time.time(),
+            }
+        except Exception as e:
+            self.logger.error(f"Failed to collect system info: {e}")
+            info = {"error": str(e)}
+        
+        self._static_system_info = MappingProxyType(info)
+        
+        # Warm the build info cache as well, it probes the filesystem
+        self._get_build_info()
+        
+        self.logger.debug("Static system info snapshot collected")
+        return self._static_system_info
+    
+    def _get_fallback_system_info(self) -> Dict[str, Any]:
+        """Get cheap system facts when no snapshot has been collected yet."""
+        try:
+            uname = os.uname()
+            return {
+                "platform": f"{uname.sysname}-{uname.release}-{uname.machine}",
+                "system": uname.sysname,
+                "release": uname.release,
+                "version": uname.version,
+                "machine": uname.machine,
+                "python_version": platform.python_version(),
+                "snapshot_time": None,
+            }
+        except Exception as e:
+            return {"error": str(e)}
+    
+    def _get_system_info(self) -> Dict[str, Any]:
+        """Collect system information for crash report."""
+        if self._static_system_info is not None:
+            system_info = dict(self._static_system_info)
+        else:
+            # Never spawn processes while crashing; use syscalls only
+            system_info = self._get_fallback_system_info()
         
-        return self._system_info.copy()
+        # Volatile fields are cheap and sampled at crash time
+        system_info["uptime"] = time.time() - self.start_time
+        system_info["memory_info"] = self._get_memory_info()
+        return system_info
     
     def _get_build_info(self) -> Dict[str, Any]:
         """Get build information."""
@@ -212,9 +349,9 @@ class CrashReporter:
             "last_crash_time": self.last_crash_time,
             "current_thread": threading.current_thread().name,
             "thread_count": threading.active_count(),
-            "argv": sys.argv,
-            "path": sys.path[:5],  # First 5 paths only
-            "modules": list(sys.modules.keys())[:20]  # First 20 modules only
+            "argv": self._static_runtime_info["argv"],
+            "path": self._static_runtime_info["path"],
+            "modules": list(itertools.islice(sys.modules, 20))  # First 20 modules only
         }
     
     def _get_environment_info(self) -> Dict[str, Any]:
@@ -292,20 +429,23 @@ class CrashReporter:
         return gtk_info
     
     def _save_crash_report(self, crash_id: str, crash_data: Dict[str, Any]) -> bool:
-        """Save crash report to file.
+        """Save crash report to a compressed file.
         
         Returns:
             True if save was successful, False otherwise
         """
         try:
-            report_file = self.reports_dir / f"crash_{crash_id}.json"
+            report_file = self.reports_dir / f"crash_{crash_id}{REPORT_SUFFIX}"
+            temp_file = report_file.with_name(report_file.name + ".tmp")
             
-            with open(report_file, 'w') as f:
-                json.dump(crash_data, f, indent=2, default=str)
+            payload = json.dumps(crash_data, separators=(',', ':'), default=str).encode('utf-8')
+            with gzip.open(temp_file, 'wb', compresslevel=6) as f:
+                f.write(payload)
+            os.replace(temp_file, report_file)
             
             self.logger.info(f"Crash report saved: {report_file}")
             
-            # Clean up old reports (keep last 10)
+            # Enforce the size and age retention policy
             self._cleanup_old_reports()
             
             return True
@@ -314,16 +454,68 @@ class CrashReporter:
             self.logger.error(f"Failed to save crash report: {e}")
             return False
     
+    def _iter_report_files(self):
+        """Iterate over stored crash report files, compressed or legacy."""
+        for pattern in (f"crash_*{REPORT_SUFFIX}", f"crash_*{LEGACY_REPORT_SUFFIX}"):
+            yield from self.reports_dir.glob(pattern)
+    
+    def get_report_path(self, crash_id: str) -> Optional[Path]:
+        """
+        Get the path of a stored crash report.
+        
+        Args:
+            crash_id: Crash report ID
+            
+        Returns:
+            Path of the report file, or None if it does not exist
+        """
+        for suffix in (REPORT_SUFFIX, LEGACY_REPORT_SUFFIX):
+            report_file = self.reports_dir / f"crash_{crash_id}{suffix}"
+            if report_file.exists():
+                return report_file
+        return None
+    
+    def load_crash_report(self, report_file: Path) -> Dict[str, Any]:
+        """
+        Load a crash report, decompressing it if needed.
+        
+        Args:
+            report_file: Path of the report file
+            
+        Returns:
+            Crash report data
+        """
+        if report_file.name.endswith(REPORT_SUFFIX):
+            with gzip.open(report_file, 'rb') as f:
+                return json.loads(f.read().decode('utf-8'))
+        
+        with open(report_file, 'r') as f:
+            return json.load(f)
+    
     def _cleanup_old_reports(self):
-        """Clean up old crash reports."""
+        """Clean up crash reports exceeding the age or size budget."""
         try:
-            reports = list(self.reports_dir.glob("crash_*.json"))
-            reports.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+            reports = []
+            for report in self._iter_report_files():
+                try:
+                    stat = report.stat()
+                    reports.append((stat.st_mtime, stat.st_size, report))
+                except OSError:
+                    continue
             
-            # Keep only the 10 most recent reports
-            for report in reports[10:]:
+            # Newest first; the most recent report is always kept
+            reports.sort(key=lambda r: r[0], reverse=True)
+            
+            cutoff = time.time() - REPORT_MAX_AGE
+            total_bytes = 0
+            for index, (mtime, size, report) in enumerate(reports):
+                total_bytes += size
+                if index == 0 or (mtime >= cutoff and total_bytes <= REPORTS_BYTE_BUDGET):
+                    continue
+                
                 try:
                     report.unlink()
+                    total_bytes -= size
                     self.logger.debug(f"Deleted old crash report: {report}")
                 except Exception as e:
                     self.logger.warning(f"Failed to delete old crash report {report}: {e}")
@@ -331,6 +523,36 @@ class CrashReporter:
         except Exception as e:
             self.logger.error(f"Failed to cleanup old reports: {e}")
     
+    def get_storage_statistics(self) -> Dict[str, Any]:
+        """
+        Get crash report storage statistics without reading report contents.
+        
+        Returns:
+            Dictionary with the report count, total size and newest report time
+        """
+        count = 0
+        total_bytes = 0
+        newest = None
+        try:
+            for report in self._iter_report_files():
+                try:
+                    stat = report.stat()
+                except OSError:
+                    continue
+                count += 1
+                total_bytes += stat.st_size
+                if newest is None or stat.st_mtime > newest:
+                    newest = stat.st_mtime
+        except Exception as e:
+            self.logger.error(f"Failed to get crash report statistics: {e}")
+        
+        return {
+            "count": count,
+            "total_bytes": total_bytes,
+            "byte_budget": REPORTS_BYTE_BUDGET,
+            "newest": datetime.fromtimestamp(newest).isoformat() if newest else None,
+        }
+    
     def _show_crash_dialog(self, crash_id: str, exc_type, exc_value):
         """Show crash dialog to user."""
         try:
@@ -365,13 +587,23 @@ class CrashReporter:
     def _open_crash_report(self, crash_id: str):
         """Open crash report in default text editor."""
         try:
-            report_file = self.reports_dir / f"crash_{crash_id}.json"
-            if report_file.exists():
-                # Try to open with default application
-                Gio.AppInfo.launch_default_for_uri(
-                    f"file://{report_file}",
-                    None
-                )
+            report_file = self.get_report_path(crash_id)
+            if report_file is None:
+                return
+            
+            if report_file.name.endswith(REPORT_SUFFIX):
+                # Text editors cannot read compressed reports, expand a
+                # temporary copy that is removed at shutdown
+                view_file = Path(get_temp_registry().get_path(f"crash_{crash_id}.json"))
+                with open(view_file, 'w') as f:
+                    json.dump(self.load_crash_report(report_file), f, indent=2, default=str)
+                report_file = view_file
+            
+            # Try to open with default application
+            Gio.AppInfo.launch_default_for_uri(
+                f"file://{report_file}",
+                None
+            )
         except Exception as e:
             self.logger.error(f"Failed to open crash report: {e}")
     
@@ -379,17 +611,16 @@ class CrashReporter:
         """Get list of crash reports."""
         reports = []
         try:
-            for report_file in self.reports_dir.glob("crash_*.json"):
+            for report_file in self._iter_report_files():
                 try:
-                    with open(report_file, 'r') as f:
-                        crash_data = json.load(f)
-                        reports.append({
-                            "file": str(report_file),
-                            "crash_id": crash_data.get("crash_id", "unknown"),
-                            "timestamp": crash_data.get("timestamp", "unknown"),
-                            "exception_type": crash_data.get("exception", {}).get("type", "unknown"),
-                            "exception_message": crash_data.get("exception", {}).get("message", "unknown")
-                        })
+                    crash_data = self.load_crash_report(report_file)
+                    reports.append({
+                        "file": str(report_file),
+                        "crash_id": crash_data.get("crash_id", "unknown"),
+                        "timestamp": crash_data.get("timestamp", "unknown"),
+                        "exception_type": crash_data.get("exception", {}).get("type", "unknown"),
+                        "exception_message": crash_data.get("exception", {}).get("message", "unknown")
+                    })
                 except Exception as e:
                     self.logger.warning(f"Failed to read crash report {report_file}: {e}")
         except Exception as e:
@@ -400,7 +631,7 @@ class CrashReporter:
     def clear_crash_reports(self):
         """Clear all crash reports."""
         try:
-            for report_file in self.reports_dir.glob("crash_*.json"):
+            for report_file in list(self._iter_report_files()):
                 try:
                     report_file.unlink()
                     self.logger.info(f"Deleted crash report: {report_file}")
@@ -11,6 +11,7 @@ from gi.repository import Gtk, Adw, Gio
 from .logging_config import get_logger
 from .crash_reporter import get_crash_reporter
 from ._build_config import is_development_build
+from .settings_service import get_settings
 
 
 class CrashReportingSettingsDialog(Adw.PreferencesWindow):
@@ -28,7 +29,7 @@ class CrashReportingSettingsDialog(Adw.PreferencesWindow):
         self.set_modal(True)
         
         # Initialize settings
-        self.settings = Gio.Settings.new("io.github.tobagin.karere")
+        self.settings = get_settings()
         self.crash_reporter = get_crash_reporter()
         
         # Create UI
@@ -150,9 +151,10 @@ class CrashReportingSettingsDialog(Adw.PreferencesWindow):
         """Update statistics display."""
         try:
             if self.crash_reporter:
-                reports = self.crash_reporter.get_crash_reports()
-                count = len(reports)
-                self.reports_count_row.set_subtitle(f"{count} crash report(s) stored")
+                stats = self.crash_reporter.get_storage_statistics()
+                self.reports_count_row.set_subtitle(
+                    f"{stats['count']} crash report(s) stored, {stats['total_bytes'] // 1024} KiB"
+                )
             else:
                 self.reports_count_row.set_subtitle("Crash reporting not available")
         except Exception as e:
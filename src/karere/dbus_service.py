@@ -0,0 +1,270 @@
+"""
+D-Bus health interface for Karere application.
+
+Exports the io.github.tobagin.karere.Health interface next to the
+application object on its bus name, so monitoring tools can read live
+counters through org.freedesktop.DBus.Properties instead of parsing logs:
+
+    gdbus call --session --dest io.github.tobagin.karere \\
+        --object-path /io/github/tobagin/karere/Health \\
+        --method org.freedesktop.DBus.Properties.GetAll io.github.tobagin.karere.Health
+
+MainLoopLagMs is only measured while the interface is being polled, so
+the first read after a quiet period returns the last value measured.
+
+StartProfiling and StopProfiling control the runtime profiler (see
+profiler.py) when the build allows it.
+"""
+
+import gi
+import json
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+gi.require_version("Gio", "2.0")
+
+from gi.repository import Gio, GLib
+from .logging_config import get_logger
+from .metrics import get_metrics, get_rss_bytes
+from .crash_reporter import get_crash_reporter
+
+
+INTERFACE_NAME = "io.github.tobagin.karere.Health"
+
+INTROSPECTION_XML = f"""
+<node>
+  <interface name="{INTERFACE_NAME}">
+    <property name="NotificationsReceived" type="t" access="read"/>
+    <property name="NotificationsFiltered" type="t" access="read"/>
+    <property name="NotificationsSent" type="t" access="read"/>
+    <property name="MainLoopLagMs" type="d" access="read"/>
+    <property name="MainLoopLagMaxMs" type="d" access="read"/>
+    <property name="PageLoads" type="t" access="read"/>
+    <property name="LastPageLoadMs" type="d" access="read"/>
+    <property name="AveragePageLoadMs" type="d" access="read"/>
+    <property name="DownloadQueueDepth" type="u" access="read"/>
+    <property name="ActiveDownloads" type="u" access="read"/>
+    <property name="ResidentMemoryBytes" type="t" access="read"/>
+    <property name="CrashCount" type="u" access="read"/>
+    <method name="GetSnapshot">
+      <arg name="snapshot_json" type="s" direction="out"/>
+    </method>
+    <method name="StartProfiling">
+      <arg name="started" type="b" direction="out"/>
+    </method>
+    <method name="StopProfiling">
+      <arg name="output_files" type="a{ss}" direction="out"/>
+    </method>
+  </interface>
+</node>
+"""
+
+# How often the main-loop lag probe runs while it is active
+LAG_PROBE_INTERVAL_MS = 500
+
+# The probe stops this long after the health interface was last read
+LAG_PROBE_IDLE_SECONDS = 60
+
+
+class MainLoopLagMonitor:
+    """
+    Measures main-loop lag as the delay of a periodic timeout.
+
+    A timeout that should fire every LAG_PROBE_INTERVAL_MS fires late by
+    however long the main loop was busy. The probe only runs while the
+    health interface is being polled: each read keeps it going for another
+    LAG_PROBE_IDLE_SECONDS. It is paused while the window is in background
+    mode, so an unobserved or hidden Karere gets no extra wakeups.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._source_id = None
+        self._expected = 0.0
+        self._active_until = 0.0
+        self._paused = False
+
+    def touch(self):
+        """Keep the probe running after the interface was read."""
+        self._active_until = self.clock() + LAG_PROBE_IDLE_SECONDS
+        self._start()
+
+    def set_paused(self, paused: bool):
+        """Pause or resume the probe; a resumed probe only runs if still polled."""
+        self._paused = paused
+        if paused:
+            self._remove_source()
+        elif self.clock() < self._active_until:
+            self._start()
+
+    def stop(self):
+        self._active_until = 0.0
+        self._remove_source()
+
+    def _start(self):
+        if self._source_id or self._paused:
+            return
+        self._expected = self.clock() + LAG_PROBE_INTERVAL_MS / 1000
+        self._source_id = GLib.timeout_add(LAG_PROBE_INTERVAL_MS, self._on_probe)
+
+    def _remove_source(self):
+        if self._source_id:
+            GLib.source_remove(self._source_id)
+            self._source_id = None
+
+    def _on_probe(self):
+        now = self.clock()
+        lag = max(0.0, now - self._expected)
+        metrics = get_metrics()
+        metrics.set_gauge("main_loop_lag", lag)
+        if lag > metrics.get_gauge("main_loop_lag_max"):
+            metrics.set_gauge("main_loop_lag_max", lag)
+
+        if now >= self._active_until:
+            # Nobody has read the interface for a while
+            self._source_id = None
+            return False
+        self._expected = now + LAG_PROBE_INTERVAL_MS / 1000
+        return True
+
+
+class HealthService:
+    """
+    Exports the health interface on the application's D-Bus connection.
+    """
+
+    def __init__(self, app):
+        """
+        Initialize the health service.
+
+        Args:
+            app: The KarereApplication instance
+        """
+        self.app = app
+        self.logger = get_logger('dbus_service')
+        self.lag_monitor = MainLoopLagMonitor()
+        self.node_info = Gio.DBusNodeInfo.new_for_xml(INTROSPECTION_XML)
+        self.methods: Dict[str, Tuple[Callable, Optional[str]]] = {
+            "GetSnapshot": (self._get_snapshot, "(s)"),
+            "StartProfiling": (self._start_profiling, "(b)"),
+            "StopProfiling": (self._stop_profiling, "(a{ss})"),
+        }
+        self._registrations = []
+        self._property_getters = self._get_property_getters()
+
+    @property
+    def interface_info(self) -> Gio.DBusInterfaceInfo:
+        return self.node_info.interfaces[0]
+
+    def register(self, connection: Gio.DBusConnection, object_path: str) -> bool:
+        """
+        Register the interface below the application's object path.
+
+        Args:
+            connection: Session bus connection of the application
+            object_path: Application object path
+
+        Returns:
+            True if the object was registered
+        """
+        path = f"{object_path.rstrip('/')}/Health"
+        try:
+            registration_id = connection.register_object(
+                path, self.interface_info, self._on_method_call, self._on_get_property, None
+            )
+        except GLib.Error as e:
+            self.logger.error(f"Failed to export health interface: {e.message}")
+            return False
+
+        self._registrations.append((connection, registration_id))
+        self.logger.info(f"Health interface exported at {path}")
+        return True
+
+    def unregister(self):
+        """Remove the interface from the bus."""
+        for connection, registration_id in self._registrations:
+            connection.unregister_object(registration_id)
+        self._registrations = []
+        self.lag_monitor.stop()
+
+    def set_background(self, background: bool):
+        """Pause the lag probe while the window is in background mode."""
+        self.lag_monitor.set_paused(background)
+
+    def _get_download_manager(self):
+        window = getattr(self.app, 'main_window', None)
+        return getattr(window, 'download_manager', None) if window else None
+
+    def _get_crash_count(self) -> int:
+        # A counter kept by the crash reporter, so polls never touch the disk
+        crash_reporter = get_crash_reporter()
+        return crash_reporter.total_crash_count if crash_reporter else 0
+
+    def _get_property_getters(self) -> Dict[str, Tuple[str, Callable[[], object]]]:
+        """Map each property to its D-Bus type and a function computing it."""
+        metrics = get_metrics()
+
+        def download_manager_value(getter):
+            download_manager = self._get_download_manager()
+            return getter(download_manager) if download_manager else 0
+
+        return {
+            "NotificationsReceived": ("t", lambda: metrics.get_counter("notifications_received")),
+            "NotificationsFiltered": ("t", lambda: metrics.get_counter("notifications_filtered")),
+            "NotificationsSent": ("t", lambda: metrics.get_counter("notifications_sent")),
+            "MainLoopLagMs": ("d", lambda: metrics.get_gauge("main_loop_lag") * 1000),
+            "MainLoopLagMaxMs": ("d", lambda: metrics.get_gauge("main_loop_lag_max") * 1000),
+            "PageLoads": ("t", lambda: metrics.get_timing("page_load").count),
+            "LastPageLoadMs": ("d", lambda: metrics.get_timing("page_load").last * 1000),
+            "AveragePageLoadMs": ("d", lambda: metrics.get_timing("page_load").average * 1000),
+            "DownloadQueueDepth": ("u", lambda: download_manager_value(lambda m: m.queue_depth)),
+            "ActiveDownloads": ("u", lambda: download_manager_value(lambda m: len(m.active))),
+            "ResidentMemoryBytes": ("t", get_rss_bytes),
+            "CrashCount": ("u", self._get_crash_count),
+        }
+
+    def get_properties(self) -> Dict[str, GLib.Variant]:
+        """Get the current value of every property."""
+        return {name: GLib.Variant(signature, getter())
+                for name, (signature, getter) in self._property_getters.items()}
+
+    def _on_get_property(self, connection, sender, object_path, interface_name, property_name):
+        """Handle org.freedesktop.DBus.Properties.Get and GetAll."""
+        self.lag_monitor.touch()
+        signature, getter = self._property_getters[property_name]
+        return GLib.Variant(signature, getter())
+
+    def _get_snapshot(self, parameters):
+        """Return all metrics, including timing details, as JSON."""
+        snapshot = get_metrics().snapshot()
+        snapshot["resident_memory_bytes"] = get_rss_bytes()
+        snapshot["crash_count"] = self._get_crash_count()
+        return (json.dumps(snapshot),)
+
+    def _start_profiling(self, parameters):
+        """Start runtime profiling; fails unless the build allows it."""
+        return (self.app.start_profiling(),)
+
+    def _stop_profiling(self, parameters):
+        """Stop runtime profiling and return the written files."""
+        return (self.app.stop_profiling(),)
+
+    def _on_method_call(self, connection, sender, object_path, interface_name,
+                        method_name, parameters, invocation):
+        """Dispatch method calls to their handlers."""
+        self.lag_monitor.touch()
+        handler = self.methods.get(method_name)
+        if handler is None:
+            invocation.return_dbus_error(f"{INTERFACE_NAME}.Error.UnknownMethod",
+                                         f"Unknown method {method_name}")
+            return
+
+        method, signature = handler
+        try:
+            result = method(parameters)
+            invocation.return_value(GLib.Variant(signature, result) if signature else None)
+        except PermissionError as e:
+            invocation.return_dbus_error(f"{INTERFACE_NAME}.Error.NotAllowed", str(e))
+        except Exception as e:
+            self.logger.error(f"D-Bus method {method_name} failed: {e}")
+            invocation.return_dbus_error(f"{INTERFACE_NAME}.Error.Failed", str(e))
@@ -0,0 +1,155 @@
+"""
+Download deduplication for Karere application.
+
+Keeps a content-hash index of downloaded files in a small SQLite database
+in the karere data directory, so a download whose bytes are already on disk
+can be replaced by a hardlink or reflink to the existing file, or dropped.
+"""
+
+import os
+import fcntl
+import sqlite3
+import threading
+from typing import Optional
+
+from .logging_config import get_logger
+
+
+DEDUP_OFF = "off"
+DEDUP_HARDLINK = "hardlink"
+DEDUP_REFLINK = "reflink"
+DEDUP_DROP = "drop"
+
+# ioctl request to share extents between files (Linux FICLONE)
+FICLONE = 0x40049409
+
+logger = get_logger('dedup_index')
+
+
+def get_default_index_path() -> str:
+    """Get the default location of the dedup database."""
+    data_dir = os.environ.get('XDG_DATA_HOME', os.path.expanduser('~/.local/share'))
+    return os.path.join(data_dir, 'karere', 'downloads.db')
+
+
+class DedupIndex:
+    """
+    Content hash to path index of downloaded files.
+
+    Entries record the size and modification time of the file; an entry
+    whose file was deleted or changed since is treated as stale and
+    removed on lookup. Safe to use from worker threads.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize the dedup index.
+
+        Args:
+            db_path: SQLite database path; defaults to the karere data directory
+        """
+        self.db_path = db_path or get_default_index_path()
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " content_hash TEXT PRIMARY KEY,"
+            " path TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL)"
+        )
+        self._connection.commit()
+
+    def lookup(self, content_hash: str) -> Optional[str]:
+        """
+        Find an existing file with the given content.
+
+        Args:
+            content_hash: SHA-256 hex digest
+
+        Returns:
+            Path of an unchanged file with that content, or None
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT path, size, mtime_ns FROM files WHERE content_hash = ?",
+                (content_hash,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            path, size, mtime_ns = row
+            try:
+                stat = os.stat(path)
+                if stat.st_size == size and stat.st_mtime_ns == mtime_ns:
+                    return path
+            except OSError:
+                pass
+
+            self._connection.execute("DELETE FROM files WHERE content_hash = ?", (content_hash,))
+            self._connection.commit()
+            return None
+
+    def add(self, content_hash: str, path: str):
+        """Record a file under its content hash."""
+        stat = os.stat(path)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO files (content_hash, path, size, mtime_ns) VALUES (?, ?, ?, ?)",
+                (content_hash, path, stat.st_size, stat.st_mtime_ns)
+            )
+            self._connection.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            self._connection.close()
+
+
+def _reflink(source: str, target: str):
+    """Create target as a copy-on-write clone of source."""
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+
+
+def replace_with_link(path: str, original: str, mode: str) -> str:
+    """
+    Replace a duplicate file so its bytes are stored only once.
+
+    Args:
+        path: The newly downloaded duplicate
+        original: Existing file with the same content
+        mode: DEDUP_HARDLINK, DEDUP_REFLINK or DEDUP_DROP
+
+    Returns:
+        Path where the content can be found: path for links, original
+        when the duplicate was dropped. If the filesystem does not support
+        the link type the duplicate is kept as is.
+    """
+    if mode == DEDUP_DROP:
+        os.unlink(path)
+        return original
+
+    temp_path = f"{path}.dedup"
+    try:
+        if mode == DEDUP_HARDLINK:
+            os.link(original, temp_path)
+        elif mode == DEDUP_REFLINK:
+            _reflink(original, temp_path)
+        else:
+            return path
+        os.replace(temp_path, path)
+    except OSError as e:
+        # E.g. EXDEV across filesystems, or no reflink support
+        logger.info(f"Keeping duplicate {path}: cannot {mode} to {original}: {e}")
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+    return path
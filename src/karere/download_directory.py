@@ -0,0 +1,279 @@
+"""
+Downloads directory monitoring for Karere application.
+
+Keeps the writability and free space of the downloads directory in a cache
+that is refreshed asynchronously, on a timer and when the directory
+changes, so download requests never block the main loop on filesystem
+calls (which can stall on network-mounted home directories).
+"""
+
+import gi
+import os
+from typing import Callable, List, Optional
+
+gi.require_version("Gio", "2.0")
+
+from gi.repository import Gio, GLib
+from .logging_config import get_logger
+
+
+# Free space required to pick a directory, and to start a download in it
+MIN_FREE_BYTES_SETUP = 100 * 1024 * 1024
+MIN_FREE_BYTES_DOWNLOAD = 10 * 1024 * 1024
+
+# Seconds between periodic refreshes
+REFRESH_INTERVAL = 60
+
+# Milliseconds to wait for a burst of directory changes to settle
+CHANGE_DEBOUNCE_MS = 2000
+
+
+def get_candidate_directories() -> List[str]:
+    """Get the downloads directory candidates in order of preference."""
+    home = os.path.expanduser('~')
+    candidates = [
+        GLib.get_user_special_dir(GLib.UserDirectory.DIRECTORY_DOWNLOAD),
+        os.path.join(home, 'Downloads'),
+        os.path.join(home, 'Desktop'),
+        home,
+        '/tmp',
+    ]
+
+    unique = []
+    for candidate in candidates:
+        if candidate and candidate not in unique:
+            unique.append(candidate)
+    return unique
+
+
+class DownloadDirectoryMonitor:
+    """
+    Cached health checks for the downloads directory.
+
+    Candidates are tried in order until one is writable with enough free
+    space. Until the first check completes the preferred candidate is
+    assumed usable; afterwards download-time checks are answered from the
+    cache.
+    """
+
+    def __init__(self, candidates: Optional[List[str]] = None,
+                 directory_changed_callback: Optional[Callable[[str], None]] = None,
+                 unavailable_callback: Optional[Callable[[], None]] = None):
+        """
+        Initialize the downloads directory monitor.
+
+        Args:
+            candidates: Directories to try, in order of preference
+            directory_changed_callback: Called with the new path when a
+                fallback candidate is selected
+            unavailable_callback: Called when no candidate is usable
+        """
+        self.logger = get_logger('download_directory')
+        self.candidates = candidates or get_candidate_directories()
+        self.directory_changed_callback = directory_changed_callback
+        self.unavailable_callback = unavailable_callback
+
+        self._index = 0
+        self.path = self.candidates[0]
+        self.writable: Optional[bool] = None
+        self.free_bytes: Optional[int] = None
+
+        self._selected = False
+        self._cancellable: Optional[Gio.Cancellable] = None
+        self._file_monitor: Optional[Gio.FileMonitor] = None
+        self._refresh_source_id = None
+        self._debounce_source_id = None
+
+    def start(self):
+        """Start checking candidates and schedule periodic refreshes."""
+        self.refresh()
+        self._refresh_source_id = GLib.timeout_add_seconds(REFRESH_INTERVAL, self._on_refresh_timer)
+
+    def stop(self):
+        """Cancel pending checks, timers and the directory monitor."""
+        if self._cancellable:
+            self._cancellable.cancel()
+            self._cancellable = None
+        for source_id in (self._refresh_source_id, self._debounce_source_id):
+            if source_id:
+                GLib.source_remove(source_id)
+        self._refresh_source_id = None
+        self._debounce_source_id = None
+        if self._file_monitor:
+            self._file_monitor.cancel()
+            self._file_monitor = None
+
+    def check_for_download(self) -> Optional[str]:
+        """
+        Check whether a download can start, using cached state only.
+
+        Returns:
+            A user-facing error message, or None if the download can start
+        """
+        if self.writable is False:
+            return "Downloads directory is not writable. Please check permissions."
+        if self.free_bytes is not None and self.free_bytes < MIN_FREE_BYTES_DOWNLOAD:
+            return "Insufficient disk space for download. Please free up space and try again."
+        return None
+
+    def refresh(self):
+        """Refresh the cached state of the current directory asynchronously."""
+        if self._cancellable:
+            self._cancellable.cancel()
+        self._cancellable = Gio.Cancellable()
+
+        self._query_info(Gio.File.new_for_path(self.path), self._cancellable)
+
+    def _query_info(self, directory, cancellable):
+        """Start the directory type and writability check."""
+        directory.query_info_async(
+            f"{Gio.FILE_ATTRIBUTE_STANDARD_TYPE},{Gio.FILE_ATTRIBUTE_ACCESS_CAN_WRITE}",
+            Gio.FileQueryInfoFlags.NONE, GLib.PRIORITY_LOW,
+            cancellable, self._on_info_queried, cancellable
+        )
+
+    def _on_info_queried(self, directory, result, cancellable):
+        """Handle the directory type and writability check."""
+        if cancellable.is_cancelled():
+            return
+
+        try:
+            info = directory.query_info_finish(result)
+        except GLib.Error as e:
+            if e.matches(Gio.io_error_quark(), Gio.IOErrorEnum.NOT_FOUND) and not self._selected:
+                self._create_directory(directory, [], cancellable)
+            else:
+                self._mark_unusable(f"cannot query directory: {e.message}")
+            return
+
+        if info.get_file_type() != Gio.FileType.DIRECTORY:
+            self._mark_unusable("not a directory")
+            return
+        if not info.get_attribute_boolean(Gio.FILE_ATTRIBUTE_ACCESS_CAN_WRITE):
+            self._mark_unusable("not writable")
+            return
+
+        self.writable = True
+        directory.query_filesystem_info_async(
+            Gio.FILE_ATTRIBUTE_FILESYSTEM_FREE, GLib.PRIORITY_LOW,
+            cancellable, self._on_filesystem_info_queried, cancellable
+        )
+
+    def _on_filesystem_info_queried(self, directory, result, cancellable):
+        """Handle the free space check."""
+        if cancellable.is_cancelled():
+            return
+
+        try:
+            info = directory.query_filesystem_info_finish(result)
+            if info.has_attribute(Gio.FILE_ATTRIBUTE_FILESYSTEM_FREE):
+                self.free_bytes = info.get_attribute_uint64(Gio.FILE_ATTRIBUTE_FILESYSTEM_FREE)
+            else:
+                self.free_bytes = None
+        except GLib.Error as e:
+            # Free space is not available on some filesystems
+            self.logger.debug(f"Could not check disk space for {self.path}: {e.message}")
+            self.free_bytes = None
+
+        if not self._selected:
+            if self.free_bytes is not None and self.free_bytes < MIN_FREE_BYTES_SETUP:
+                self._mark_unusable(f"insufficient disk space: {self.free_bytes} bytes")
+                return
+            self._select()
+
+        self.logger.debug(f"Downloads directory {self.path}: writable, "
+                          f"{self.free_bytes if self.free_bytes is not None else 'unknown'} bytes free")
+
+    def _create_directory(self, directory, pending, cancellable):
+        """
+        Create a missing candidate directory asynchronously, then check it again.
+
+        Missing parents are created first, one level at a time.
+
+        Args:
+            directory: Directory to create
+            pending: Directories below it to create afterwards, innermost last
+            cancellable: Cancellable of the current refresh
+        """
+        directory.make_directory_async(GLib.PRIORITY_LOW, cancellable,
+                                       self._on_directory_created, (pending, cancellable))
+
+    def _on_directory_created(self, directory, result, user_data):
+        """Continue with the next directory level, or check the created candidate."""
+        pending, cancellable = user_data
+        if cancellable.is_cancelled():
+            return
+
+        try:
+            directory.make_directory_finish(result)
+        except GLib.Error as e:
+            parent = directory.get_parent()
+            if e.matches(Gio.io_error_quark(), Gio.IOErrorEnum.NOT_FOUND) and parent is not None:
+                self._create_directory(parent, [directory] + pending, cancellable)
+                return
+            if not e.matches(Gio.io_error_quark(), Gio.IOErrorEnum.EXISTS):
+                self._mark_unusable(f"cannot create directory: {e.message}")
+                return
+
+        if pending:
+            self._create_directory(pending[0], pending[1:], cancellable)
+            return
+
+        self.logger.info(f"Created downloads directory: {self.path}")
+        self._query_info(directory, cancellable)
+
+    def _mark_unusable(self, reason: str):
+        """Record a failed check, falling back to the next candidate while selecting."""
+        self.logger.warning(f"Downloads directory {self.path} unusable: {reason}")
+        self.writable = False
+        if self._selected:
+            return
+
+        self._index += 1
+        if self._index < len(self.candidates):
+            self.path = self.candidates[self._index]
+            self.writable = None
+            self.free_bytes = None
+            self.refresh()
+            return
+
+        # No candidate passed; fall back to the home directory as before
+        self.logger.error("No suitable downloads directory found")
+        self.path = os.path.expanduser('~')
+        self.writable = None
+        self.free_bytes = None
+        self._select()
+        if self.unavailable_callback:
+            self.unavailable_callback()
+
+    def _select(self):
+        """Settle on the current candidate and watch it for changes."""
+        self._selected = True
+        self.logger.info(f"Downloads directory set to: {self.path}")
+
+        try:
+            self._file_monitor = Gio.File.new_for_path(self.path).monitor_directory(
+                Gio.FileMonitorFlags.NONE, None
+            )
+            self._file_monitor.connect("changed", self._on_directory_changed)
+        except GLib.Error as e:
+            self.logger.debug(f"Could not monitor {self.path}: {e.message}")
+
+        if self.path != self.candidates[0] and self.directory_changed_callback:
+            self.directory_changed_callback(self.path)
+
+    def _on_directory_changed(self, monitor, file, other_file, event_type):
+        """Schedule a refresh once a burst of changes settles."""
+        if self._debounce_source_id is None:
+            self._debounce_source_id = GLib.timeout_add(CHANGE_DEBOUNCE_MS, self._on_debounce_elapsed)
+
+    def _on_debounce_elapsed(self):
+        """Refresh after directory changes."""
+        self._debounce_source_id = None
+        self.refresh()
+        return False
+
+    def _on_refresh_timer(self):
+        """Refresh periodically to track free space."""
+        self.refresh()
+        return True
@@ -0,0 +1,248 @@
+"""
+Download journal for Karere application.
+
+Persists queued and running downloads (URI, destination, partial file,
+bytes received, the account they came from and the response validators)
+so that downloads interrupted by quitting Karere can be resumed on the
+next start, and a resumed response can be checked against the original.
+"""
+
+import os
+import json
+import time
+import base64
+import hashlib
+from typing import Any, Callable, Dict, List, Optional
+
+from .logging_config import get_logger
+
+
+PART_SUFFIX = ".part"
+
+# Minimum seconds between journal writes caused by progress updates
+SAVE_INTERVAL = 2.0
+
+RESUMABLE_SCHEMES = ("http://", "https://")
+
+# Response headers identifying the downloaded resource
+VALIDATOR_HEADERS = {
+    "etag": ("ETag",),
+    "last_modified": ("Last-Modified",),
+    "content_type": ("Content-Type",),
+    # Digest of the whole resource, so it also holds for range responses
+    "digest": ("Repr-Digest", "Digest"),
+}
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def get_default_journal_path() -> str:
+    """Get the default location of the download journal."""
+    data_dir = os.environ.get('XDG_DATA_HOME', os.path.expanduser('~/.local/share'))
+    return os.path.join(data_dir, 'karere', 'download-journal.json')
+
+
+def get_part_path(destination: str) -> str:
+    """Get the partial file path used while downloading to a destination."""
+    return destination + PART_SUFFIX
+
+
+def is_resumable_uri(uri: str) -> bool:
+    """Check whether a URI can be fetched again after a restart."""
+    # blob: and data: URIs only exist inside the page that created them
+    return uri.lower().startswith(RESUMABLE_SCHEMES)
+
+
+def get_validators(headers) -> Dict[str, str]:
+    """
+    Get the validators of a response.
+
+    Args:
+        headers: Response headers with a ``get_one(name)`` method (Soup.MessageHeaders)
+
+    Returns:
+        The validators present, keyed as in VALIDATOR_HEADERS
+    """
+    validators = {}
+    for key, names in VALIDATOR_HEADERS.items():
+        for name in names:
+            value = headers.get_one(name)
+            if value:
+                validators[key] = value.strip()
+                break
+    return validators
+
+
+def _media_type(content_type: str) -> str:
+    return content_type.split(';', 1)[0].strip().lower()
+
+
+def check_validators(expected: Dict[str, str], actual: Dict[str, str]) -> Optional[str]:
+    """
+    Check that a resumed response belongs to the resource downloaded before.
+
+    Args:
+        expected: Validators recorded from the original response
+        actual: Validators of the resumed response
+
+    Returns:
+        A description of the mismatch, or None if the response matches
+    """
+    for key in ("etag", "last_modified"):
+        if expected.get(key) and actual.get(key) and expected[key] != actual[key]:
+            return f"resource changed: {key} {expected[key]!r} became {actual[key]!r}"
+
+    expected_type = _media_type(expected.get("content_type", ""))
+    actual_type = _media_type(actual.get("content_type", ""))
+    if expected_type and actual_type and expected_type != actual_type:
+        return f"content type changed from {expected_type} to {actual_type}"
+    if actual_type == "text/html" and expected_type != "text/html":
+        # A login or error page instead of the media
+        return "server returned an HTML page"
+    return None
+
+
+def parse_sha256_digest(value: Optional[str]) -> Optional[bytes]:
+    """
+    Get the SHA-256 value from a Repr-Digest or Digest header.
+
+    Accepts both ``sha-256=:<base64>:`` (RFC 9530) and ``SHA-256=<base64>``
+    (RFC 3230).
+
+    Returns:
+        The raw digest, or None if the header has no SHA-256 value
+    """
+    for item in (value or "").split(','):
+        algorithm, separator, encoded = item.strip().partition('=')
+        if not separator or algorithm.strip().lower() != "sha-256":
+            continue
+        try:
+            digest = base64.b64decode(encoded.strip().strip(':'), validate=True)
+        except ValueError:
+            continue
+        if len(digest) == hashlib.sha256().digest_size:
+            return digest
+    return None
+
+
+def verify_download(part_path: str, expected_size: int, digest: Optional[str] = None) -> Optional[str]:
+    """
+    Check a finished partial file before it is renamed into place.
+
+    Args:
+        part_path: Partial file
+        expected_size: Size announced by the server, or 0 if unknown
+        digest: Repr-Digest or Digest header of the response, if the server sent one
+
+    Returns:
+        A description of the problem, or None if the file is intact
+    """
+    try:
+        size = os.path.getsize(part_path)
+    except OSError as e:
+        return f"partial file missing: {e}"
+
+    if expected_size and size != expected_size:
+        return f"size mismatch: expected {expected_size} bytes, got {size}"
+
+    expected_digest = parse_sha256_digest(digest)
+    if expected_digest is not None:
+        sha256 = hashlib.sha256()
+        try:
+            with open(part_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                    sha256.update(chunk)
+        except OSError as e:
+            return f"could not hash partial file: {e}"
+        if sha256.digest() != expected_digest:
+            return "SHA-256 digest mismatch"
+    return None
+
+
+class DownloadJournal:
+    """
+    JSON journal of unfinished downloads.
+
+    Writes are atomic (temporary file and rename) and progress updates are
+    written at most every SAVE_INTERVAL seconds.
+    """
+
+    def __init__(self, path: Optional[str] = None, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the download journal.
+
+        Args:
+            path: Journal file; defaults to the karere data directory
+            clock: Monotonic time source
+        """
+        self.path = path or get_default_journal_path()
+        self.clock = clock
+        self.logger = get_logger('download_journal')
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._last_save = 0.0
+        self._load()
+
+    def _load(self):
+        """Load the journal from disk."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.entries = {entry["id"]: entry for entry in data.get("downloads", [])}
+        except FileNotFoundError:
+            self.entries = {}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.logger.warning(f"Ignoring unreadable download journal {self.path}: {e}")
+            self.entries = {}
+
+    def save(self):
+        """Write the journal to disk."""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({"downloads": list(self.entries.values())}, f, separators=(',', ':'))
+            os.replace(temp_path, self.path)
+            self._last_save = self.clock()
+        except OSError as e:
+            self.logger.error(f"Failed to save download journal: {e}")
+
+    def record(self, entry_id: str, uri: str, destination: str, account_id: Optional[str] = None):
+        """Record a new download and the account it was started from."""
+        self.entries[entry_id] = {
+            "id": entry_id,
+            "uri": uri,
+            "destination": destination,
+            "part_path": get_part_path(destination),
+            "account_id": account_id,
+            "received": 0,
+            "total": 0,
+            "validators": {},
+        }
+        self.save()
+
+    def update_validators(self, entry_id: str, validators: Dict[str, str]):
+        """Record the validators of a download's response."""
+        entry = self.entries.get(entry_id)
+        if entry is None or entry.get("validators") == validators:
+            return
+        entry["validators"] = dict(validators)
+        self.save()
+
+    def update_progress(self, entry_id: str, received: int, total: int):
+        """Record progress, writing to disk at most every SAVE_INTERVAL seconds."""
+        entry = self.entries.get(entry_id)
+        if entry is None:
+            return
+        entry["received"] = received
+        entry["total"] = total
+        if self.clock() - self._last_save >= SAVE_INTERVAL:
+            self.save()
+
+    def remove(self, entry_id: str):
+        """Forget a download that completed or failed."""
+        if self.entries.pop(entry_id, None) is not None:
+            self.save()
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Get the downloads that did not finish."""
+        return list(self.entries.values())
@@ -0,0 +1,428 @@
+"""
+Download management for Karere application.
+
+Queues downloads requested by WhatsApp Web and runs a bounded number of
+them at a time, tracking throughput and ETA from WebKit download progress
+and forwarding throttled progress updates to the UI. Downloads are written
+to a partial file that is checked and renamed into place on completion,
+and unfinished downloads are journaled so they can resume after a restart.
+"""
+
+import os
+import time
+import uuid
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+
+from .logging_config import get_logger
+from .download_journal import (
+    DownloadJournal, get_part_path, get_validators, is_resumable_uri, verify_download
+)
+
+
+DEFAULT_MAX_CONCURRENT = 3
+
+# Minimum seconds between progress updates for a single download
+PROGRESS_INTERVAL = 0.5
+
+# Weight of the newest sample in the throughput moving average
+THROUGHPUT_SMOOTHING = 0.3
+
+
+class DownloadJob:
+    """A single queued or running download."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    def __init__(self, uri: str, destination: str, job_id: Optional[str] = None,
+                 resumed: bool = False):
+        self.uri = uri
+        self.destination = destination
+        self.part_path = get_part_path(destination)
+        self.job_id = job_id or uuid.uuid4().hex
+        self.resumed = resumed
+        self.state = self.QUEUED
+        self.webview = None
+        self.account_id: Optional[str] = None
+        self.validators: Dict[str, str] = {}
+        self.download = None
+        self.error = None
+
+        self.bytes_received = 0
+        self.total_bytes = 0
+        self.bytes_per_second = 0.0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+        self._handler_ids: List[int] = []
+        self._sample_time = 0.0
+        self._sample_bytes = 0
+        self._last_progress = 0.0
+
+    @property
+    def filename(self) -> str:
+        return os.path.basename(self.destination)
+
+    @property
+    def fraction(self) -> float:
+        """Completed fraction, or 0.0 when the size is unknown."""
+        if not self.total_bytes:
+            return 0.0
+        return min(1.0, self.bytes_received / self.total_bytes)
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """Estimated seconds remaining, or None when it cannot be estimated."""
+        if not self.total_bytes or self.bytes_per_second <= 0:
+            return None
+        return max(0.0, (self.total_bytes - self.bytes_received) / self.bytes_per_second)
+
+    def update_throughput(self, now: float):
+        """Fold the bytes received since the last sample into the moving average."""
+        elapsed = now - self._sample_time
+        if elapsed <= 0:
+            return
+        rate = (self.bytes_received - self._sample_bytes) / elapsed
+        if self.bytes_per_second:
+            rate = THROUGHPUT_SMOOTHING * rate + (1 - THROUGHPUT_SMOOTHING) * self.bytes_per_second
+        self.bytes_per_second = rate
+        self._sample_time = now
+        self._sample_bytes = self.bytes_received
+
+
+class DownloadManager:
+    """
+    Bounded-concurrency download queue.
+
+    Downloads are started in FIFO order through the WebView, at most
+    ``max_concurrent`` at a time. Callbacks run on the main loop, from the
+    WebKit download signals.
+
+    Downloads resumed from the journal are started through
+    ``resume_factory(job, progress_callback, done_callback)``, which returns
+    an object with ``start()`` and ``cancel()``. It reports progress with
+    ``progress_callback(job, bytes_received, total_bytes)`` and completion
+    with ``done_callback(job, error)``, where error is None on success. A
+    resumed job carries the account it was started from and the validators
+    of its original response, so the factory can authenticate the request
+    and check that the response is still the same resource.
+    """
+
+    def __init__(self, webview,
+                 max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+                 progress_callback: Optional[Callable[[DownloadJob], None]] = None,
+                 started_callback: Optional[Callable[[DownloadJob], None]] = None,
+                 finished_callback: Optional[Callable[[DownloadJob], None]] = None,
+                 journal: Optional[DownloadJournal] = None,
+                 resume_factory: Optional[Callable] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the download manager.
+
+        Args:
+            webview: WebView used to start downloads
+            max_concurrent: Maximum number of simultaneous downloads
+            progress_callback: Called with a job at most every PROGRESS_INTERVAL seconds
+            started_callback: Called when a job starts transferring
+            finished_callback: Called when a job completes, fails or is cancelled
+            journal: Journal recording unfinished downloads
+            resume_factory: Creates transfers for downloads resumed from the journal
+            clock: Monotonic time source
+        """
+        self.webview = webview
+        self.journal = journal
+        self.resume_factory = resume_factory
+        self.max_concurrent = max(1, max_concurrent)
+        self.progress_callback = progress_callback
+        self.started_callback = started_callback
+        self.finished_callback = finished_callback
+        self.clock = clock
+        self.logger = get_logger('downloads')
+
+        self.queue: Deque[DownloadJob] = deque()
+        self.active: Dict[int, DownloadJob] = {}
+        self._shutting_down = False
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of downloads waiting for a free slot."""
+        return len(self.queue)
+
+    def set_max_concurrent(self, max_concurrent: int):
+        """Change the concurrency limit, starting queued downloads if it grew."""
+        self.max_concurrent = max(1, max_concurrent)
+        self.logger.info(f"Maximum concurrent downloads set to {self.max_concurrent}")
+        self._start_next()
+
+    def enqueue(self, uri: str, destination: str, webview=None,
+                account_id: Optional[str] = None) -> DownloadJob:
+        """
+        Queue a download.
+
+        Args:
+            uri: URI to download
+            destination: Absolute path of the target file
+            webview: WebView to download through, so the download uses its
+                account's cookies; defaults to the manager's WebView
+            account_id: Account the download belongs to, journaled for resuming
+
+        Returns:
+            The queued job
+        """
+        job = DownloadJob(uri, destination)
+        job.webview = webview
+        job.account_id = account_id
+        if self._shutting_down:
+            job.state = DownloadJob.CANCELLED
+            return job
+
+        if self.journal:
+            self.journal.record(job.job_id, uri, destination, account_id)
+
+        self.queue.append(job)
+        self.logger.info(f"Download queued: {job.filename} "
+                         f"({len(self.active)} active, {len(self.queue)} queued)")
+        self._start_next()
+        return job
+
+    def resume_pending(self):
+        """Queue downloads left unfinished by a previous session."""
+        if not self.journal:
+            return
+
+        for entry in self.journal.pending():
+            if entry["id"] in (job.job_id for job in self.queue):
+                continue
+
+            if not (self.resume_factory and is_resumable_uri(entry["uri"])):
+                self.logger.info(f"Cannot resume download of {entry['destination']}: "
+                                 f"URI is no longer available")
+                self._discard_entry(entry)
+                continue
+
+            job = DownloadJob(entry["uri"], entry["destination"], job_id=entry["id"], resumed=True)
+            job.bytes_received = entry.get("received", 0)
+            job.total_bytes = entry.get("total", 0)
+            job.account_id = entry.get("account_id")
+            job.validators = dict(entry.get("validators") or {})
+            self.queue.append(job)
+            self.logger.info(f"Resuming download: {job.filename}")
+
+        self._start_next()
+
+    def _discard_entry(self, entry):
+        """Forget a journal entry and remove its leftover files."""
+        self.journal.remove(entry["id"])
+        for path in (entry["part_path"], entry["destination"]):
+            try:
+                # The destination is only an empty reservation at this point
+                if path == entry["part_path"] or os.path.getsize(path) == 0:
+                    os.unlink(path)
+            except OSError:
+                pass
+
+    def _start_next(self):
+        """Start queued downloads while there are free slots."""
+        while self.queue and len(self.active) < self.max_concurrent and not self._shutting_down:
+            job = self.queue.popleft()
+            try:
+                self._start(job)
+            except Exception as e:
+                self.logger.error(f"Error starting download {job.filename}: {e}")
+                job.error = str(e)
+                self._finish(job, DownloadJob.FAILED)
+
+    def _start(self, job: DownloadJob):
+        """Start a job through the WebView and connect its progress signals."""
+        if job.resumed:
+            self._start_resumed(job)
+            return
+
+        download = (job.webview or self.webview).download_uri(job.uri)
+        if not download:
+            raise RuntimeError("Failed to create download object")
+
+        job.download = download
+        job.state = DownloadJob.RUNNING
+        job.started_at = job._sample_time = job._last_progress = self.clock()
+        self.active[id(download)] = job
+
+        job._handler_ids = [
+            download.connect("decide-destination", self._on_decide_destination, job),
+            download.connect("received-data", self._on_received_data, job),
+            download.connect("failed", self._on_failed, job),
+            download.connect("finished", self._on_finished, job),
+        ]
+        self.logger.info(f"Download started: {job.destination}")
+
+        if self.started_callback:
+            self.started_callback(job)
+
+    def _start_resumed(self, job: DownloadJob):
+        """Start a journaled download through the resume factory."""
+        transfer = self.resume_factory(job, self._on_resume_progress, self._on_resume_done)
+        job.download = transfer
+        job.state = DownloadJob.RUNNING
+        job.started_at = job._sample_time = job._last_progress = self.clock()
+        job._sample_bytes = job.bytes_received
+        self.active[id(transfer)] = job
+        transfer.start()
+
+        if self.started_callback:
+            self.started_callback(job)
+
+    def _on_decide_destination(self, download, suggested_filename, job):
+        """Point the download at the partial file for its destination."""
+        download.set_allow_overwrite(True)
+        download.set_destination(job.part_path)
+        return True
+
+    def _on_received_data(self, download, data_length, job):
+        """Track progress and emit throttled progress updates."""
+        if not job.total_bytes:
+            job.total_bytes = self._get_content_length(download)
+        if not job.validators:
+            job.validators = self._get_validators(download)
+            if self.journal and job.validators:
+                self.journal.update_validators(job.job_id, job.validators)
+        self._update_progress(job, job.bytes_received + data_length)
+
+    def _on_resume_progress(self, job: DownloadJob, bytes_received: int, total_bytes: int):
+        """Track progress of a resumed download."""
+        job.total_bytes = total_bytes
+        if self.journal and job.validators:
+            self.journal.update_validators(job.job_id, job.validators)
+        self._update_progress(job, bytes_received)
+
+    def _update_progress(self, job: DownloadJob, bytes_received: int):
+        """Record progress and emit throttled progress updates."""
+        job.bytes_received = bytes_received
+
+        now = self.clock()
+        if now - job._last_progress < PROGRESS_INTERVAL:
+            return
+
+        job.update_throughput(now)
+        job._last_progress = now
+        if self.journal:
+            self.journal.update_progress(job.job_id, job.bytes_received, job.total_bytes)
+        if self.progress_callback:
+            self.progress_callback(job)
+
+    def _on_resume_done(self, job: DownloadJob, error: Optional[str]):
+        """Finish a resumed download."""
+        if job.state != DownloadJob.RUNNING:
+            return
+        if error:
+            job.error = error
+            self._finish(job, DownloadJob.FAILED)
+        else:
+            self._complete(job)
+
+    def _on_failed(self, download, error, job):
+        """Record a failure; 'finished' follows and releases the slot."""
+        job.error = getattr(error, 'message', None) or str(error)
+        if job.state == DownloadJob.RUNNING:
+            job.state = DownloadJob.FAILED
+
+    def _on_finished(self, download, job):
+        """Release the slot of a completed or failed download."""
+        if job.state == DownloadJob.RUNNING:
+            self._complete(job)
+        else:
+            self._finish(job, job.state)
+
+    def _complete(self, job: DownloadJob):
+        """Check the partial file and move it to its destination."""
+        problem = verify_download(job.part_path, job.total_bytes, job.validators.get("digest"))
+        if problem is None:
+            try:
+                os.replace(job.part_path, job.destination)
+            except OSError as e:
+                problem = f"could not move into place: {e}"
+
+        if problem:
+            job.error = f"Integrity check failed: {problem}"
+            self._finish(job, DownloadJob.FAILED)
+        else:
+            self._finish(job, DownloadJob.COMPLETED)
+
+    def _finish(self, job: DownloadJob, state: str):
+        """Mark a job done, notify listeners and start the next queued one."""
+        job.state = state
+        job.finished_at = self.clock()
+        if job.download is not None:
+            self.active.pop(id(job.download), None)
+            for handler_id in job._handler_ids:
+                try:
+                    job.download.disconnect(handler_id)
+                except Exception:
+                    pass
+            job._handler_ids = []
+
+        if state == DownloadJob.COMPLETED:
+            self.logger.info(f"Download completed: {job.filename}")
+        elif state == DownloadJob.FAILED:
+            self.logger.warning(f"Download failed: {job.filename}: {job.error}")
+            # Its journal entry goes away, so nothing would resume the partial file
+            try:
+                os.unlink(job.part_path)
+            except OSError:
+                pass
+
+        if self.journal:
+            if state == DownloadJob.CANCELLED:
+                # Kept in the journal so the download resumes on next start
+                self.journal.update_progress(job.job_id, job.bytes_received, job.total_bytes)
+            else:
+                self.journal.remove(job.job_id)
+
+        if self.finished_callback:
+            try:
+                self.finished_callback(job)
+            except Exception as e:
+                self.logger.error(f"Error in download finished callback: {e}")
+
+        self._start_next()
+
+    def _get_content_length(self, download) -> int:
+        """Get the expected size of a download, or 0 if unknown."""
+        try:
+            response = download.get_response()
+            return response.get_content_length() if response else 0
+        except Exception:
+            return 0
+
+    def _get_validators(self, download) -> Dict[str, str]:
+        """Get the validators of a download's response."""
+        try:
+            response = download.get_response()
+            headers = response.get_http_headers() if response else None
+            return get_validators(headers) if headers else {}
+        except Exception:
+            return {}
+
+    def cancel_all(self):
+        """Drop queued downloads and cancel running ones. Used on shutdown."""
+        self._shutting_down = True
+
+        while self.queue:
+            job = self.queue.popleft()
+            job.state = DownloadJob.CANCELLED
+
+        for job in list(self.active.values()):
+            job.state = DownloadJob.CANCELLED
+            try:
+                job.download.cancel()
+                self.logger.debug(f"Cancelled download: {job.destination}")
+            except Exception as e:
+                self.logger.warning(f"Failed to cancel download: {e}")
+            self._finish(job, DownloadJob.CANCELLED)
+
+        if self.journal:
+            self.journal.save()
+        self.logger.info("All downloads cancelled")
@@ -0,0 +1,167 @@
+"""
+Post-download processing for Karere application.
+
+Runs optional processing steps on completed downloads in a worker pool:
+EXIF stripping, content hashing with deduplication against earlier
+downloads, thumbnail generation for the completion notification and
+sorting into media folders. Results are delivered back on the GTK main
+loop.
+"""
+
+import gi
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+gi.require_version("GdkPixbuf", "2.0")
+
+from gi.repository import GdkPixbuf, GLib
+from .logging_config import get_logger
+from .media_processing import (
+    SORT_MEDIA_TYPE, hash_file, get_media_type, strip_exif, sort_by_media_type
+)
+from .dedup_index import DEDUP_OFF, DEDUP_DROP, DedupIndex, replace_with_link
+from .filename_allocator import FilenameAllocator
+
+
+DEFAULT_MAX_WORKERS = 2
+
+THUMBNAIL_SIZE = 128
+
+
+class DownloadPipeline:
+    """
+    Worker pool processing completed downloads off the main thread.
+    """
+
+    def __init__(self, result_callback: Callable[[Dict[str, Any]], None],
+                 max_workers: int = DEFAULT_MAX_WORKERS):
+        """
+        Initialize the download pipeline.
+
+        Args:
+            result_callback: Called on the main loop with each result
+            max_workers: Number of worker threads
+        """
+        self.result_callback = result_callback
+        self.logger = get_logger('download_pipeline')
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="karere-download")
+
+        cache_dir = os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache'))
+        self.thumbnail_dir = os.path.join(cache_dir, 'karere', 'thumbnails')
+
+        # Opened on first use, from a worker thread
+        self._dedup_index: Optional[DedupIndex] = None
+        self._dedup_lock = threading.Lock()
+
+        # Media folders scanned once and shared by the workers; allocators
+        # are not thread safe, so sorting holds the lock
+        self._sort_allocators: Dict[str, FilenameAllocator] = {}
+        self._sort_lock = threading.Lock()
+
+    def submit(self, path: str, strip_metadata: bool = False, sort_mode: Optional[str] = None,
+               dedup_mode: str = DEDUP_OFF):
+        """
+        Queue a completed download for processing.
+
+        Args:
+            path: Path of the downloaded file
+            strip_metadata: Whether to strip EXIF metadata from images
+            sort_mode: Sort mode ('none' or 'media-type')
+            dedup_mode: Deduplication mode ('off', 'hardlink', 'reflink' or 'drop')
+        """
+        try:
+            self.executor.submit(self._process, path, strip_metadata, sort_mode, dedup_mode)
+        except RuntimeError as e:
+            # The pool is shutting down
+            self.logger.debug(f"Not processing {path}: {e}")
+
+    def _get_dedup_index(self) -> DedupIndex:
+        """Open the dedup index on first use."""
+        with self._dedup_lock:
+            if self._dedup_index is None:
+                self._dedup_index = DedupIndex()
+            return self._dedup_index
+
+    def _get_sort_allocator(self, directory: str) -> FilenameAllocator:
+        """Get the filename allocator of a media folder; call with the sort lock held."""
+        allocator = self._sort_allocators.get(directory)
+        if allocator is None:
+            allocator = self._sort_allocators[directory] = FilenameAllocator(directory)
+        return allocator
+
+    def _process(self, path: str, strip_metadata: bool, sort_mode: Optional[str], dedup_mode: str):
+        """Run the processing steps for one file (worker thread)."""
+        result: Dict[str, Any] = {
+            "original_path": path,
+            "path": path,
+            "media_type": get_media_type(path),
+            "content_hash": None,
+            "thumbnail": None,
+            "metadata_stripped": False,
+            "duplicate_of": None,
+            "dropped": False,
+            "error": None,
+        }
+
+        try:
+            if strip_metadata and result["media_type"] == "image":
+                result["metadata_stripped"] = strip_exif(path)
+
+            content_hash = result["content_hash"] = hash_file(path)
+
+            if dedup_mode != DEDUP_OFF:
+                dedup_index = self._get_dedup_index()
+                existing = dedup_index.lookup(content_hash)
+                if existing and existing != path:
+                    result["duplicate_of"] = existing
+                    result["path"] = path = replace_with_link(path, existing, dedup_mode)
+                    result["dropped"] = dedup_mode == DEDUP_DROP
+
+            if result["media_type"] == "image":
+                result["thumbnail"] = self._create_thumbnail(path, content_hash)
+
+            if sort_mode == SORT_MEDIA_TYPE and not result["dropped"]:
+                with self._sort_lock:
+                    result["path"] = sort_by_media_type(path, self._get_sort_allocator)
+
+            if dedup_mode != DEDUP_OFF and result["duplicate_of"] is None:
+                dedup_index.add(content_hash, result["path"])
+        except Exception as e:
+            self.logger.error(f"Error processing download {path}: {e}")
+            result["error"] = str(e)
+
+        GLib.idle_add(self._deliver, result)
+
+    def _create_thumbnail(self, path: str, content_hash: str) -> Optional[str]:
+        """Create a notification thumbnail, cached by content hash."""
+        thumbnail_path = os.path.join(self.thumbnail_dir, f"{content_hash[:32]}.png")
+        if os.path.exists(thumbnail_path):
+            return thumbnail_path
+
+        try:
+            os.makedirs(self.thumbnail_dir, exist_ok=True)
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(path, THUMBNAIL_SIZE, THUMBNAIL_SIZE, True)
+            pixbuf.savev(thumbnail_path, "png", [], [])
+            return thumbnail_path
+        except (GLib.Error, OSError) as e:
+            self.logger.debug(f"Could not create thumbnail for {path}: {e}")
+            return None
+
+    def _deliver(self, result: Dict[str, Any]):
+        """Hand a result to the callback on the main loop."""
+        try:
+            self.result_callback(result)
+        except Exception as e:
+            self.logger.error(f"Error in download pipeline callback: {e}")
+        return False
+
+    def shutdown(self):
+        """Stop accepting work and drop files that have not started processing."""
+        try:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        except TypeError:
+            # cancel_futures needs Python 3.9
+            self.executor.shutdown(wait=False)
@@ -0,0 +1,219 @@
+"""
+Resuming interrupted downloads for Karere application.
+
+Continues a journaled download with an HTTP range request starting at the
+size of its partial file. The request carries the cookies of the account
+the download came from, and If-Range with the original response's ETag or
+Last-Modified, so a changed resource is answered in full. A full answer to
+a range request, or a response whose validators differ from the original
+(such as a login page), fails the download instead of overwriting the
+partial file.
+
+Proxy settings come from the system proxy resolver, as for the WebViews.
+"""
+
+import gi
+import os
+import re
+from typing import Callable, Optional
+
+gi.require_version("Soup", "3.0")
+
+from gi.repository import Gio, GLib, Soup
+from .logging_config import get_logger
+from .download_journal import check_validators, get_validators
+
+
+CHUNK_SIZE = 64 * 1024
+
+CONTENT_RANGE_TOTAL = re.compile(r"bytes\s+\d+-\d+/(\d+)")
+
+_session: Optional[Soup.Session] = None
+
+
+def get_session() -> Soup.Session:
+    """Get the shared HTTP session used for resumed downloads."""
+    global _session
+    if _session is None:
+        _session = Soup.Session()
+    return _session
+
+
+class ResumableTransfer:
+    """
+    A single resumed download, streamed asynchronously into its partial file.
+
+    Created by DownloadManager through ``create_resumable_transfer``.
+    """
+
+    def __init__(self, job, progress_callback: Callable, done_callback: Callable,
+                 cookie_manager=None):
+        """
+        Initialize the transfer.
+
+        Args:
+            job: DownloadJob to resume
+            progress_callback: Called with (job, bytes_received, total_bytes)
+            done_callback: Called with (job, error), error being None on success
+            cookie_manager: WebKit.CookieManager of the job's account
+        """
+        self.job = job
+        self.cookie_manager = cookie_manager
+        self.progress_callback = progress_callback
+        self.done_callback = done_callback
+        self.logger = get_logger('download_resume')
+
+        self.cancellable = Gio.Cancellable()
+        self.message: Optional[Soup.Message] = None
+        self.input_stream = None
+        self.output_stream = None
+        self.received = 0
+        self.offset = 0
+        self.total = 0
+
+    def start(self):
+        """Fetch the account's cookies, then send the (range) request."""
+        if self.cookie_manager is None:
+            self._send(None)
+            return
+        self.cookie_manager.get_cookies(self.job.uri, self.cancellable, self._on_cookies)
+
+    def _on_cookies(self, cookie_manager, result):
+        try:
+            cookies = cookie_manager.get_cookies_finish(result)
+        except GLib.Error as e:
+            self._done(f"could not read cookies: {e.message}")
+            return
+        self._send(Soup.cookies_to_cookie_header(cookies) if cookies else None)
+
+    def _send(self, cookie_header: Optional[str]):
+        """Send the request, as a range request if part of the file is there."""
+        try:
+            self.offset = os.path.getsize(self.job.part_path)
+        except OSError:
+            self.offset = 0
+
+        self.message = Soup.Message.new("GET", self.job.uri)
+        headers = self.message.get_request_headers()
+        if cookie_header:
+            headers.append("Cookie", cookie_header)
+        if self.offset:
+            headers.append("Range", f"bytes={self.offset}-")
+            validator = self.job.validators.get("etag") or self.job.validators.get("last_modified")
+            if validator:
+                headers.append("If-Range", validator)
+        self.received = self.offset
+
+        self.logger.info(f"Resuming {self.job.filename} from byte {self.offset}")
+        get_session().send_async(self.message, GLib.PRIORITY_LOW, self.cancellable, self._on_sent)
+
+    def cancel(self):
+        """Stop the transfer; the partial file is kept for the next start."""
+        self.cancellable.cancel()
+
+    def _on_sent(self, session, result):
+        """Open the partial file according to the server's answer."""
+        try:
+            self.input_stream = session.send_finish(result)
+        except GLib.Error as e:
+            self._done(e.message)
+            return
+
+        status = self.message.get_status()
+        headers = self.message.get_response_headers()
+        part_file = Gio.File.new_for_path(self.job.part_path)
+
+        if status in (Soup.Status.OK, Soup.Status.PARTIAL_CONTENT):
+            validators = get_validators(headers)
+            problem = check_validators(self.job.validators, validators)
+            if problem:
+                self._done(problem)
+                return
+            # Keep the original values; only fill in what was unknown
+            self.job.validators = dict(validators, **self.job.validators)
+
+        try:
+            if status == Soup.Status.PARTIAL_CONTENT:
+                match = CONTENT_RANGE_TOTAL.match(headers.get_one("Content-Range") or "")
+                self.total = int(match.group(1)) if match else 0
+                self.output_stream = part_file.append_to(Gio.FileCreateFlags.NONE, self.cancellable)
+            elif status == Soup.Status.OK and self.offset:
+                # The server ignored the range or If-Range found the resource changed
+                self._done("server answered the range request with the full resource")
+                return
+            elif status == Soup.Status.OK:
+                self.total = headers.get_content_length()
+                self.output_stream = part_file.replace(None, False, Gio.FileCreateFlags.NONE, self.cancellable)
+            elif status == Soup.Status.REQUESTED_RANGE_NOT_SATISFIABLE and self.received:
+                # The partial file already holds the whole resource
+                self.total = self.received
+                self._done(None)
+                return
+            else:
+                self._done(f"HTTP {status} {self.message.get_reason_phrase()}")
+                return
+        except GLib.Error as e:
+            self._done(e.message)
+            return
+
+        self.progress_callback(self.job, self.received, self.total)
+        self._read_next()
+
+    def _read_next(self):
+        self.input_stream.read_bytes_async(CHUNK_SIZE, GLib.PRIORITY_LOW, self.cancellable, self._on_read)
+
+    def _on_read(self, stream, result):
+        """Write a received chunk, or finish at end of stream."""
+        try:
+            data = stream.read_bytes_finish(result)
+        except GLib.Error as e:
+            self._done(e.message)
+            return
+
+        if data.get_size() == 0:
+            self._done(None)
+            return
+
+        self._write(data)
+
+    def _write(self, data):
+        self.output_stream.write_bytes_async(data, GLib.PRIORITY_LOW, self.cancellable,
+                                             self._on_written, data)
+
+    def _on_written(self, stream, result, data):
+        """Report progress and read the next chunk once the data is written."""
+        try:
+            written = stream.write_bytes_finish(result)
+        except GLib.Error as e:
+            self._done(e.message)
+            return
+
+        self.received += written
+        size = data.get_size()
+        if written < size:
+            self._write(GLib.Bytes.new_from_bytes(data, written, size - written))
+            return
+
+        self.progress_callback(self.job, self.received, self.total)
+        self._read_next()
+
+    def _done(self, error: Optional[str]):
+        """Close the streams and report the outcome."""
+        for stream in (self.output_stream, self.input_stream):
+            if stream is not None:
+                try:
+                    stream.close(None)
+                except GLib.Error:
+                    pass
+
+        if self.cancellable.is_cancelled():
+            return
+        if error is None:
+            self.job.total_bytes = self.total
+        self.done_callback(self.job, error)
+
+
+def create_resumable_transfer(job, progress_callback: Callable, done_callback: Callable,
+                              cookie_manager=None) -> ResumableTransfer:
+    """Resume factory for DownloadManager; bind cookie_manager to the job's account."""
+    return ResumableTransfer(job, progress_callback, done_callback, cookie_manager)
@@ -0,0 +1,103 @@
+"""
+WhatsApp Web endpoint configuration for Karere application.
+
+The page Karere loads defaults to https://web.whatsapp.com and can be
+pointed elsewhere (a local stand-in for tests and benchmarks) with, in
+order of precedence:
+
+    1. the --web-url command line option
+    2. the KARERE_WEB_URL environment variable
+    3. the web-url setting
+"""
+
+import os
+from typing import Optional
+
+from .link_router import INTERNAL_DOMAINS, split_uri
+
+
+DEFAULT_WEB_URL = "https://web.whatsapp.com"
+
+WEB_URL_ENV = "KARERE_WEB_URL"
+
+# Set from the command line; wins over the environment and settings
+_web_url_override: Optional[str] = None
+
+
+def normalize_web_url(url: Optional[str]) -> Optional[str]:
+    """
+    Normalize a configured URL, adding https:// when no scheme is given.
+
+    Args:
+        url: URL as configured, possibly empty
+
+    Returns:
+        The normalized URL, or None if the value is empty
+    """
+    if not url or not url.strip():
+        return None
+    url = url.strip()
+    if "://" not in url:
+        url = f"https://{url}"
+    return url
+
+
+def set_web_url_override(url: Optional[str]):
+    """Set the URL given on the command line."""
+    global _web_url_override
+    _web_url_override = normalize_web_url(url)
+
+
+def get_web_url(settings=None) -> str:
+    """
+    Get the WhatsApp Web URL to load.
+
+    Args:
+        settings: Gio.Settings of the application, if available
+
+    Returns:
+        The configured URL, or DEFAULT_WEB_URL
+    """
+    candidates = [_web_url_override, os.environ.get(WEB_URL_ENV)]
+    if settings is not None:
+        candidates.append(settings.get_string("web-url"))
+
+    for candidate in candidates:
+        url = normalize_web_url(candidate)
+        if url:
+            return url
+    return DEFAULT_WEB_URL
+
+
+def get_web_host(web_url: str) -> str:
+    """Get the host of a WhatsApp Web URL."""
+    return split_uri(web_url)[1]
+
+
+def get_internal_domains(web_url: str) -> tuple:
+    """Get the built-in internal domains plus the host of the configured endpoint."""
+    host = get_web_host(web_url)
+    if host and host not in INTERNAL_DOMAINS:
+        return INTERNAL_DOMAINS + (host,)
+    return INTERNAL_DOMAINS
+
+
+def is_on_endpoint(uri: Optional[str], web_url: str) -> bool:
+    """
+    Check whether a URI belongs to the configured WhatsApp Web endpoint.
+
+    Args:
+        uri: Current URI of the WebView
+        web_url: Configured WhatsApp Web URL
+
+    Returns:
+        True if the URI is on the endpoint's host or one of its subdomains
+    """
+    if not uri:
+        return False
+    host = split_uri(uri)[1]
+    web_host = get_web_host(web_url)
+    if web_host.endswith(".whatsapp.com"):
+        # WhatsApp moves between its own subdomains while logging in
+        web_host = "whatsapp.com"
+    return bool(host) and (host == web_host or host.endswith(f".{web_host}"))
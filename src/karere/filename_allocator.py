@@ -0,0 +1,145 @@
+"""
+Unique download filename allocation for Karere application.
+
+Picks a free name like ``WhatsApp Image.jpg``, ``WhatsApp Image_1.jpg``,
+``WhatsApp Image_2.jpg`` without probing the filesystem once per candidate.
+The highest suffix in use for each base name is cached from a single scan
+of the downloads directory, and names are reserved by creating the file
+exclusively so concurrent downloads never share a destination.
+"""
+
+import os
+from typing import Dict, Optional, Set, Tuple
+
+from .logging_config import get_logger
+
+
+DEFAULT_FILENAME = "whatsapp_download"
+
+# Upper bound on retries when other processes keep taking names
+MAX_RESERVATION_ATTEMPTS = 100
+
+
+def split_filename(filename: str) -> Tuple[str, Optional[int], str]:
+    """
+    Split a filename into base name, numeric suffix and extension.
+
+    Args:
+        filename: Filename such as 'photo_3.jpg'
+
+    Returns:
+        Tuple such as ('photo', 3, '.jpg'); the suffix is None when absent
+    """
+    stem, ext = os.path.splitext(filename)
+    base, separator, suffix = stem.rpartition('_')
+    if separator and base and suffix.isdigit() and suffix == str(int(suffix)):
+        return base, int(suffix), ext
+    return stem, None, ext
+
+
+class FilenameAllocator:
+    """
+    Allocates unique filenames in a directory.
+
+    The cache records which exact names are taken and, per (base name,
+    extension), the highest suffix seen. A suggested name is used as is
+    while it is free; otherwise the next suffix above the highest one is
+    tried. The cache only ever grows, so it may be stale after files are
+    deleted but never hands out a name that was already taken; names
+    created behind our back are caught by the exclusive create.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initialize the allocator.
+
+        Args:
+            directory: Directory to allocate names in
+        """
+        self.directory = directory
+        self.logger = get_logger('filename_allocator')
+        self._taken: Optional[Set[Tuple[str, str]]] = None
+        self._max_suffix: Dict[Tuple[str, str], int] = {}
+
+    def _ensure_scanned(self):
+        """Build the suffix cache from one scan of the directory."""
+        if self._taken is not None:
+            return
+
+        self._taken = set()
+        self._max_suffix = {}
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    self._record_name(entry.name)
+        except OSError as e:
+            self.logger.warning(f"Could not scan {self.directory}: {e}")
+
+        self.logger.debug(f"Indexed {len(self._taken)} names in {self.directory}")
+
+    def _record_name(self, filename: str):
+        """Record a filename as taken."""
+        self._taken.add(os.path.splitext(filename))
+
+        base, suffix, ext = split_filename(filename)
+        if suffix is not None:
+            key = (base, ext)
+            if suffix > self._max_suffix.get(key, -1):
+                self._max_suffix[key] = suffix
+
+    def allocate(self, filename: str) -> str:
+        """
+        Reserve a unique path for a filename.
+
+        The returned path exists as an empty file, so the download must be
+        allowed to overwrite it.
+
+        Args:
+            filename: Suggested filename
+
+        Returns:
+            Absolute path of the reserved file
+
+        Raises:
+            OSError: If no file could be created in the directory
+        """
+        self._ensure_scanned()
+
+        filename = os.path.basename(filename)
+        if not filename or filename in ('.', '..'):
+            filename = DEFAULT_FILENAME
+
+        stem, ext = os.path.splitext(filename)
+        key = (stem, ext)
+
+        for _ in range(MAX_RESERVATION_ATTEMPTS):
+            if key not in self._taken:
+                candidate = filename
+            else:
+                candidate = f"{stem}_{self._max_suffix.get(key, 0) + 1}{ext}"
+            path = os.path.join(self.directory, candidate)
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+            except FileExistsError:
+                # Created outside Karere since the scan
+                self._record_name(candidate)
+                continue
+
+            os.close(fd)
+            self._record_name(candidate)
+            return path
+
+        raise FileExistsError(f"No free filename for {filename} in {self.directory}")
+
+    def record(self, path: str):
+        """Record a completed download so its name stays taken."""
+        if self._taken is not None and os.path.dirname(path) == self.directory:
+            self._record_name(os.path.basename(path))
+
+    def release(self, path: str):
+        """Remove the reservation of a download that did not complete."""
+        try:
+            if os.path.getsize(path) == 0:
+                os.unlink(path)
+        except OSError:
+            pass
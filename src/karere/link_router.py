@@ -0,0 +1,162 @@
+"""
+Link routing for Karere application.
+
+Decides whether a navigation stays inside the WhatsApp Web view or opens in
+the system browser. Domain rules are precompiled into suffix sets so each
+decision costs one set lookup per host label, and recent decisions are kept
+in a small LRU cache.
+"""
+
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple
+
+
+# WhatsApp domains that stay internal, including their subdomains
+INTERNAL_DOMAINS = (
+    'web.whatsapp.com',
+    'whatsapp.com',
+    'www.whatsapp.com',
+    'static.whatsapp.net',
+    'pps.whatsapp.net',
+)
+
+# Schemes that are always handled inside the WebView
+INTERNAL_SCHEMES = frozenset({'data', 'blob', 'javascript', 'about'})
+
+DEFAULT_CACHE_SIZE = 256
+
+# Decisions, in order of precedence when several rules match the same suffix
+_EXTERNAL = True
+_INTERNAL = False
+
+
+def normalize_domain(domain: str) -> str:
+    """Normalize a domain rule ('*.Example.com.' -> 'example.com')."""
+    domain = domain.strip().lower().rstrip('.')
+    if domain.startswith('*.'):
+        domain = domain[2:]
+    return domain.lstrip('.')
+
+
+def split_uri(uri: str) -> Tuple[str, str]:
+    """
+    Extract the scheme and host of a URI without a full parse.
+
+    Args:
+        uri: URI to split
+
+    Returns:
+        Tuple of lowercase scheme and host ('' when absent)
+    """
+    scheme, separator, rest = uri.partition(':')
+    if not separator or not scheme.isascii() or '/' in scheme:
+        # No scheme, e.g. a relative URL
+        return '', ''
+
+    scheme = scheme.lower()
+    if not rest.startswith('//'):
+        return scheme, ''
+
+    authority = rest[2:]
+    for delimiter in '/?#':
+        index = authority.find(delimiter)
+        if index != -1:
+            authority = authority[:index]
+
+    # Drop user info and port
+    host = authority.rpartition('@')[2]
+    if host.startswith('['):
+        host = host[:host.find(']') + 1]
+    else:
+        host = host.partition(':')[0]
+
+    return scheme, host.lower().rstrip('.')
+
+
+class LinkRouter:
+    """
+    Routes URIs to the WebView or the external browser.
+
+    User rules take precedence over the built-in WhatsApp domains, and the
+    most specific matching domain wins, so a rule for 'faq.whatsapp.com'
+    overrides the built-in 'whatsapp.com'. At the same specificity,
+    external rules win over internal ones.
+    """
+
+    def __init__(self, internal_domains: Iterable[str] = INTERNAL_DOMAINS,
+                 user_internal_domains: Iterable[str] = (),
+                 user_external_domains: Iterable[str] = (),
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        """
+        Initialize the link router.
+
+        Args:
+            internal_domains: Built-in domains that stay internal
+            user_internal_domains: User rules forcing domains to stay internal
+            user_external_domains: User rules forcing domains to open externally
+            cache_size: Number of recent decisions to remember
+        """
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, str], bool]" = OrderedDict()
+        self._builtin_internal = frozenset(normalize_domain(d) for d in internal_domains)
+        self.set_user_rules(user_internal_domains, user_external_domains)
+
+    def set_user_rules(self, internal_domains: Iterable[str], external_domains: Iterable[str]):
+        """Replace the user allow/deny rules and invalidate cached decisions."""
+        self._user_internal = frozenset(filter(None, map(normalize_domain, internal_domains)))
+        self._user_external = frozenset(filter(None, map(normalize_domain, external_domains)))
+        self._cache.clear()
+
+    def should_open_externally(self, uri: Optional[str]) -> bool:
+        """
+        Determine if a URI should be opened in the external browser.
+
+        Args:
+            uri: URI of the navigation
+
+        Returns:
+            True if the URI should open externally, False to keep it internal
+        """
+        if not uri:
+            return False
+
+        key = split_uri(uri)
+        cache = self._cache
+        decision = cache.get(key)
+        if decision is not None:
+            cache.move_to_end(key)
+            return decision
+
+        decision = self._decide(*key)
+        cache[key] = decision
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return decision
+
+    def _decide(self, scheme: str, host: str) -> bool:
+        """Decide a (scheme, host) pair without consulting the cache."""
+        # Internal schemes and relative URLs stay internal
+        if scheme in INTERNAL_SCHEMES or not host:
+            return _INTERNAL
+
+        builtin_match = None
+        suffix = host
+        while True:
+            # User rules are checked before the built-in domains at each level
+            if suffix in self._user_external:
+                return _EXTERNAL
+            if suffix in self._user_internal:
+                return _INTERNAL
+            if builtin_match is None and suffix in self._builtin_internal:
+                builtin_match = _INTERNAL
+
+            dot = suffix.find('.')
+            if dot == -1:
+                break
+            suffix = suffix[dot + 1:]
+
+        if builtin_match is not None:
+            return builtin_match
+
+        # Only open external domains in browser
+        return _EXTERNAL
@@ -83,6 +83,13 @@ def parse_args():
             help='Enable debug mode (show detailed error information)'
         )
         
+        # Applied by KarereApplication.do_handle_local_options
+        parser.add_argument(
+            '--web-url',
+            metavar='URL',
+            help='Load WhatsApp Web from this URL instead of https://web.whatsapp.com'
+        )
+        
         return parser.parse_args()
     except Exception as e:
         print(f"Error parsing command line arguments: {e}", file=sys.stderr)
@@ -0,0 +1,190 @@
+"""
+Media file processing helpers for Karere application.
+
+Pure-Python building blocks for the post-download pipeline: content
+hashing, EXIF metadata stripping for JPEG and PNG images, and sorting files
+into per-media-type folders with a rename.
+"""
+
+import os
+import shutil
+import hashlib
+import mimetypes
+from typing import Callable, Optional
+
+from .logging_config import get_logger
+from .filename_allocator import FilenameAllocator
+
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+SORT_NONE = "none"
+SORT_MEDIA_TYPE = "media-type"
+
+MEDIA_TYPE_DIRECTORIES = {
+    "image": "Images",
+    "video": "Videos",
+    "audio": "Audio",
+}
+DEFAULT_MEDIA_DIRECTORY = "Documents"
+
+JPEG_SIGNATURE = b"\xff\xd8"
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+EXIF_HEADER = b"Exif\x00\x00"
+
+logger = get_logger('media_processing')
+
+
+def hash_file(path: str) -> str:
+    """
+    Compute the SHA-256 digest of a file, reading it in chunks.
+
+    Args:
+        path: File to hash
+
+    Returns:
+        Hex digest of the file content
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_media_type(path: str) -> str:
+    """Get the top-level media type of a file ('image', 'video', ...)."""
+    mime_type, _ = mimetypes.guess_type(path)
+    return mime_type.split('/', 1)[0] if mime_type else "application"
+
+
+def strip_jpeg_exif(data: bytes) -> Optional[bytes]:
+    """
+    Remove EXIF APP1 segments from JPEG data.
+
+    Returns:
+        The stripped data, or None if there was nothing to strip or the
+        data could not be parsed
+    """
+    if not data.startswith(JPEG_SIGNATURE):
+        return None
+
+    output = [JPEG_SIGNATURE]
+    stripped = False
+    i = 2
+    while i + 1 < len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker
+            i += 1
+            continue
+        if marker in (0xD9, 0xDA):
+            # End of image, or start of scan: the rest is entropy-coded data
+            output.append(data[i:])
+            break
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            output.append(data[i:i + 2])
+            i += 2
+            continue
+
+        length = int.from_bytes(data[i + 2:i + 4], 'big')
+        if length < 2:
+            return None
+        segment = data[i:i + 2 + length]
+        if marker == 0xE1 and segment[4:10] == EXIF_HEADER:
+            stripped = True
+        else:
+            output.append(segment)
+        i += 2 + length
+
+    return b"".join(output) if stripped else None
+
+
+def strip_png_exif(data: bytes) -> Optional[bytes]:
+    """
+    Remove eXIf chunks from PNG data.
+
+    Returns:
+        The stripped data, or None if there was nothing to strip or the
+        data could not be parsed
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        return None
+
+    output = [PNG_SIGNATURE]
+    stripped = False
+    i = len(PNG_SIGNATURE)
+    while i + 8 <= len(data):
+        length = int.from_bytes(data[i:i + 4], 'big')
+        chunk_type = data[i + 4:i + 8]
+        end = i + 12 + length
+        if end > len(data):
+            return None
+        if chunk_type == b"eXIf":
+            stripped = True
+        else:
+            output.append(data[i:end])
+        i = end
+        if chunk_type == b"IEND":
+            break
+
+    return b"".join(output) if stripped else None
+
+
+def strip_exif(path: str) -> bool:
+    """
+    Strip EXIF metadata from a JPEG or PNG image in place.
+
+    Args:
+        path: Image file
+
+    Returns:
+        True if metadata was removed
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    stripped = strip_jpeg_exif(data)
+    if stripped is None:
+        stripped = strip_png_exif(data)
+    if stripped is None:
+        return False
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(stripped)
+    shutil.copymode(path, temp_path)
+    os.replace(temp_path, path)
+    logger.debug(f"Stripped {len(data) - len(stripped)} bytes of EXIF metadata from {path}")
+    return True
+
+
+def sort_by_media_type(path: str,
+                       get_allocator: Callable[[str], FilenameAllocator] = FilenameAllocator) -> str:
+    """
+    Move a file into a per-media-type folder next to it.
+
+    The move is a rename, so no data is copied. The target name is
+    reserved through a FilenameAllocator, so collisions cost one directory
+    scan and a bounded number of attempts.
+
+    Args:
+        path: File to move
+        get_allocator: Returns the allocator for a folder, so callers can
+            reuse its scan across files
+
+    Returns:
+        The new path of the file
+
+    Raises:
+        OSError: If no name could be reserved in the folder
+    """
+    folder = MEDIA_TYPE_DIRECTORIES.get(get_media_type(path), DEFAULT_MEDIA_DIRECTORY)
+    directory = os.path.join(os.path.dirname(path), folder)
+    os.makedirs(directory, exist_ok=True)
+
+    destination = get_allocator(directory).allocate(os.path.basename(path))
+    os.replace(path, destination)
+    return destination
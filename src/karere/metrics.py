@@ -0,0 +1,111 @@
+"""
+Runtime metrics for Karere application.
+
+A small in-process registry of counters, gauges and timings that the
+application updates as it runs and the D-Bus health interface reads.
+Updating a metric is a dictionary operation, so it is cheap enough to do
+on every notification and page load.
+"""
+
+import threading
+from typing import Any, Dict, Optional
+
+
+class Timing:
+    """Summary of a repeated duration measurement, in seconds."""
+
+    __slots__ = ("count", "last", "total", "maximum")
+
+    def __init__(self):
+        self.count = 0
+        self.last = 0.0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.last = seconds
+        self.total += seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+
+    @property
+    def average(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class Metrics:
+    """
+    Registry of named counters, gauges and timings.
+
+    Safe to update from worker threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {}
+        self._gauges: Dict[str, float] = {}
+        self._timings: Dict[str, Timing] = {}
+
+    def increment(self, name: str, amount: int = 1):
+        """Increment a counter."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def set_gauge(self, name: str, value: float):
+        """Set a gauge to its current value."""
+        with self._lock:
+            self._gauges[name] = value
+
+    def record_timing(self, name: str, seconds: float):
+        """Add a duration measurement."""
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                timing = self._timings[name] = Timing()
+            timing.add(seconds)
+
+    def get_counter(self, name: str) -> int:
+        return self._counters.get(name, 0)
+
+    def get_gauge(self, name: str, default: float = 0.0) -> float:
+        return self._gauges.get(name, default)
+
+    def get_timing(self, name: str) -> Timing:
+        return self._timings.get(name) or Timing()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get a copy of all metrics."""
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "timings": {
+                    name: {"count": t.count, "last": t.last, "average": t.average, "max": t.maximum}
+                    for name, t in self._timings.items()
+                },
+            }
+
+
+def get_rss_bytes() -> int:
+    """Get the resident set size of this process in bytes, or 0 if unknown."""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+# Global metrics registry
+_metrics: Optional[Metrics] = None
+
+
+def get_metrics() -> Metrics:
+    """Get the global metrics registry."""
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics()
+    return _metrics
@@ -0,0 +1,146 @@
+"""
+Background power mode for Karere application.
+
+Accounts whose tab is not shown, and all accounts while the window is
+hidden, keep running WhatsApp Web's animations and timers for nobody. In
+background mode an account's WebView:
+
+    - runs requestAnimationFrame callbacks at most once per
+      BACKGROUND_FRAME_INTERVAL_MS, through an injected user script
+    - enables WebKit's hidden-page timer throttling and CSS animation
+      suspension, where this WebKit version exposes them
+    - requires a user gesture before media starts playing
+
+Switching back to the foreground undoes all of it at once, and deferred
+animation frames run on the next real frame. Network activity is never
+throttled, so notifications and the connection keep-alive continue.
+"""
+
+import gi
+from typing import List
+
+gi.require_version("WebKit", "6.0")
+
+from gi.repository import WebKit
+from .logging_config import get_logger
+
+
+# Longest delay of a requestAnimationFrame callback in background mode
+BACKGROUND_FRAME_INTERVAL_MS = 1000
+
+# WebKit features that only act on hidden pages, enabled in background mode.
+# Automatically increasing timer throttling is left off, since it can delay
+# the connection keep-alive.
+BACKGROUND_FEATURES = (
+    "HiddenPageDOMTimerThrottlingEnabled",
+    "HiddenPageCSSAnimationSuspensionEnabled",
+)
+
+BACKGROUND_SCRIPT = f"""
+(function() {{
+    if (window.__karereSetBackground) {{
+        return;
+    }}
+
+    const nativeRequestAnimationFrame = window.requestAnimationFrame.bind(window);
+    const nativeCancelAnimationFrame = window.cancelAnimationFrame.bind(window);
+    const deferred = new Map();
+    let background = false;
+    let nextId = -1;  // Negative, so deferred ids never clash with native ones
+    let timer = null;
+
+    function runDeferred() {{
+        timer = null;
+        const callbacks = Array.from(deferred.values());
+        deferred.clear();
+        const now = performance.now();
+        for (const callback of callbacks) {{
+            try {{
+                callback(now);
+            }} catch (error) {{
+                setTimeout(() => {{ throw error; }});
+            }}
+        }}
+    }}
+
+    window.requestAnimationFrame = function(callback) {{
+        if (!background) {{
+            return nativeRequestAnimationFrame(callback);
+        }}
+        const id = nextId--;
+        deferred.set(id, callback);
+        if (timer === null) {{
+            timer = setTimeout(runDeferred, {BACKGROUND_FRAME_INTERVAL_MS});
+        }}
+        return id;
+    }};
+
+    window.cancelAnimationFrame = function(id) {{
+        if (!deferred.delete(id)) {{
+            nativeCancelAnimationFrame(id);
+        }}
+    }};
+
+    window.__karereSetBackground = function(value) {{
+        background = value;
+        if (!background && timer !== null) {{
+            // Resume on the next real frame instead of waiting for the timer
+            clearTimeout(timer);
+            timer = null;
+            nativeRequestAnimationFrame(runDeferred);
+        }}
+    }};
+}})();
+"""
+
+logger = get_logger('power_mode')
+
+_background_features = None
+
+
+def get_background_features() -> List:
+    """Get the WebKit features toggled in background mode that this WebKit has."""
+    global _background_features
+    if _background_features is None:
+        _background_features = []
+        try:
+            features = WebKit.Settings.get_all_features()
+            for index in range(features.get_length()):
+                feature = features.get(index)
+                if feature.get_identifier() in BACKGROUND_FEATURES:
+                    _background_features.append(feature)
+        except AttributeError:
+            # Feature lists need WebKitGTK 2.42
+            logger.debug("WebKit feature list not available")
+        logger.debug(f"Background features available: {[f.get_identifier() for f in _background_features]}")
+    return _background_features
+
+
+def install_background_script(webview: WebKit.WebView):
+    """Add the requestAnimationFrame throttle to a WebView; it starts inactive."""
+    script = WebKit.UserScript.new(
+        BACKGROUND_SCRIPT,
+        WebKit.UserContentInjectedFrames.TOP_FRAME,
+        WebKit.UserScriptInjectionTime.START,
+        None, None
+    )
+    webview.get_user_content_manager().add_script(script)
+
+
+def apply_background_mode(webview: WebKit.WebView, background: bool):
+    """
+    Switch a WebView between foreground and background power mode.
+
+    Args:
+        webview: WebView with the background script installed
+        background: True to throttle the page, False to resume it
+    """
+    webkit_settings = webview.get_settings()
+    webkit_settings.set_media_playback_requires_user_gesture(background)
+    for feature in get_background_features():
+        webkit_settings.set_feature_enabled(feature, background or feature.get_default_value())
+
+    webview.evaluate_javascript(
+        f"window.__karereSetBackground && window.__karereSetBackground({'true' if background else 'false'});",
+        -1, None, None, None, None, None
+    )
@@ -0,0 +1,130 @@
+"""
+Runtime profiling for Karere application.
+
+Starts and stops cProfile and tracemalloc inside the running process, so a
+slow instance can be diagnosed without restarting it under a profiler.
+Results are written to the profiles directory in the karere data directory:
+
+    karere-<timestamp>.prof          cProfile statistics (open with pstats or snakeviz)
+    karere-<timestamp>-memory.txt    top allocation sites from tracemalloc
+"""
+
+import os
+import time
+import cProfile
+import tracemalloc
+from typing import Dict, Optional
+
+from .logging_config import get_logger
+
+
+# Number of allocation sites written to the memory snapshot
+DEFAULT_TOP_ALLOCATIONS = 25
+
+# Stack depth recorded per allocation
+TRACEMALLOC_FRAMES = 5
+
+
+def get_default_profiles_dir() -> str:
+    """Get the default directory for profiling output."""
+    data_dir = os.environ.get('XDG_DATA_HOME', os.path.expanduser('~/.local/share'))
+    return os.path.join(data_dir, 'karere', 'profiles')
+
+
+class RuntimeProfiler:
+    """
+    On-demand CPU and memory profiler.
+
+    cProfile only sees the thread that started it, which is the GTK main
+    thread when started from an action or a D-Bus call.
+    """
+
+    def __init__(self, output_dir: Optional[str] = None, top_allocations: int = DEFAULT_TOP_ALLOCATIONS):
+        """
+        Initialize the profiler.
+
+        Args:
+            output_dir: Directory for output files; defaults to the karere data directory
+            top_allocations: Number of allocation sites written to the memory snapshot
+        """
+        self.output_dir = output_dir or get_default_profiles_dir()
+        self.top_allocations = top_allocations
+        self.logger = get_logger('profiler')
+        self._profile: Optional[cProfile.Profile] = None
+        self._started_tracemalloc = False
+        self._started_at = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        return self._profile is not None
+
+    def start(self) -> bool:
+        """
+        Start CPU and allocation profiling.
+
+        Returns:
+            True if profiling started, False if it was already running
+        """
+        if self.is_running:
+            return False
+
+        # Leave tracemalloc alone if something else (PYTHONTRACEMALLOC) started it
+        self._started_tracemalloc = not tracemalloc.is_tracing()
+        if self._started_tracemalloc:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+        self._started_at = time.monotonic()
+        self.logger.info("Runtime profiling started")
+        return True
+
+    def stop(self) -> Dict[str, str]:
+        """
+        Stop profiling and write the results.
+
+        Returns:
+            Dictionary with the 'profile' and 'memory' output paths, empty if
+            profiling was not running
+        """
+        if not self.is_running:
+            return {}
+
+        profile = self._profile
+        profile.disable()
+        self._profile = None
+        duration = time.monotonic() - self._started_at
+
+        snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"karere-{time.strftime('%Y%m%d-%H%M%S')}")
+        paths = {"profile": f"{base}.prof"}
+        profile.dump_stats(paths["profile"])
+
+        if snapshot is not None:
+            paths["memory"] = f"{base}-memory.txt"
+            self._write_memory_snapshot(snapshot, paths["memory"], duration)
+
+        self.logger.info(f"Runtime profiling stopped after {duration:.1f}s, results in {self.output_dir}")
+        return paths
+
+    def _write_memory_snapshot(self, snapshot: tracemalloc.Snapshot, path: str, duration: float):
+        """Write the largest allocation sites of a snapshot."""
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        statistics = snapshot.statistics('lineno')
+        total = sum(stat.size for stat in statistics)
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"Karere allocation snapshot after {duration:.1f}s of profiling\n")
+            f.write(f"Traced memory: {total / 1024:.1f} KiB in {len(statistics)} locations\n\n")
+            for index, stat in enumerate(statistics[:self.top_allocations], 1):
+                frame = stat.traceback[0]
+                f.write(f"#{index}: {frame.filename}:{frame.lineno}: "
+                        f"{stat.size / 1024:.1f} KiB in {stat.count} blocks\n")
@@ -0,0 +1,212 @@
+"""
+Connectivity-aware reconnection for Karere application.
+
+Reloads WhatsApp Web after network load failures using jittered exponential
+backoff, pausing while the system is offline and reloading immediately when
+Gio.NetworkMonitor reports that connectivity has returned.
+"""
+
+import gi
+import random
+from typing import Callable, Optional
+
+gi.require_version("WebKit", "6.0")
+
+from gi.repository import Gio, GLib, WebKit
+from .logging_config import get_logger
+
+
+class ReconnectManager:
+    """
+    Reconnection controller for the WhatsApp Web view.
+
+    Classifies load errors by their GError domain and code instead of the
+    message text, and schedules reloads only while the network is usable.
+    """
+
+    # Backoff parameters in seconds
+    BASE_DELAY = 2
+    MAX_DELAY = 300
+
+    # Transient GIO errors worth retrying
+    RETRYABLE_IO_ERRORS = (
+        Gio.IOErrorEnum.NETWORK_UNREACHABLE,
+        Gio.IOErrorEnum.HOST_UNREACHABLE,
+        Gio.IOErrorEnum.CONNECTION_REFUSED,
+        Gio.IOErrorEnum.CONNECTION_CLOSED,
+        Gio.IOErrorEnum.TIMED_OUT,
+        Gio.IOErrorEnum.BROKEN_PIPE,
+        Gio.IOErrorEnum.NOT_CONNECTED,
+    )
+
+    def __init__(self, reload_callback: Callable[[], None],
+                 notify_callback: Optional[Callable[[str, str], None]] = None):
+        """
+        Initialize the reconnection controller.
+
+        Args:
+            reload_callback: Called to reload WhatsApp Web
+            notify_callback: Called with (title, message) once per outage
+        """
+        self.reload_callback = reload_callback
+        self.notify_callback = notify_callback
+        self.logger = get_logger('reconnect')
+
+        self.attempt = 0
+        self._retry_source_id = None
+        self._waiting_for_network = False
+        self._outage_notified = False
+
+        self.network_monitor = Gio.NetworkMonitor.get_default()
+        self._network_handler_id = self.network_monitor.connect(
+            "network-changed", self._on_network_changed
+        )
+
+        self.logger.info(f"Reconnect manager initialized (online: {self.is_online()})")
+
+    def is_online(self) -> bool:
+        """Check whether the system currently has usable network connectivity."""
+        try:
+            if not self.network_monitor.get_network_available():
+                return False
+            return self.network_monitor.get_connectivity() != Gio.NetworkConnectivity.LOCAL
+        except Exception as e:
+            self.logger.debug(f"Could not query network monitor: {e}")
+            return True
+
+    def classify_error(self, error) -> str:
+        """
+        Classify a WebView load error.
+
+        Args:
+            error: GLib.Error passed to the load-failed signal
+
+        Returns:
+            'ignore' for cancelled loads, 'retry' for transient network
+            errors, or 'fatal' for errors a reload will not fix
+        """
+        network_domain = WebKit.network_error_quark()
+
+        if error.matches(network_domain, WebKit.NetworkError.CANCELLED):
+            return "ignore"
+
+        if error.matches(WebKit.policy_error_quark(),
+                         WebKit.PolicyError.FRAME_LOAD_INTERRUPTED_BY_POLICY_CHANGE):
+            return "ignore"
+
+        if error.matches(network_domain, WebKit.NetworkError.UNKNOWN_PROTOCOL) or \
+                error.matches(network_domain, WebKit.NetworkError.FILE_DOES_NOT_EXIST):
+            return "fatal"
+
+        if error.domain == GLib.quark_to_string(network_domain):
+            return "retry"
+
+        io_domain = Gio.io_error_quark()
+        if any(error.matches(io_domain, code) for code in self.RETRYABLE_IO_ERRORS):
+            return "retry"
+
+        if error.domain == GLib.quark_to_string(Gio.resolver_error_quark()):
+            return "retry"
+
+        return "fatal"
+
+    def on_load_failed(self, error) -> str:
+        """
+        Handle a failed load and schedule a reconnection if appropriate.
+
+        Args:
+            error: GLib.Error passed to the load-failed signal
+
+        Returns:
+            The error classification (see classify_error)
+        """
+        classification = self.classify_error(error)
+        if classification != "retry":
+            return classification
+
+        if not self._outage_notified and self.notify_callback:
+            self._outage_notified = True
+            self.notify_callback("Connection Issue",
+                                 "Cannot reach WhatsApp Web. Karere will reconnect automatically.")
+
+        if not self.is_online():
+            self._cancel_retry()
+            self._waiting_for_network = True
+            self.logger.info("Offline, waiting for connectivity before reconnecting")
+            return classification
+
+        self._schedule_retry()
+        return classification
+
+    def on_load_committed(self):
+        """Reset the backoff once a load has reached the server."""
+        if self.attempt or self._waiting_for_network:
+            self.logger.info("Connection restored")
+        self.attempt = 0
+        self._waiting_for_network = False
+        self._outage_notified = False
+        self._cancel_retry()
+
+    def _schedule_retry(self):
+        """Schedule a reload using jittered exponential backoff."""
+        self._cancel_retry()
+
+        ceiling = min(self.MAX_DELAY, self.BASE_DELAY * (2 ** self.attempt))
+        delay = random.uniform(ceiling / 2, ceiling)
+        self.attempt += 1
+
+        self.logger.info(f"Reconnect attempt {self.attempt} in {delay:.1f}s")
+        self._retry_source_id = GLib.timeout_add(int(delay * 1000), self._on_retry_timeout)
+
+    def _cancel_retry(self):
+        """Cancel a pending reload, if any."""
+        if self._retry_source_id:
+            GLib.source_remove(self._retry_source_id)
+            self._retry_source_id = None
+
+    def _on_retry_timeout(self):
+        """Reload after the backoff delay expired."""
+        self._retry_source_id = None
+
+        if not self.is_online():
+            self._waiting_for_network = True
+            self.logger.info("Went offline before retry, waiting for connectivity")
+            return False
+
+        self._reload()
+        return False  # Don't repeat the timeout
+
+    def _on_network_changed(self, monitor, network_available):
+        """Reload immediately when connectivity returns during an outage."""
+        if not self._waiting_for_network and not self._retry_source_id:
+            return
+
+        if not self.is_online():
+            # Lost connectivity while a retry was pending; stop burning loads
+            self._cancel_retry()
+            self._waiting_for_network = True
+            return
+
+        if not self._waiting_for_network:
+            # Still online (route, DHCP or VPN change); keep the backoff
+            return
+
+        self.logger.info("Connectivity returned, reconnecting now")
+        self._cancel_retry()
+        self._waiting_for_network = False
+        self._reload()
+
+    def _reload(self):
+        """Invoke the reload callback."""
+        try:
+            self.reload_callback()
+        except Exception as e:
+            self.logger.error(f"Error during reconnect: {e}")
+
+    def shutdown(self):
+        """Cancel pending reloads and stop listening for network changes."""
+        self._cancel_retry()
+        self._waiting_for_network = False
+        if self._network_handler_id:
+            self.network_monitor.disconnect(self._network_handler_id)
+            self._network_handler_id = None
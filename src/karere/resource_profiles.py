@@ -0,0 +1,139 @@
+"""
+WebKit resource profiles for Karere application.
+
+A resource profile bundles the WebKit cache model, memory-pressure limits
+and hardware acceleration policy so users can trade memory for speed with
+a single setting.
+"""
+
+import gi
+from typing import Any, Dict, Optional
+
+gi.require_version("WebKit", "6.0")
+
+from gi.repository import WebKit
+from .logging_config import get_logger
+
+
+# "performance" matches WebKit's own defaults (web browser cache model,
+# page cache on, no memory limit), which Karere used before profiles
+# existed, so upgrading does not change how the WebView behaves
+DEFAULT_PROFILE = "performance"
+
+RESOURCE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "low-memory": {
+        "cache_model": "DOCUMENT_VIEWER",
+        "page_cache": False,
+        "hardware_acceleration": "NEVER",
+        "memory_limit_mb": 512,
+        "conservative_threshold": 0.33,
+        "strict_threshold": 0.5,
+        "poll_interval": 5.0,
+    },
+    "balanced": {
+        "cache_model": "DOCUMENT_BROWSER",
+        "page_cache": False,
+        "hardware_acceleration": "ALWAYS",
+        "memory_limit_mb": 1024,
+        "conservative_threshold": 0.5,
+        "strict_threshold": 0.75,
+        "poll_interval": 10.0,
+    },
+    "performance": {
+        "cache_model": "WEB_BROWSER",
+        "page_cache": True,
+        "hardware_acceleration": "ALWAYS",
+        "memory_limit_mb": None,  # Use WebKit's default limit
+        "conservative_threshold": None,
+        "strict_threshold": None,
+        "poll_interval": None,
+    },
+}
+
+logger = get_logger('resource_profiles')
+
+
+def get_profile(name: str) -> Dict[str, Any]:
+    """
+    Get a resource profile by name.
+
+    Args:
+        name: Profile name ('low-memory', 'balanced' or 'performance')
+
+    Returns:
+        Profile definition, falling back to the default profile
+    """
+    if name not in RESOURCE_PROFILES:
+        logger.warning(f"Unknown resource profile '{name}', using '{DEFAULT_PROFILE}'")
+        name = DEFAULT_PROFILE
+    return RESOURCE_PROFILES[name]
+
+
+def create_memory_pressure_settings(profile: Dict[str, Any]) -> Optional[WebKit.MemoryPressureSettings]:
+    """Create WebKit memory-pressure settings for a profile, or None for defaults."""
+    if profile["memory_limit_mb"] is None:
+        return None
+
+    settings = WebKit.MemoryPressureSettings.new()
+    settings.set_memory_limit(profile["memory_limit_mb"])
+    # The strict threshold must be set first, conservative must stay below it
+    settings.set_strict_threshold(profile["strict_threshold"])
+    settings.set_conservative_threshold(profile["conservative_threshold"])
+    settings.set_poll_interval(profile["poll_interval"])
+    return settings
+
+
+def configure_network_process(profile_name: str):
+    """
+    Apply a profile's memory-pressure settings to the network process.
+
+    Must be called before the first NetworkSession is created; later
+    calls have no effect until the next start.
+    """
+    try:
+        settings = create_memory_pressure_settings(get_profile(profile_name))
+        if settings is not None:
+            WebKit.NetworkSession.set_memory_pressure_settings(settings)
+    except Exception as e:
+        logger.warning(f"Could not configure network process memory pressure: {e}")
+
+
+def create_web_context(profile_name: str) -> WebKit.WebContext:
+    """
+    Create a WebContext configured for a resource profile.
+
+    Memory-pressure settings are construct-only, so they take effect for
+    web processes spawned by this context.
+    """
+    profile = get_profile(profile_name)
+    memory_pressure_settings = create_memory_pressure_settings(profile)
+
+    if memory_pressure_settings is not None:
+        web_context = WebKit.WebContext(memory_pressure_settings=memory_pressure_settings)
+    else:
+        web_context = WebKit.WebContext()
+
+    apply_to_web_context(web_context, profile_name)
+    return web_context
+
+
+def apply_to_web_context(web_context: WebKit.WebContext, profile_name: str):
+    """Apply the live-switchable parts of a profile to a WebContext."""
+    profile = get_profile(profile_name)
+    web_context.set_cache_model(getattr(WebKit.CacheModel, profile["cache_model"]))
+    logger.info(f"Cache model set to {profile['cache_model']} (profile: {profile_name})")
+
+
+def apply_to_webview_settings(webkit_settings: WebKit.Settings, profile_name: str):
+    """Apply the live-switchable parts of a profile to WebView settings."""
+    profile = get_profile(profile_name)
+    # Not every WebKit 6.0 build has the page cache setter
+    if hasattr(webkit_settings, "set_enable_page_cache"):
+        webkit_settings.set_enable_page_cache(profile["page_cache"])
+    else:
+        logger.debug("Page cache setting not available in this WebKit")
+    webkit_settings.set_hardware_acceleration_policy(
+        getattr(WebKit.HardwareAccelerationPolicy, profile["hardware_acceleration"])
+    )
+    logger.info(f"Hardware acceleration {profile['hardware_acceleration']}, "
+                f"page cache {profile['page_cache']} (profile: {profile_name})")
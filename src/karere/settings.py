@@ -4,12 +4,14 @@ Settings dialog for Karere application.
 
 import gi
 import logging
+import threading
 
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
 
-from gi.repository import Gtk, Adw, Gio
+from gi.repository import Gtk, Adw, GLib
 from ._build_config import should_show_developer_settings, should_enable_developer_tools
+from .settings_service import get_settings
 
 
 @Gtk.Template(resource_path='/io/github/tobagin/karere/settings.ui')
@@ -21,6 +23,14 @@ class KarereSettingsDialog(Adw.PreferencesDialog):
     # General page template children
     theme_row = Gtk.Template.Child()
     persistent_cookies_row = Gtk.Template.Child()
+    resource_profile_row = Gtk.Template.Child()
+    background_power_mode_row = Gtk.Template.Child()
+    content_filter_row = Gtk.Template.Child()
+    block_media_previews_row = Gtk.Template.Child()
+    download_post_processing_row = Gtk.Template.Child()
+    strip_image_metadata_row = Gtk.Template.Child()
+    download_sort_mode_row = Gtk.Template.Child()
+    download_dedup_mode_row = Gtk.Template.Child()
     developer_tools_row = Gtk.Template.Child()
     webview_group = Gtk.Template.Child()
     privacy_group = Gtk.Template.Child()
@@ -40,12 +50,15 @@ class KarereSettingsDialog(Adw.PreferencesDialog):
     dnd_end_entry = Gtk.Template.Child()
     
     # Spell checking page template children
+    spell_checking_page = Gtk.Template.Child()
     spell_checking_enabled_row = Gtk.Template.Child()
     spell_check_auto_detect_row = Gtk.Template.Child()
     current_languages_label = Gtk.Template.Child()
     add_language_button = Gtk.Template.Child()
     
     # Crash reporting page template children
+    crash_reporting_page = Gtk.Template.Child()
+    crash_statistics_row = Gtk.Template.Child()
     crash_reporting_enabled_row = Gtk.Template.Child()
     include_system_info_row = Gtk.Template.Child()
     include_logs_row = Gtk.Template.Child()
@@ -53,22 +66,77 @@ class KarereSettingsDialog(Adw.PreferencesDialog):
     clear_reports_button = Gtk.Template.Child()
     
     def __init__(self, parent_window):
+        """
+        Build the dialog once; the window reuses it through present_for().
+        
+        The spell checking and crash reporting pages are filled in the
+        first time they are shown.
+        """
         super().__init__()
         self.parent_window = parent_window
-        self.settings = Gio.Settings.new("io.github.tobagin.karere")
+        self.settings = get_settings()
         self.logger = logging.getLogger("karere.settings")
+        self._holding_settings = False
+        self._spell_checking_loaded = False
+        self._crash_reporting_loaded = False
+        
+        self.connect("closed", self._on_dialog_closed)
+        self.connect("notify::visible-page", self._on_visible_page_changed)
         
         self._setup_signals()
         self._load_settings()
         self._configure_production_hardening()
-        self._load_spell_checking_settings()
-        self._load_crash_reporting_settings()
+    
+    def present_for(self, parent):
+        """
+        Show the dialog, refreshing it from the current settings.
+        
+        Args:
+            parent: Window to present the dialog on
+        """
+        if not self._holding_settings:
+            # Batch this session's changes into one write when the dialog closes
+            self.settings.hold()
+            self._holding_settings = True
+        
+        # Rows whose value did not change emit nothing, so this is cheap
+        self._load_settings()
+        if self._spell_checking_loaded:
+            self._update_current_languages_display()
+        if self._crash_reporting_loaded:
+            self._refresh_crash_statistics()
+        
+        self.present(parent)
+    
+    def _on_dialog_closed(self, dialog):
+        """Apply the changes made while the dialog was open."""
+        if self._holding_settings:
+            self._holding_settings = False
+            self.settings.release()
+    
+    def _on_visible_page_changed(self, dialog, param):
+        """Fill expensive pages the first time they are shown."""
+        page = self.get_visible_page()
+        if page is self.spell_checking_page and not self._spell_checking_loaded:
+            self._spell_checking_loaded = True
+            GLib.idle_add(self._load_spell_checking_settings)
+        elif page is self.crash_reporting_page and not self._crash_reporting_loaded:
+            self._crash_reporting_loaded = True
+            GLib.idle_add(self._load_crash_reporting_settings)
     
     def _setup_signals(self):
         """Set up signal connections."""
         # General settings signals
         self.theme_row.connect("notify::selected", self._on_theme_changed)
         self.persistent_cookies_row.connect("notify::active", self._on_persistent_cookies_changed)
+        self.resource_profile_row.connect("notify::selected", self._on_resource_profile_changed)
+        self.background_power_mode_row.connect("notify::active", self._on_background_power_mode_changed)
+        self.content_filter_row.connect("notify::active", self._on_content_filter_changed)
+        self.block_media_previews_row.connect("notify::active", self._on_block_media_previews_changed)
+        self.download_post_processing_row.connect("notify::active", self._on_download_post_processing_changed)
+        self.strip_image_metadata_row.connect("notify::active", self._on_strip_image_metadata_changed)
+        self.download_sort_mode_row.connect("notify::selected", self._on_download_sort_mode_changed)
+        self.download_dedup_mode_row.connect("notify::selected", self._on_download_dedup_mode_changed)
         self.developer_tools_row.connect("notify::active", self._on_developer_tools_changed)
         
         # Notification settings signals
@@ -86,12 +154,17 @@ class KarereSettingsDialog(Adw.PreferencesDialog):
         self.dnd_start_entry.connect("notify::text", self._on_dnd_start_time_changed)
         self.dnd_end_entry.connect("notify::text", self._on_dnd_end_time_changed)
         
-        # Spell checking signals
+        # Spell checking and crash reporting signals are connected once
+        # their page has been loaded
+    
+    def _setup_spell_checking_signals(self):
+        """Set up spell checking page signal connections."""
         self.spell_checking_enabled_row.connect("notify::active", self._on_spell_checking_enabled_changed)
         self.spell_check_auto_detect_row.connect("notify::active", self._on_spell_check_auto_detect_changed)
         self.add_language_button.connect("clicked", self._on_add_language_clicked)
-        
-        # Crash reporting signals
+    
+    def _setup_crash_reporting_signals(self):
+        """Set up crash reporting page signal connections."""
         self.crash_reporting_enabled_row.connect("notify::active", self._on_crash_reporting_enabled_changed)
         self.include_system_info_row.connect("notify::active", self._on_include_system_info_changed)
         self.include_logs_row.connect("notify::active", self._on_include_logs_changed)
@@ -106,6 +179,26 @@ class KarereSettingsDialog(Adw.PreferencesDialog):
         self.theme_row.set_selected(theme_index)
         
         self.persistent_cookies_row.set_active(self.settings.get_boolean("persistent-cookies"))
+        self.content_filter_row.set_active(self.settings.get_boolean("content-filter-enabled"))
+        self.block_media_previews_row.set_active(self.settings.get_boolean("block-media-previews"))
+        self.block_media_previews_row.set_sensitive(self.content_filter_row.get_active())
+        
+        resource_profile = self.settings.get_string("resource-profile")
+        resource_profile_index = {"low-memory": 0, "balanced": 1, "performance": 2}.get(resource_profile, 2)
+        self.resource_profile_row.set_selected(resource_profile_index)
+        self.background_power_mode_row.set_active(self.settings.get_boolean("background-power-mode"))
+        
+        post_processing = self.settings.get_boolean("download-post-processing")
+        self.download_post_processing_row.set_active(post_processing)
+        self.strip_image_metadata_row.set_active(self.settings.get_boolean("strip-image-metadata"))
+        sort_mode_index = {"none": 0, "media-type": 1}.get(self.settings.get_string("download-sort-mode"), 0)
+        self.download_sort_mode_row.set_selected(sort_mode_index)
+        dedup_mode_index = {"off": 0, "hardlink": 1, "reflink": 2, "drop": 3}.get(
+            self.settings.get_string("download-dedup-mode"), 1)
+        self.download_dedup_mode_row.set_selected(dedup_mode_index)
+        self.strip_image_metadata_row.set_sensitive(post_processing)
+        self.download_sort_mode_row.set_sensitive(post_processing)
+        self.download_dedup_mode_row.set_sensitive(post_processing)
         self.developer_tools_row.set_active(self.settings.get_boolean("developer-tools"))
         
         # Load notification settings
@@ -145,14 +238,63 @@ class KarereSettingsDialog(Adw.PreferencesDialog):
         """Handle persistent cookies toggle."""
         self.settings.set_boolean("persistent-cookies", row.get_active())
     
+    def _on_content_filter_changed(self, row, param):
+        """Handle content filter toggle."""
+        enabled = row.get_active()
+        self.settings.set_boolean("content-filter-enabled", enabled)
+        self.block_media_previews_row.set_sensitive(enabled)
+    
+    def _on_block_media_previews_changed(self, row, param):
+        """Handle block media previews toggle."""
+        self.settings.set_boolean("block-media-previews", row.get_active())
+    
+    def _on_resource_profile_changed(self, row, param):
+        """Handle resource profile selection change."""
+        selected = row.get_selected()
+        profiles = ["low-memory", "balanced", "performance"]
+        if selected < len(profiles):
+            # The window applies the profile through its settings listener
+            self.settings.set_string("resource-profile", profiles[selected])
+    
+    def _on_background_power_mode_changed(self, row, param):
+        """Handle background power saving toggle."""
+        # The window switches the WebViews through its settings listener
+        self.settings.set_boolean("background-power-mode", row.get_active())
+    
+    def _on_download_post_processing_changed(self, row, param):
+        """Handle download post-processing toggle."""
+        enabled = row.get_active()
+        self.settings.set_boolean("download-post-processing", enabled)
+        self.strip_image_metadata_row.set_sensitive(enabled)
+        self.download_sort_mode_row.set_sensitive(enabled)
+        self.download_dedup_mode_row.set_sensitive(enabled)
+    
+    def _on_strip_image_metadata_changed(self, row, param):
+        """Handle image metadata stripping toggle."""
+        self.settings.set_boolean("strip-image-metadata", row.get_active())
+    
+    def _on_download_sort_mode_changed(self, row, param):
+        """Handle download sort mode selection change."""
+        selected = row.get_selected()
+        sort_modes = ["none", "media-type"]
+        if selected < len(sort_modes):
+            self.settings.set_string("download-sort-mode", sort_modes[selected])
+    
+    def _on_download_dedup_mode_changed(self, row, param):
+        """Handle duplicate download mode selection change."""
+        selected = row.get_selected()
+        dedup_modes = ["off", "hardlink", "reflink", "drop"]
+        if selected < len(dedup_modes):
+            self.settings.set_string("download-dedup-mode", dedup_modes[selected])
+    
     def _on_developer_tools_changed(self, row, param):
         """Handle developer tools toggle."""
         active = row.get_active()
         self.settings.set_boolean("developer-tools", active)
-        # Apply to webview if it exists
-        if hasattr(self.parent_window, 'webview') and self.parent_window.webview:
-            settings = self.parent_window.webview.get_settings()
-            settings.set_enable_developer_extras(active)
+        # Apply to the WebView of every account
+        if hasattr(self.parent_window, 'get_webviews'):
+            for webview in self.parent_window.get_webviews():
+                webview.get_settings().set_enable_developer_extras(active)
     
     def _apply_theme(self, theme):
         """Apply the selected theme."""
@@ -192,40 +334,36 @@ class KarereSettingsDialog(Adw.PreferencesDialog):
         
         # Update current languages display
         self._update_current_languages_display()
+        
+        # Connected after loading so loading does not write the values back
+        self._setup_spell_checking_signals()
+        return False
     
     def _update_current_languages_display(self):
         """Update the display of current spell checking languages."""
         try:
-            import locale
-            import os
+            if not hasattr(self.parent_window, 'get_spell_checking_status'):
+                return
             
+            # Uses the window's cached dictionary catalog; never scans here
+            languages, missing, catalog_loaded = self.parent_window.get_spell_checking_status()
+            text = ", ".join(languages) if languages else "No dictionaries installed"
             if self.settings.get_boolean("spell-checking-auto-detect"):
-                # Get system locale
-                try:
-                    # Get the current locale
-                    current_locale = locale.getlocale()[0]
-                    if current_locale:
-                        # Convert to spell checking format (e.g., en_US)
-                        self.current_languages_label.set_text(f"Auto: {current_locale}")
-                    else:
-                        # Fallback to environment variables
-                        lang = os.environ.get('LANG', 'en_US.UTF-8')
-                        lang_code = lang.split('.')[0]  # Extract just the language part
-                        self.current_languages_label.set_text(f"Auto: {lang_code}")
-                except Exception as e:
-                    self.logger.warning(f"Failed to get system locale: {e}")
-                    self.current_languages_label.set_text("Auto: en_US")
-            else:
-                # Show custom languages
-                languages = self.settings.get_strv("spell-checking-languages")
-                if languages:
-                    self.current_languages_label.set_text(", ".join(languages))
-                else:
-                    self.current_languages_label.set_text("None set")
+                text = f"Auto: {text}"
+            if not catalog_loaded:
+                text = f"{text} (checking dictionaries…)"
+            elif missing:
+                text = f"{text} (not installed: {', '.join(missing)})"
+            self.current_languages_label.set_text(text)
         except Exception as e:
             self.logger.error(f"Error updating languages display: {e}")
             self.current_languages_label.set_text("Error")
     
+    def refresh_spell_checking_languages(self):
+        """Refresh the languages display, e.g. once the dictionaries are known."""
+        if self._spell_checking_loaded:
+            self._update_current_languages_display()
+    
     def _load_crash_reporting_settings(self):
         """Load crash reporting settings from crash reporter."""
         try:
@@ -249,6 +387,35 @@ class KarereSettingsDialog(Adw.PreferencesDialog):
             self.crash_reporting_enabled_row.set_active(True)
             self.include_system_info_row.set_active(True)
             self.include_logs_row.set_active(False)
+        
+        self._setup_crash_reporting_signals()
+        self._refresh_crash_statistics()
+        return False
+    
+    def _refresh_crash_statistics(self):
+        """Show crash report statistics, read from disk on a worker thread."""
+        from .crash_reporter import get_crash_reporter
+        crash_reporter = get_crash_reporter()
+        if not crash_reporter:
+            return
+        
+        def worker():
+            try:
+                stats = crash_reporter.get_storage_statistics()
+            except Exception as e:
+                self.logger.warning(f"Failed to read crash statistics: {e}")
+                return
+            GLib.idle_add(self._show_crash_statistics, stats)
+        
+        threading.Thread(target=worker, name="karere-crash-stats", daemon=True).start()
+    
+    def _show_crash_statistics(self, stats):
+        """Show crash statistics in the management group."""
+        self.crash_statistics_row.set_subtitle(
+            f"{stats['count']} report(s), {stats['total_bytes'] // 1024} KiB of "
+            f"{stats['byte_budget'] // 1024} KiB used"
+        )
+        return False
     
     # Notification settings signal handlers
     def _on_message_notifications_changed(self, row, param):
@@ -451,14 +618,14 @@ class KarereSettingsDialog(Adw.PreferencesDialog):
             from .crash_reporter import get_crash_reporter
             crash_reporter = get_crash_reporter()
             if crash_reporter:
-                reports = crash_reporter.get_crash_reports()
-                total_reports = len(reports)
-                last_crash = reports[-1]['timestamp'] if reports else 'None'
+                stats = crash_reporter.get_storage_statistics()
+                last_crash = stats['newest'] or 'None'
                 
                 # Create a simple info dialog with statistics
                 dialog = Adw.MessageDialog.new(self.parent_window)
                 dialog.set_heading("Crash Report Statistics")
-                dialog.set_body(f"Reports stored: {total_reports}\n"
+                dialog.set_body(f"Reports stored: {stats['count']}\n"
+                               f"Storage used: {stats['total_bytes'] // 1024} KiB of {stats['byte_budget'] // 1024} KiB\n"
                                f"Last crash: {last_crash}")
                 dialog.add_response("ok", "OK")
                 dialog.present()
@@ -492,5 +659,6 @@ class KarereSettingsDialog(Adw.PreferencesDialog):
                 if crash_reporter:
                     crash_reporter.clear_crash_reports()
                     self.logger.info("All crash reports cleared")
+                    self._refresh_crash_statistics()
             except Exception as e:
                 self.logger.error(f"Error clearing crash reports: {e}")
\ No newline at end of file
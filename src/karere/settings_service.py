@@ -0,0 +1,140 @@
+"""
+Shared settings service for Karere application.
+
+Owns the single Gio.Settings instance of the application. Reads are cached
+per key and invalidated by the "changed" signal; writes go through
+delay()/apply(), so a series of writes made while the settings are held
+(for example a settings dialog session) reaches dconf as one write.
+
+The service has the same getter, setter and connect methods as
+Gio.Settings, so it can be passed wherever a Gio.Settings is expected.
+"""
+
+import gi
+
+gi.require_version("Gio", "2.0")
+
+from gi.repository import Gio, GLib
+from typing import Any, Callable, Dict, List, Optional
+
+from .logging_config import get_logger
+
+
+SCHEMA_ID = "io.github.tobagin.karere"
+
+
+class SettingsService:
+    """
+    Cached, batching wrapper around the application's Gio.Settings.
+    """
+
+    def __init__(self, settings: Optional[Gio.Settings] = None):
+        """
+        Initialize the settings service.
+
+        Args:
+            settings: Settings object to wrap; defaults to the Karere schema
+        """
+        self.settings = settings or Gio.Settings.new(SCHEMA_ID)
+        self.logger = get_logger('settings_service')
+        self._cache: Dict[str, Any] = {}
+        self._holds = 0
+
+        # Connected first, so other handlers already see the new value
+        self.settings.connect("changed", self._on_changed)
+
+        # Writes stay in memory until apply(); unheld writes apply at once
+        self.settings.delay()
+
+    def _on_changed(self, settings, key):
+        self._cache.pop(key, None)
+
+    def _get(self, key: str, getter: Callable[[str], Any]) -> Any:
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = getter(key)
+            return value
+
+    def get_boolean(self, key: str) -> bool:
+        return self._get(key, self.settings.get_boolean)
+
+    def get_int(self, key: str) -> int:
+        return self._get(key, self.settings.get_int)
+
+    def get_string(self, key: str) -> str:
+        return self._get(key, self.settings.get_string)
+
+    def get_strv(self, key: str) -> List[str]:
+        # Copy, so callers cannot modify the cached list
+        return list(self._get(key, self.settings.get_strv))
+
+    def get_value(self, key: str) -> GLib.Variant:
+        return self._get(key, self.settings.get_value)
+
+    def _set(self, setter: Callable[[str, Any], bool], key: str, value: Any) -> bool:
+        result = setter(key, value)
+        self._cache.pop(key, None)
+        if not self._holds:
+            self.settings.apply()
+        return result
+
+    def set_boolean(self, key: str, value: bool) -> bool:
+        return self._set(self.settings.set_boolean, key, value)
+
+    def set_int(self, key: str, value: int) -> bool:
+        return self._set(self.settings.set_int, key, value)
+
+    def set_string(self, key: str, value: str) -> bool:
+        return self._set(self.settings.set_string, key, value)
+
+    def set_strv(self, key: str, value: List[str]) -> bool:
+        return self._set(self.settings.set_strv, key, value)
+
+    def set_value(self, key: str, value: GLib.Variant) -> bool:
+        return self._set(self.settings.set_value, key, value)
+
+    def connect(self, detailed_signal: str, callback: Callable, *args) -> int:
+        return self.settings.connect(detailed_signal, callback, *args)
+
+    def disconnect(self, handler_id: int):
+        self.settings.disconnect(handler_id)
+
+    def hold(self):
+        """Start batching writes until the matching release()."""
+        self._holds += 1
+
+    def release(self):
+        """End a batch; the last release applies all pending writes."""
+        if self._holds == 0:
+            self.logger.warning("Settings released more often than held")
+            return
+        self._holds -= 1
+        if self._holds == 0:
+            self.settings.apply()
+
+    @property
+    def is_held(self) -> bool:
+        return self._holds > 0
+
+    def flush(self):
+        """Apply pending writes even while held, e.g. at shutdown."""
+        if self.settings.get_has_unapplied():
+            self.settings.apply()
+
+    @staticmethod
+    def sync():
+        """Block until all applied writes reach the backend."""
+        Gio.Settings.sync()
+
+
+# Global settings service
+_settings_service: Optional[SettingsService] = None
+
+
+def get_settings() -> SettingsService:
+    """Get the application's shared settings service."""
+    global _settings_service
+    if _settings_service is None:
+        _settings_service = SettingsService()
+    return _settings_service
@@ -0,0 +1,158 @@
+"""
+Shutdown orchestration for Karere application.
+
+Runs the graceful shutdown steps under a global deadline. Steps that touch
+GTK run in order on the main thread; steps that only do blocking I/O run
+on daemon threads at the same time, so a slow disk cannot hold the main
+thread and a hung step cannot keep the process alive.
+"""
+
+import time
+import threading
+from typing import Callable, Dict, List, Optional
+
+from .logging_config import get_logger
+
+
+# Seconds the whole shutdown may take before falling back to force quit
+DEFAULT_DEADLINE = 0.8
+
+
+class ShutdownStep:
+    """A single named cleanup step."""
+
+    def __init__(self, name: str, func: Callable[[], None], threaded: bool = False,
+                 after: Optional[str] = None):
+        self.name = name
+        self.func = func
+        self.threaded = threaded
+        self.after = after
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+        self.thread: Optional[threading.Thread] = None
+
+    def run(self, clock: Callable[[], float]):
+        """Run the step, recording its duration and any error."""
+        start = clock()
+        try:
+            self.func()
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.duration = clock() - start
+
+
+class ShutdownResult:
+    """Outcome of an orchestrated shutdown."""
+
+    def __init__(self, elapsed: float, durations: Dict[str, float], failed: Dict[str, str],
+                 skipped: List[str], timed_out: List[str]):
+        self.elapsed = elapsed
+        self.durations = durations
+        self.failed = failed
+        self.skipped = skipped
+        self.timed_out = timed_out
+
+    @property
+    def completed(self) -> bool:
+        """True if every step finished before the deadline."""
+        return not self.skipped and not self.timed_out
+
+
+class ShutdownOrchestrator:
+    """
+    Runs shutdown steps concurrently under a deadline.
+
+    Main-thread steps run in the order they were added. A threaded step
+    starts right away, or once the main-thread step named in ``after`` has
+    finished.
+    """
+
+    def __init__(self, deadline: float = DEFAULT_DEADLINE, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the orchestrator.
+
+        Args:
+            deadline: Seconds the whole shutdown may take
+            clock: Monotonic time source
+        """
+        self.deadline = deadline
+        self.clock = clock
+        self.logger = get_logger('shutdown')
+        self.steps: List[ShutdownStep] = []
+
+    def add_step(self, name: str, func: Callable[[], None], threaded: bool = False,
+                 after: Optional[str] = None):
+        """
+        Add a cleanup step.
+
+        Args:
+            name: Step name used in the timing report
+            func: Function performing the step
+            threaded: Run on a worker thread instead of the main thread
+            after: Main-thread step that must finish before a threaded step starts
+        """
+        self.steps.append(ShutdownStep(name, func, threaded, after))
+
+    def _start_thread(self, step: ShutdownStep):
+        step.thread = threading.Thread(target=step.run, args=(self.clock,),
+                                       name=f"karere-shutdown-{step.name}", daemon=True)
+        step.thread.start()
+
+    def run(self) -> ShutdownResult:
+        """
+        Run all steps and wait for them until the deadline.
+
+        Returns:
+            ShutdownResult with per-step durations
+        """
+        start = self.clock()
+        end = start + self.deadline
+        main_steps = [step for step in self.steps if not step.threaded]
+        threaded_steps = [step for step in self.steps if step.threaded]
+        skipped = []
+
+        for step in threaded_steps:
+            if step.after is None:
+                self._start_thread(step)
+
+        for step in main_steps:
+            if self.clock() >= end:
+                skipped.append(step.name)
+                continue
+            step.run(self.clock)
+            for waiting in threaded_steps:
+                if waiting.after == step.name:
+                    self._start_thread(waiting)
+
+        timed_out = []
+        for step in threaded_steps:
+            if step.thread is None:
+                # Its main-thread dependency was skipped
+                skipped.append(step.name)
+                continue
+            step.thread.join(max(0.0, end - self.clock()))
+            if step.thread.is_alive():
+                timed_out.append(step.name)
+
+        result = ShutdownResult(
+            elapsed=self.clock() - start,
+            durations={step.name: step.duration for step in self.steps if step.duration is not None},
+            failed={step.name: step.error for step in self.steps if step.error},
+            skipped=skipped,
+            timed_out=timed_out,
+        )
+        self._log_result(result)
+        return result
+
+    def _log_result(self, result: ShutdownResult):
+        """Log the per-step timing report."""
+        timings = ", ".join(f"{name} {duration * 1000:.0f}ms" for name, duration in result.durations.items())
+        self.logger.info(f"Shutdown steps finished in {result.elapsed * 1000:.0f}ms: {timings}")
+        for name, error in result.failed.items():
+            self.logger.error(f"Shutdown step {name} failed: {error}")
+        if not result.completed:
+            self.logger.warning(
+                f"Shutdown deadline of {self.deadline}s exceeded; "
+                f"skipped: {result.skipped}, still running: {result.timed_out}"
+            )
@@ -0,0 +1,260 @@
+"""
+Spell checking dictionary catalog for Karere application.
+
+WebKit spell checking goes through enchant, which mostly uses hunspell
+dictionaries (``xx_YY.dic`` plus ``xx_YY.aff``). The catalog scans the
+dictionary directories once, on a worker thread, and caches the result
+keyed on the directories' modification times, so later starts only stat a
+handful of directories. Requested languages are validated against it
+before they are handed to WebKit, except when the catalog cannot match
+any of them, since enchant may find dictionaries the scan does not.
+"""
+
+import os
+import json
+import locale
+import threading
+from typing import Callable, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from .logging_config import get_logger
+
+
+DICTIONARY_SUFFIX = ".dic"
+AFFIX_SUFFIX = ".aff"
+
+FALLBACK_LANGUAGE = "en_US"
+
+
+def get_default_dictionary_dirs() -> List[str]:
+    """Get the directories enchant's hunspell provider searches."""
+    dirs = []
+    dicpath = os.environ.get('DICPATH')
+    if dicpath:
+        dirs.extend(d for d in dicpath.split(os.pathsep) if d)
+
+    config_dir = os.environ.get('XDG_CONFIG_HOME', os.path.expanduser('~/.config'))
+    data_dir = os.environ.get('XDG_DATA_HOME', os.path.expanduser('~/.local/share'))
+    dirs.extend([
+        os.path.join(config_dir, 'enchant', 'hunspell'),
+        os.path.join(data_dir, 'hunspell'),
+    ])
+    for data_dir in os.environ.get('XDG_DATA_DIRS', '/usr/local/share:/usr/share').split(os.pathsep):
+        if data_dir:
+            dirs.extend([
+                os.path.join(data_dir, 'hunspell'),
+                os.path.join(data_dir, 'myspell'),
+                os.path.join(data_dir, 'myspell', 'dicts'),
+            ])
+    # Flatpak runtime dictionaries extension
+    dirs.append('/usr/share/runtime/share/hunspell')
+
+    # Keep order, drop duplicates
+    return list(dict.fromkeys(dirs))
+
+
+def get_default_cache_path() -> str:
+    """Get the default location of the catalog cache."""
+    cache_dir = os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache'))
+    return os.path.join(cache_dir, 'karere', 'spell-dictionaries.json')
+
+
+def normalize_language(code: str) -> str:
+    """Normalize a locale or language tag ('en-us.UTF-8@euro' -> 'en_US')."""
+    code = code.strip().split('.', 1)[0].split('@', 1)[0].replace('-', '_')
+    language, separator, region = code.partition('_')
+    if not separator:
+        return language.lower()
+    return f"{language.lower()}_{region.upper()}"
+
+
+def get_system_language() -> str:
+    """Get the language of the current locale, e.g. 'en_US'."""
+    try:
+        current_locale = locale.getlocale()[0]
+    except ValueError:
+        current_locale = None
+    if not current_locale or current_locale in ('C', 'POSIX'):
+        current_locale = os.environ.get('LANG', FALLBACK_LANGUAGE)
+    language = normalize_language(current_locale)
+    if not language or language in ('c', 'posix'):
+        return FALLBACK_LANGUAGE
+    return language
+
+
+def get_directory_signature(directories: Sequence[str]) -> List[Tuple[str, Optional[int]]]:
+    """Get the modification time of each directory (None if missing)."""
+    signature = []
+    for directory in directories:
+        try:
+            signature.append((directory, os.stat(directory).st_mtime_ns))
+        except OSError:
+            signature.append((directory, None))
+    return signature
+
+
+def scan_directories(directories: Iterable[str]) -> FrozenSet[str]:
+    """
+    Find the installed dictionaries.
+
+    Args:
+        directories: Directories to scan
+
+    Returns:
+        Language codes that have both a .dic and an .aff file
+    """
+    languages = set()
+    for directory in directories:
+        try:
+            with os.scandir(directory) as entries:
+                names = {entry.name for entry in entries}
+        except OSError:
+            continue
+        for name in names:
+            if name.endswith(DICTIONARY_SUFFIX):
+                base = name[:-len(DICTIONARY_SUFFIX)]
+                if base + AFFIX_SUFFIX in names:
+                    languages.add(normalize_language(base))
+    return frozenset(languages)
+
+
+class DictionaryCatalog:
+    """
+    Installed spell checking dictionaries, scanned once and cached on disk.
+    """
+
+    def __init__(self, directories: Optional[Sequence[str]] = None, cache_path: Optional[str] = None):
+        """
+        Initialize the catalog.
+
+        Args:
+            directories: Dictionary directories; defaults to enchant's hunspell search path
+            cache_path: Cache file; defaults to the karere cache directory
+        """
+        self.directories = list(directories) if directories is not None else get_default_dictionary_dirs()
+        self.cache_path = cache_path or get_default_cache_path()
+        self.logger = get_logger('spell_dictionaries')
+        self._languages: Optional[FrozenSet[str]] = None
+        self._lock = threading.Lock()
+        self._loading = False
+        self._callbacks: List[Tuple[Callable, Callable]] = []
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._languages is not None
+
+    @property
+    def languages(self) -> FrozenSet[str]:
+        """Installed languages; empty until the catalog has loaded."""
+        return self._languages or frozenset()
+
+    def load(self) -> FrozenSet[str]:
+        """Load the catalog from the cache, scanning if the directories changed."""
+        signature = get_directory_signature(self.directories)
+        languages = self._read_cache(signature)
+        if languages is None:
+            languages = scan_directories(self.directories)
+            self._write_cache(signature, languages)
+            self.logger.info(f"Found {len(languages)} spell checking dictionaries")
+        self._languages = languages
+        return languages
+
+    def load_async(self, callback: Callable[[FrozenSet[str]], None],
+                   dispatch: Optional[Callable] = None):
+        """
+        Load the catalog on a worker thread.
+
+        Args:
+            callback: Called with the installed languages once loaded
+            dispatch: Runs the callback, e.g. GLib.idle_add to get back to
+                the main thread; by default it runs on the worker thread
+        """
+        dispatch = dispatch or (lambda func, *args: func(*args))
+        if self.is_loaded:
+            dispatch(callback, self._languages)
+            return
+
+        with self._lock:
+            self._callbacks.append((callback, dispatch))
+            if self._loading:
+                return
+            self._loading = True
+
+        threading.Thread(target=self._load_in_thread, name="karere-spell-dictionaries", daemon=True).start()
+
+    def _load_in_thread(self):
+        try:
+            languages = self.load()
+        except Exception as e:
+            self.logger.error(f"Failed to scan spell checking dictionaries: {e}")
+            languages = self._languages = frozenset()
+
+        with self._lock:
+            callbacks, self._callbacks = self._callbacks, []
+            self._loading = False
+        for callback, dispatch in callbacks:
+            dispatch(callback, languages)
+
+    def _read_cache(self, signature) -> Optional[FrozenSet[str]]:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if [tuple(entry) for entry in data["signature"]] != signature:
+                return None
+            return frozenset(data["languages"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write_cache(self, signature, languages: FrozenSet[str]):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            temp_path = f"{self.cache_path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({"signature": signature, "languages": sorted(languages)}, f)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            self.logger.warning(f"Failed to cache spell checking dictionaries: {e}")
+
+    def resolve(self, requested: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """
+        Match requested languages against the installed dictionaries.
+
+        A language without its own dictionary falls back to another variant
+        of the same language ('pt_BR' -> 'pt', 'de' -> 'de_DE', 'en' -> 'en_AU').
+
+        The scan only sees hunspell dictionaries, while enchant may have
+        other providers. If the catalog is empty or none of the languages
+        match, the requested languages are passed through unchanged and
+        left for enchant to find; unmatched ones are still reported.
+
+        Args:
+            requested: Language codes from the settings or the locale
+
+        Returns:
+            Tuple of (available languages to use, requested languages with no dictionary)
+        """
+        requested = list(requested)
+        available = self.languages
+        if not available:
+            return requested, []
+
+        resolved, missing = [], []
+        for code in requested:
+            language = normalize_language(code)
+            match = None
+            if language in available:
+                match = language
+            else:
+                base = language.partition('_')[0]
+                if base in available:
+                    match = base
+                else:
+                    variants = sorted(l for l in available if l.partition('_')[0] == base)
+                    if f"{base}_{base.upper()}" in variants:
+                        match = f"{base}_{base.upper()}"
+                    elif variants:
+                        match = variants[0]
+            if match is None:
+                missing.append(code)
+            elif match not in resolved:
+                resolved.append(match)
+        return resolved or requested, missing
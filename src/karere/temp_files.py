@@ -0,0 +1,123 @@
+"""
+Temporary file tracking for Karere application.
+
+Karere keeps its temporary files in a private per-process directory,
+created on first use and removed with a single rmtree at shutdown. Files
+that have to live elsewhere are registered individually. Cleanup never
+scans the system temp directory, so its cost does not depend on how many
+entries /tmp holds.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from typing import Optional, Set
+
+from .logging_config import get_logger
+
+
+TEMP_PREFIX = "karere_"
+
+
+class TempFileRegistry:
+    """
+    Registry of the temporary files and directories created by this process.
+    """
+
+    def __init__(self, prefix: str = TEMP_PREFIX, parent_dir: Optional[str] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            prefix: Name prefix of the private directory
+            parent_dir: Where to create the private directory; defaults to the system temp dir
+        """
+        self.prefix = prefix
+        self.parent_dir = parent_dir
+        self.logger = get_logger('temp_files')
+        self._lock = threading.Lock()
+        self._directory: Optional[str] = None
+        self._registered: Set[str] = set()
+
+    @property
+    def directory(self) -> str:
+        """The private temporary directory, created on first access."""
+        with self._lock:
+            if self._directory is None:
+                self._directory = tempfile.mkdtemp(prefix=self.prefix, dir=self.parent_dir)
+                self.logger.debug(f"Created private temporary directory {self._directory}")
+            return self._directory
+
+    def get_path(self, name: str) -> str:
+        """
+        Get a path for a file in the private directory.
+
+        Args:
+            name: File name
+
+        Returns:
+            Path inside the private directory; the file is not created
+        """
+        return os.path.join(self.directory, os.path.basename(name))
+
+    def create_file(self, suffix: str = "", prefix: str = "") -> str:
+        """
+        Create a new empty file in the private directory.
+
+        Returns:
+            Path of the created file
+        """
+        fd, path = tempfile.mkstemp(suffix=suffix, prefix=prefix, dir=self.directory)
+        os.close(fd)
+        return path
+
+    def register(self, path: str):
+        """Register a file or directory outside the private directory for cleanup."""
+        with self._lock:
+            self._registered.add(path)
+
+    def unregister(self, path: str):
+        """Stop tracking a path, e.g. after it was moved to its final place."""
+        with self._lock:
+            self._registered.discard(path)
+
+    def cleanup(self) -> int:
+        """
+        Remove the private directory and every registered path.
+
+        Returns:
+            Number of paths removed
+        """
+        with self._lock:
+            paths = list(self._registered)
+            if self._directory is not None:
+                paths.append(self._directory)
+            self._registered.clear()
+            self._directory = None
+
+        removed = 0
+        for path in paths:
+            try:
+                if os.path.isdir(path) and not os.path.islink(path):
+                    shutil.rmtree(path)
+                else:
+                    os.unlink(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                self.logger.warning(f"Could not remove temporary path {path}: {e}")
+        return removed
+
+
+# Global temporary file registry
+_temp_registry: Optional[TempFileRegistry] = None
+
+
+def get_temp_registry() -> TempFileRegistry:
+    """Get the global temporary file registry."""
+    global _temp_registry
+    if _temp_registry is None:
+        _temp_registry = TempFileRegistry()
+    return _temp_registry
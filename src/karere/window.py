@@ -4,6 +4,8 @@ Main window for Karere application.
 
 import gi
 import os
+import time
+import threading
 
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
@@ -14,6 +16,43 @@ from .settings import KarereSettingsDialog
 from .about import create_about_dialog
 from .logging_config import get_logger
 from ._build_config import should_enable_developer_tools
+from .reconnect_manager import ReconnectManager
+from .content_filter import ContentFilterManager
+from .link_router import LinkRouter
+from .endpoint import get_web_url, get_internal_domains
+from .download_manager import DownloadManager, DownloadJob
+from .filename_allocator import FilenameAllocator
+from .download_directory import DownloadDirectoryMonitor
+from .download_pipeline import DownloadPipeline
+from .download_journal import DownloadJournal
+from .download_resume import create_resumable_transfer
+from .metrics import get_metrics
+from .settings_service import get_settings
+from .spell_dictionaries import DictionaryCatalog, get_system_language
+from .power_mode import install_background_script, apply_background_mode
+from .accounts import DEFAULT_ACCOUNT_ID, load_accounts, new_account, remove_account_data, serialize_accounts
+from .resource_profiles import (
+    configure_network_process, create_web_context,
+    apply_to_web_context, apply_to_webview_settings
+)
+
+
+# Delay after the last geometry change before the window state is written
+WINDOW_STATE_SAVE_DELAY_MS = 500
+
+
+class AccountPage:
+    """The network session, WebView and tab of one WhatsApp account."""
+    
+    def __init__(self, account):
+        self.account = account
+        self.network_session = None
+        self.webview = None
+        self.tab_page = None
+        self.content_filter = None
+        self.reconnect_manager = None
+        self.load_started_at = None
+        self.background = False
 
 
 @Gtk.Template(resource_path='/io/github/tobagin/karere/window.ui')
@@ -23,6 +62,7 @@ class KarereWindow(Adw.ApplicationWindow):
     __gtype_name__ = 'KarereWindow'
     
     webview_container = Gtk.Template.Child()
+    tab_view = Gtk.Template.Child()
     
     def __init__(self, app):
         super().__init__(application=app)
@@ -33,7 +73,25 @@ class KarereWindow(Adw.ApplicationWindow):
         self.logger.info("KarereWindow initializing")
         
         # Initialize settings
-        self.settings = Gio.Settings.new("io.github.tobagin.karere")
+        self.settings = get_settings()
+        self.settings_dialog = None
+        self.dictionary_catalog = DictionaryCatalog()
+        self._applied_spell_checking = {}
+        self._spell_checking_missing = []
+        
+        # One tab per account, in the order of the accounts setting
+        self.accounts = load_accounts(self.settings)
+        self.account_pages = {}
+        
+        # Link routing rules are precompiled once and refreshed on change
+        self.web_url = get_web_url(self.settings)
+        self.link_router = LinkRouter(
+            internal_domains=get_internal_domains(self.web_url),
+            user_internal_domains=self.settings.get_strv("link-internal-domains"),
+            user_external_domains=self.settings.get_strv("link-external-domains")
+        )
+        self.settings.connect("changed::link-internal-domains", self._on_link_rules_changed)
+        self.settings.connect("changed::link-external-domains", self._on_link_rules_changed)
         
         # Set up actions and webview
         self._setup_actions()
@@ -46,6 +104,14 @@ class KarereWindow(Adw.ApplicationWindow):
         # Connect window focus events for background notification tracking
         self.connect("notify::is-active", self._on_window_focus_changed)
         
+        # Resource profiles apply live, without recreating the window
+        self.settings.connect("changed::resource-profile", self._on_resource_profile_changed)
+        
+        # Throttle accounts nobody is looking at; present() resumes them at once
+        self.connect("notify::visible", self._on_visibility_changed)
+        self.settings.connect("changed::background-power-mode", self._on_background_power_mode_changed)
+        self._update_background_mode()
+        
         self.logger.info("KarereWindow initialization complete")
     
     def _setup_actions(self):
@@ -60,98 +126,202 @@ class KarereWindow(Adw.ApplicationWindow):
         about_action = Gio.SimpleAction.new("about", None)
         about_action.connect("activate", self._on_about_action)
         self.app.add_action(about_action)
+        
+        # Add account action
+        add_account_action = Gio.SimpleAction.new("add-account", None)
+        add_account_action.connect("activate", self._on_add_account_action)
+        self.app.add_action(add_account_action)
+    
+    @property
+    def webview(self):
+        """WebView of the selected account."""
+        page = self.get_selected_account_page()
+        return page.webview if page else None
+    
+    def get_webviews(self):
+        """Get the WebViews of all accounts."""
+        return [page.webview for page in self.account_pages.values()]
     
     def _setup_webview(self):
-        """Set up the WebKit WebView with data manager for persistent cookies and error handling."""
-        self.logger.info("Setting up WebView")
+        """Set up the shared WebContext and one WebView tab per account."""
+        self.logger.info("Setting up WebViews")
+        resource_profile = self.settings.get_string("resource-profile")
         
+        # Memory-pressure limits must be configured before the first NetworkSession
+        configure_network_process(resource_profile)
+        
+        # All accounts share one WebContext, so they share its process pool,
+        # spell checker and cache model, and all their network sessions run
+        # in the single network process. Web processes stay per account,
+        # since WebKit ties each one to a single network session.
         try:
-            # Use XDG directories for Flatpak compatibility
-            data_dir = os.environ.get('XDG_DATA_HOME', os.path.expanduser('~/.local/share')) + '/karere'
-            cache_dir = os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')) + '/karere'
-            
-            # Ensure directories exist with proper error handling
-            try:
-                os.makedirs(data_dir, exist_ok=True)
-                os.makedirs(cache_dir, exist_ok=True)
-                self.logger.info(f"WebView data directory: {data_dir}")
-                self.logger.info(f"WebView cache directory: {cache_dir}")
-            except PermissionError as e:
-                self.logger.error(f"Permission denied creating directories: {e}")
-                self._show_error_dialog("Permission Error", 
-                                       "Cannot create data directories. Please check file permissions.")
-                return
-            except OSError as e:
-                self.logger.error(f"OS error creating directories: {e}")
-                self._show_error_dialog("File System Error", 
-                                       "Cannot create data directories. Please check disk space and permissions.")
-                return
-            
-            # Create WebsiteDataManager with data directories
-            try:
-                self.website_data_manager = WebKit.WebsiteDataManager(
-                    base_data_directory=data_dir,
-                    base_cache_directory=cache_dir
+            self.web_context = create_web_context(resource_profile)
+            self.logger.info(f"WebContext created (resource profile: {resource_profile})")
+        except Exception as e:
+            self.logger.error(f"Failed to create WebContext: {e}")
+            self._show_error_dialog("WebView Error", 
+                                   "Failed to create WebView. Please check your WebKit installation.")
+            return
+        
+        # Configure spell checking once for all accounts
+        self._setup_spell_checking()
+        
+        # Set up download handling, shared by all accounts
+        self.setup_download_directory()
+        self.filename_allocator = FilenameAllocator(self.downloads_dir)
+        
+        self.tab_view.connect("notify::selected-page", self._on_selected_page_changed)
+        self.tab_view.connect("close-page", self._on_close_page)
+        
+        for account in self.accounts:
+            self._add_account_page(account)
+        
+        if not self.account_pages:
+            return
+        
+        # Downloads start through the WebView of the account they came from; the
+        # default account, which cannot be removed, handles the rest
+        default_page = self.account_pages.get(DEFAULT_ACCOUNT_ID) or self.get_selected_account_page()
+        self.download_manager = DownloadManager(
+            default_page.webview,
+            max_concurrent=self.settings.get_int("max-concurrent-downloads"),
+            progress_callback=self._on_download_progress,
+            started_callback=self._on_download_started,
+            finished_callback=self._on_download_job_finished,
+            journal=DownloadJournal(),
+            resume_factory=self._create_resumable_transfer
+        )
+        self.settings.connect("changed::max-concurrent-downloads", self._on_max_concurrent_downloads_changed)
+        self.download_pipeline = DownloadPipeline(self._on_download_processed)
+        self.download_manager.resume_pending()
+        
+        # Content filter settings apply to every account
+        self.settings.connect("changed::content-filter-enabled", self._on_content_filter_setting_changed)
+        self.settings.connect("changed::block-media-previews", self._on_content_filter_setting_changed)
+    
+    def _add_account_page(self, account):
+        """
+        Create the network session and WebView of an account and add its tab.
+        
+        Args:
+            account: Account to add
+        
+        Returns:
+            The AccountPage, or None if the account could not be set up
+        """
+        page = AccountPage(account)
+        
+        # Use XDG directories for Flatpak compatibility
+        try:
+            os.makedirs(account.data_dir, exist_ok=True)
+            os.makedirs(account.cache_dir, exist_ok=True)
+            self.logger.info(f"WebView data directory for {account.id}: {account.data_dir}")
+            self.logger.info(f"WebView cache directory for {account.id}: {account.cache_dir}")
+        except PermissionError as e:
+            self.logger.error(f"Permission denied creating directories: {e}")
+            self._show_error_dialog("Permission Error", 
+                                   "Cannot create data directories. Please check file permissions.")
+            return None
+        except OSError as e:
+            self.logger.error(f"OS error creating directories: {e}")
+            self._show_error_dialog("File System Error", 
+                                   "Cannot create data directories. Please check disk space and permissions.")
+            return None
+        
+        # Each account has its own NetworkSession, so cookies and website data never mix.
+        # The default account keeps WebKit's default session, which holds the login
+        # made before multi-account support.
+        try:
+            if account.is_default:
+                page.network_session = WebKit.NetworkSession.get_default()
+            else:
+                page.network_session = WebKit.NetworkSession.new(
+                    data_directory=account.data_dir,
+                    cache_directory=account.cache_dir
                 )
-            except Exception as e:
-                self.logger.error(f"Failed to create WebsiteDataManager: {e}")
-                self._show_error_dialog("WebView Error", 
-                                       "Failed to initialize WebView data manager. Please check your WebKit installation.")
-                return
-            
-            # Create NetworkSession with the data manager
-            try:
-                self.network_session = WebKit.NetworkSession.new(data_directory=data_dir, cache_directory=cache_dir)
-            except Exception as e:
-                self.logger.error(f"Failed to create NetworkSession: {e}")
-                self._show_error_dialog("Network Error", 
-                                       "Failed to initialize network session. Please check your network configuration.")
-                return
-            
-            # Get the cookie manager from the network session
+        except Exception as e:
+            self.logger.error(f"Failed to create NetworkSession for {account.id}: {e}")
+            self._show_error_dialog("Network Error", 
+                                   "Failed to initialize network session. Please check your network configuration.")
+            return None
+        
+        # Configure cookie persistence; the default session keeps the cookie
+        # storage WebKit has always used for it
+        if not account.is_default:
             try:
-                self.cookie_manager = self.network_session.get_cookie_manager()
-                
-                # Configure cookie persistence
-                cookie_file = os.path.join(data_dir, 'cookies.sqlite')
-                self.cookie_manager.set_persistent_storage(cookie_file, WebKit.CookiePersistentStorage.SQLITE)
-                self.logger.info("Cookie persistence configured")
+                cookie_file = os.path.join(account.data_dir, 'cookies.sqlite')
+                page.network_session.get_cookie_manager().set_persistent_storage(
+                    cookie_file, WebKit.CookiePersistentStorage.SQLITE
+                )
+                self.logger.info(f"Cookie persistence configured for {account.id}")
             except Exception as e:
                 self.logger.error(f"Failed to configure cookie persistence: {e}")
                 self.logger.warning("Continuing without persistent cookies")
-            
-        except Exception as e:
-            self.logger.error(f"Critical error setting up WebView directories: {e}")
-            self._show_error_dialog("WebView Setup Error", 
-                                   "Failed to set up WebView. Please check your system configuration.")
         
         # Create WebView with error handling
         try:
-            self.webview = WebKit.WebView.new()
-            self.logger.info("WebView created")
+            page.webview = WebKit.WebView(web_context=self.web_context, network_session=page.network_session)
+            self.logger.info(f"WebView created for account {account.id}")
         except Exception as e:
             self.logger.error(f"Failed to create WebView: {e}")
             self._show_error_dialog("WebView Error", 
                                    "Failed to create WebView. Please check your WebKit installation.")
-            return
+            return None
+        
+        self._configure_webview_settings(page.webview)
+        
+        # Throttles animation frames while the account is in the background
+        install_background_script(page.webview)
         
-        # Configure WebView settings with error handling
+        # Block analytics and telemetry with a precompiled content filter
+        self._setup_content_filter(page)
+        
+        page.webview.set_vexpand(True)
+        page.webview.set_hexpand(True)
+        
+        # Set up native WebKit notification handling
+        page.webview.connect("permission-request", self._on_permission_request)
+        page.webview.connect("show-notification", self._on_show_notification, page)
+        page.webview.connect("decide-policy", self._on_decide_policy)
+        
+        # Set up WebView event handlers for error handling
+        self._setup_webview_error_handlers(page)
+        
+        page.tab_page = self.tab_view.append(page.webview)
+        page.tab_page.set_title(account.name)
+        self.account_pages[account.id] = page
+        
+        # Load WhatsApp Web with error handling
+        try:
+            page.webview.load_uri(self.web_url)
+            self.logger.info(f"Loading WhatsApp Web from {self.web_url} for account {account.id}")
+        except Exception as e:
+            self.logger.error(f"Failed to load WhatsApp Web: {e}")
+            self._show_error_dialog("Network Error", 
+                                   "Failed to load WhatsApp Web. Please check your internet connection.")
+        return page
+    
+    def _configure_webview_settings(self, webview):
+        """Configure the WebKit settings of an account's WebView."""
         try:
-            webkit_settings = self.webview.get_settings()
+            webkit_settings = webview.get_settings()
             webkit_settings.set_enable_javascript(True)
             webkit_settings.set_enable_media_stream(True)
             webkit_settings.set_enable_webgl(True)
-            webkit_settings.set_hardware_acceleration_policy(WebKit.HardwareAccelerationPolicy.ALWAYS)
+            
+            # A profile that cannot be applied must not skip the settings below
+            try:
+                apply_to_webview_settings(webkit_settings, self.settings.get_string("resource-profile"))
+            except Exception as e:
+                self.logger.error(f"Failed to apply resource profile: {e}")
             
             # Enable clipboard access for screenshot paste functionality
             webkit_settings.set_javascript_can_access_clipboard(True)
-            self.logger.info("Clipboard access enabled for screenshot paste")
             
             # Enable media capture and other permissions that might be needed for notifications
             webkit_settings.set_enable_media(True)
             webkit_settings.set_enable_media_capabilities(True)
             webkit_settings.set_auto_load_images(True)
-            self.logger.info("Additional WebKit permissions enabled")
             
             # Use default user agent for testing - custom user agent disabled
             # from .application import BUS_NAME
@@ -159,49 +329,189 @@ class KarereWindow(Adw.ApplicationWindow):
             # # WhatsApp Web detects the Chrome part, so replace it with our app name
             # user_agent = f"Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) {app_name}/120.0.0.0 Safari/537.36"
             # webkit_settings.set_user_agent(user_agent)
-            self.logger.info("Using default WebKit user agent for notification testing")
             
+            self._apply_developer_tools(webkit_settings)
             self.logger.info("WebView settings configured")
         except Exception as e:
             self.logger.error(f"Failed to configure WebView settings: {e}")
             self.logger.warning("Continuing with default WebView settings")
+    
+    def get_selected_account_page(self):
+        """Get the AccountPage of the selected tab."""
+        tab_page = self.tab_view.get_selected_page()
+        for page in self.account_pages.values():
+            if page.tab_page == tab_page:
+                return page
+        # Before the first tab is selected
+        return next(iter(self.account_pages.values()), None)
+    
+    def _get_account_page_for_webview(self, webview):
+        """Get the AccountPage owning a WebView."""
+        for page in self.account_pages.values():
+            if page.webview == webview:
+                return page
+        return None
+    
+    def _get_account_page_for_tab(self, tab_page):
+        """Get the AccountPage shown in a tab."""
+        for page in self.account_pages.values():
+            if page.tab_page == tab_page:
+                return page
+        return None
+    
+    def select_account(self, account_id):
+        """
+        Switch to the tab of an account.
         
-        # Configure spell checking after WebView is created
-        self._setup_spell_checking()
-        
-        # Native WebKit notification handling replaces JavaScript message handlers
-        # No script message handlers needed - using WebKit's native notification system
+        Args:
+            account_id: Id of the account to show
         
-        # Add WebView to container with expand properties
-        self.webview.set_vexpand(True)
-        self.webview.set_hexpand(True)
-        self.webview_container.append(self.webview)
+        Returns:
+            True if the account exists
+        """
+        page = self.account_pages.get(account_id)
+        if page is None:
+            self.logger.warning(f"Unknown account {account_id}")
+            return False
+        self.tab_view.set_selected_page(page.tab_page)
+        return True
+    
+    def _on_selected_page_changed(self, tab_view, pspec):
+        """Clear the attention marker of the tab the user switched to."""
+        tab_page = tab_view.get_selected_page()
+        if tab_page:
+            tab_page.set_needs_attention(False)
+        self._update_background_mode()
+    
+    def _on_visibility_changed(self, window, pspec):
+        """Switch power modes when the window is hidden or presented."""
+        self._update_background_mode()
+    
+    def _on_background_power_mode_changed(self, settings, key):
+        """Handle the background power saving setting."""
+        self._update_background_mode()
+    
+    def _update_background_mode(self):
+        """Put accounts nobody can see in background mode and resume the others."""
+        enabled = self.settings.get_boolean("background-power-mode")
+        visible = self.get_visible()
+        selected = self.tab_view.get_selected_page()
         
-        # Page load events handled by error handlers setup
+        for page in self.account_pages.values():
+            background = enabled and (not visible or page.tab_page != selected)
+            if background == page.background:
+                continue
+            try:
+                apply_background_mode(page.webview, background)
+                page.background = background
+                self.logger.debug(f"Account {page.account.id} "
+                                  f"{'entered' if background else 'left'} background mode")
+            except Exception as e:
+                self.logger.error(f"Failed to switch power mode of account {page.account.id}: {e}")
         
-        # Set up native WebKit notification handling
-        self.webview.connect("permission-request", self._on_permission_request)
-        self.webview.connect("show-notification", self._on_show_notification)
+        get_metrics().set_gauge("background_accounts",
+                                sum(1 for page in self.account_pages.values() if page.background))
         
-        # Set up download handling
-        self.setup_download_directory()
-        self.webview.connect("decide-policy", self._on_decide_policy)
+        health_service = getattr(self.app, 'health_service', None)
+        if health_service:
+            health_service.set_background(enabled and not visible)
+    
+    def _save_accounts(self):
+        """Store the account list in the settings."""
+        self.settings.set_value("accounts", GLib.Variant("a(ss)", serialize_accounts(self.accounts)))
+    
+    def _on_add_account_action(self, action, param):
+        """Add a new account in its own tab."""
+        try:
+            account = new_account(self.accounts)
+            page = self._add_account_page(account)
+            if page is None:
+                return
+            self.accounts.append(account)
+            self._save_accounts()
+            self.tab_view.set_selected_page(page.tab_page)
+            self.logger.info(f"Account {account.id} added")
+        except Exception as e:
+            self.logger.error(f"Failed to add account: {e}")
+    
+    def _on_close_page(self, tab_view, tab_page):
+        """Ask before removing the account of a closed tab."""
+        page = self._get_account_page_for_tab(tab_page)
+        if page is None or page.account.is_default:
+            # The default account owns the shared data directory and stays
+            tab_view.close_page_finish(tab_page, False)
+            return True
         
-        # Set up WebView event handlers for error handling
-        self._setup_webview_error_handlers()
+        dialog = Adw.MessageDialog.new(
+            self,
+            f"Remove {page.account.name}?",
+            "The account is logged out and its messages and media are deleted from this computer."
+        )
+        dialog.add_response("cancel", "Cancel")
+        dialog.add_response("remove", "Remove")
+        dialog.set_response_appearance("remove", Adw.ResponseAppearance.DESTRUCTIVE)
+        dialog.set_default_response("cancel")
+        dialog.set_close_response("cancel")
+        dialog.connect("response", self._on_remove_account_response, page)
+        dialog.present()
+        return True
+    
+    def _on_remove_account_response(self, dialog, response, page):
+        """Remove an account once the user confirmed."""
+        confirmed = response == "remove"
+        self.tab_view.close_page_finish(page.tab_page, confirmed)
+        if not confirmed:
+            return
         
-        # User agent override disabled for testing
-        # self._inject_user_agent_override()
-        self.logger.info("User agent override disabled for notification testing")
+        try:
+            self._cleanup_account_page(page)
+            del self.account_pages[page.account.id]
+            self.accounts = [account for account in self.accounts if account.id != page.account.id]
+            self._save_accounts()
+            
+            # Let the session drop its data before the directories go away
+            page.network_session.get_website_data_manager().clear(
+                WebKit.WebsiteDataTypes.ALL, 0, None, self._on_account_data_cleared, page
+            )
+            self.logger.info(f"Account {page.account.id} removed")
+        except Exception as e:
+            self.logger.error(f"Failed to remove account {page.account.id}: {e}")
+    
+    def _on_account_data_cleared(self, data_manager, result, page):
+        """Delete a removed account's directories once its session stopped using them."""
+        try:
+            data_manager.clear_finish(result)
+        except GLib.Error as e:
+            self.logger.warning(f"Failed to clear website data of account {page.account.id}: {e.message}")
         
-        # Load WhatsApp Web with error handling
+        # Deleting IndexedDB and caches can take a while
+        threading.Thread(target=remove_account_data, args=(page.account,),
+                         name="karere-remove-account", daemon=True).start()
+        page.network_session = None
+    
+    def _setup_content_filter(self, page):
+        """Set up the content filter of an account's WebView."""
         try:
-            self.webview.load_uri("https://web.whatsapp.com")
-            self.logger.info("Loading WhatsApp Web")
+            page.content_filter = ContentFilterManager(page.webview.get_user_content_manager())
+            self._apply_content_filter(page)
         except Exception as e:
-            self.logger.error(f"Failed to load WhatsApp Web: {e}")
-            self._show_error_dialog("Network Error", 
-                                   "Failed to load WhatsApp Web. Please check your internet connection.")
+            self.logger.error(f"Failed to set up content filter: {e}")
+    
+    def _apply_content_filter(self, page):
+        """Apply the current content filter settings to an account."""
+        page.content_filter.apply(
+            self.settings.get_boolean("content-filter-enabled"),
+            self.settings.get_boolean("block-media-previews")
+        )
+    
+    def _on_content_filter_setting_changed(self, settings, key):
+        """Handle content filter setting changes."""
+        try:
+            for page in self.account_pages.values():
+                if page.content_filter:
+                    self._apply_content_filter(page)
+        except Exception as e:
+            self.logger.error(f"Failed to update content filter: {e}")
     
     def _inject_user_agent_override(self):
         """Inject JavaScript to override user agent detection."""
@@ -242,90 +552,98 @@ class KarereWindow(Adw.ApplicationWindow):
         # user_content_manager.add_script(script)
         self.logger.info("User agent override method disabled for notification testing")
     
-    def _setup_webview_error_handlers(self):
-        """Set up WebView error handlers for production error handling."""
+    def _setup_webview_error_handlers(self, page):
+        """Set up an account's WebView error handlers for production error handling."""
         try:
+            # Reconnect automatically after network failures
+            page.reconnect_manager = ReconnectManager(
+                lambda: self._retry_load_whatsapp(page),
+                notify_callback=lambda title, message: self._on_connection_issue(title, message, page)
+            )
+            
             # Connect to load events for error handling
-            self.webview.connect("load-failed", self._on_load_failed)
-            self.webview.connect("load-changed", self._on_load_changed_with_error_handling)
+            page.webview.connect("load-failed", self._on_load_failed, page)
+            page.webview.connect("load-changed", self._on_load_changed_with_error_handling, page)
             
             # Connect to network error events
-            self.webview.connect("resource-load-started", self._on_resource_load_started)
+            page.webview.connect("resource-load-started", self._on_resource_load_started)
             
             self.logger.info("WebView error handlers configured")
         except Exception as e:
             self.logger.error(f"Failed to set up WebView error handlers: {e}")
     
-    def _on_load_failed(self, webview, load_event, failing_uri, error):
+    def _on_load_failed(self, webview, load_event, failing_uri, error, page):
         """Handle WebView load failures with automatic recovery."""
         self.logger.error(f"WebView load failed: {error.message} for URI: {failing_uri}")
         
-        # Initialize retry counter if not exists
-        if not hasattr(self, '_load_retry_count'):
-            self._load_retry_count = 0
+        classification = "fatal"
+        if page.reconnect_manager:
+            classification = page.reconnect_manager.on_load_failed(error)
         
-        # Attempt automatic recovery for network issues
-        if self._load_retry_count < 3 and ("network" in error.message.lower() or "connection" in error.message.lower()):
-            self._load_retry_count += 1
-            self.logger.info(f"Attempting automatic retry {self._load_retry_count}/3")
-            
-            # Wait a bit before retrying
-            GLib.timeout_add_seconds(5, self._retry_load_whatsapp)
-            
-            # Show a less intrusive message for automatic retries
-            if hasattr(self.app, 'send_notification'):
-                self.app.send_notification("Connection Issue", 
-                                         f"Network error occurred. Retrying... ({self._load_retry_count}/3)")
+        if classification == "ignore":
+            self.logger.debug("Load was cancelled, nothing to recover")
             return True
         
-        # Reset retry counter on success or after max retries
-        self._load_retry_count = 0
+        if classification == "retry":
+            # The reconnect manager reloads once the network is usable
+            return True
         
         # Show user-friendly error message based on error type
-        if "network" in error.message.lower() or "connection" in error.message.lower():
-            self._show_error_dialog("Network Error", 
-                                   "Cannot connect to WhatsApp Web. Please check your internet connection and try again.")
-        elif "ssl" in error.message.lower() or "certificate" in error.message.lower():
+        if error.domain == GLib.quark_to_string(Gio.tls_error_quark()):
             self._show_error_dialog("Security Error", 
                                    "SSL certificate error. Please check your system's date and time settings.")
-        elif "timeout" in error.message.lower():
-            self._show_error_dialog("Connection Timeout", 
-                                   "Connection to WhatsApp Web timed out. Please check your internet connection and try again.")
         else:
             self._show_error_dialog("Load Error", 
                                    f"Failed to load WhatsApp Web. Please try again later.")
         
         return True  # Prevent default error handling
     
-    def _retry_load_whatsapp(self):
-        """Retry loading WhatsApp Web."""
+    def _on_connection_issue(self, title, message, page):
+        """Notify the user once per outage that a reconnect is pending."""
+        if hasattr(self.app, 'send_notification'):
+            self.app.send_notification(self._get_notification_title(title, page), message,
+                                       account_id=page.account.id)
+    
+    def _retry_load_whatsapp(self, page):
+        """Retry loading WhatsApp Web in an account's WebView."""
         try:
-            if hasattr(self, 'webview') and self.webview:
-                self.logger.info("Retrying WhatsApp Web load")
-                self.webview.load_uri("https://web.whatsapp.com")
+            if page.webview:
+                self.logger.info(f"Retrying WhatsApp Web load for account {page.account.id}")
+                page.webview.load_uri(self.web_url)
         except Exception as e:
             self.logger.error(f"Error during retry: {e}")
         
         return False  # Don't repeat the timeout
     
-    def _on_load_changed_with_error_handling(self, webview, load_event):
+    def _on_load_changed_with_error_handling(self, webview, load_event, page):
         """Handle WebView load events with error handling."""
         try:
             if load_event == WebKit.LoadEvent.FINISHED:
+                if page.load_started_at is not None:
+                    get_metrics().record_timing("page_load", time.monotonic() - page.load_started_at)
+                    page.load_started_at = None
+                
                 self.logger.info("Page load finished - using native WebKit notifications")
                 # Native WebKit notification handling enabled via permission-request and show-notification signals
                 # JavaScript notification injection system removed for better reliability and performance
                 
                 # Inject debug script to monitor notification status
-                self._inject_notification_debug_script()
+                self._inject_notification_debug_script(webview)
+                
+                # A reloaded page starts in the foreground; throttle it again
+                if page.background:
+                    apply_background_mode(webview, True)
             elif load_event == WebKit.LoadEvent.STARTED:
                 self.logger.info("Page load started")
+                page.load_started_at = time.monotonic()
             elif load_event == WebKit.LoadEvent.COMMITTED:
                 self.logger.info("Page load committed")
+                if page.reconnect_manager:
+                    page.reconnect_manager.on_load_committed()
         except Exception as e:
             self.logger.error(f"Error handling load event: {e}")
     
-    def _inject_notification_debug_script(self):
+    def _inject_notification_debug_script(self, webview):
         """Inject debug script to monitor and enable notification permissions."""
         debug_script = """
         (function() {
@@ -394,7 +712,7 @@ class KarereWindow(Adw.ApplicationWindow):
         """
         
         try:
-            self.webview.evaluate_javascript(debug_script, -1, None, None, None, None, None)
+            webview.evaluate_javascript(debug_script, -1, None, None, None, None, None)
             self.logger.info("Notification debug script injected")
         except Exception as e:
             self.logger.error(f"Failed to inject notification debug script: {e}")
@@ -435,21 +753,34 @@ class KarereWindow(Adw.ApplicationWindow):
         theme = self.settings.get_string("theme")
         self._apply_theme(theme)
         
-        # Apply developer tools setting (with production hardening)
-        if hasattr(self, 'webview'):
-            webkit_settings = self.webview.get_settings()
-            
-            # Check if developer tools should be enabled
-            if should_enable_developer_tools():
-                # Development build - respect user setting
-                developer_tools_enabled = self.settings.get_boolean("developer-tools")
-                self.logger.info(f"Developer tools setting: {developer_tools_enabled} (development build)")
-            else:
-                # Production build - force disable
-                developer_tools_enabled = False
-                self.logger.info("Developer tools disabled (production build)")
-            
-            webkit_settings.set_enable_developer_extras(developer_tools_enabled)
+        # Developer tools are applied to each WebView as it is created
+    
+    def _apply_developer_tools(self, webkit_settings):
+        """Apply the developer tools setting (with production hardening) to WebView settings."""
+        # Check if developer tools should be enabled
+        if should_enable_developer_tools():
+            # Development build - respect user setting
+            developer_tools_enabled = self.settings.get_boolean("developer-tools")
+            self.logger.debug(f"Developer tools setting: {developer_tools_enabled} (development build)")
+        else:
+            # Production build - force disable
+            developer_tools_enabled = False
+            self.logger.debug("Developer tools disabled (production build)")
+        
+        webkit_settings.set_enable_developer_extras(developer_tools_enabled)
+    
+    def _on_resource_profile_changed(self, settings, key):
+        """Apply a new resource profile to the running WebViews."""
+        profile_name = settings.get_string(key)
+        try:
+            if getattr(self, 'web_context', None):
+                apply_to_web_context(self.web_context, profile_name)
+            for webview in self.get_webviews():
+                apply_to_webview_settings(webview.get_settings(), profile_name)
+            self.logger.info(f"Resource profile changed to {profile_name}; "
+                             "memory limits apply after restart")
+        except Exception as e:
+            self.logger.error(f"Failed to apply resource profile: {e}")
     
     def _apply_theme(self, theme):
         """Apply the selected theme."""
@@ -465,113 +796,121 @@ class KarereWindow(Adw.ApplicationWindow):
     def _setup_spell_checking(self):
         """Set up spell checking for the WebView."""
         try:
-            # Get the default WebContext (WebKitGTK 6.0 approach)
-            web_context = WebKit.WebContext.get_default()
+            # Spell checking is configured on the WebView's own context
+            web_context = self.web_context
             if web_context:
                 self._configure_spell_checking(web_context)
                 self.logger.info("Spell checking setup completed")
             else:
-                self.logger.warning("No default WebContext available for spell checking setup")
+                self.logger.warning("No WebContext available for spell checking setup")
         except Exception as e:
             self.logger.error(f"Failed to set up spell checking: {e}")
     
     def _configure_spell_checking(self, web_context):
-        """Configure spell checking settings on the WebContext."""
+        """
+        Bring the WebContext's spell checking in line with the settings.
+        
+        The desired state is compared with the state last applied to this
+        WebContext, and only the WebKit calls whose value changed are made.
+        Once the dictionaries are known the desired state is always applied,
+        so a list that resolves to nothing disables spell checking instead of
+        leaving the previous languages in place.
+        """
         try:
-            # Check if spell checking is enabled
-            spell_checking_enabled = self.settings.get_boolean("spell-checking-enabled")
-            self.logger.info(f"Configuring spell checking: enabled={spell_checking_enabled}")
+            enabled = self.settings.get_boolean("spell-checking-enabled")
+            languages = None
+            if enabled:
+                if self.dictionary_catalog.is_loaded:
+                    resolved, missing = self._get_spell_checking_languages()
+                    if missing != self._spell_checking_missing:
+                        self._spell_checking_missing = missing
+                        if missing:
+                            self.logger.warning(f"No dictionary installed for spell checking languages: {missing}")
+                    # Languages the catalog cannot match are passed through for enchant
+                    languages = tuple(resolved)
+                    if not languages:
+                        # Turn spell checking off rather than keep the previous languages
+                        self.logger.warning("No spell checking languages to use, disabling spell checking")
+                        enabled = False
+                else:
+                    # Languages are set once we know which dictionaries exist
+                    self.dictionary_catalog.load_async(self._on_dictionary_catalog_loaded, GLib.idle_add)
             
-            # Check current state first
-            try:
-                current_enabled = web_context.get_spell_checking_enabled()
-                self.logger.info(f"Current WebContext spell checking state: {current_enabled}")
-            except Exception as e:
-                self.logger.warning(f"Could not get current spell checking state: {e}")
+            applied = self._applied_spell_checking.setdefault(web_context, {"enabled": None, "languages": None})
             
-            # Enable or disable spell checking
-            try:
-                web_context.set_spell_checking_enabled(spell_checking_enabled)
-                self.logger.info(f"Called set_spell_checking_enabled({spell_checking_enabled})")
-                
-                # Verify it was set
-                new_state = web_context.get_spell_checking_enabled()
-                self.logger.info(f"Verified spell checking state after setting: {new_state}")
-            except Exception as e:
-                self.logger.error(f"Failed to set spell checking enabled: {e}")
-                return
+            if enabled != applied["enabled"]:
+                web_context.set_spell_checking_enabled(enabled)
+                applied["enabled"] = enabled
+                self.logger.info(f"Spell checking {'enabled' if enabled else 'disabled'}")
             
-            if spell_checking_enabled:
-                # Configure spell checking languages
-                languages = self._get_spell_checking_languages()
-                self.logger.info(f"Setting spell checking languages: {languages}")
-                
-                if languages:
-                    try:
-                        web_context.set_spell_checking_languages(languages)
-                        self.logger.info(f"Called set_spell_checking_languages({languages})")
-                        
-                        # Verify languages were set
-                        try:
-                            current_languages = web_context.get_spell_checking_languages()
-                            self.logger.info(f"Verified spell checking languages: {current_languages}")
-                        except Exception as e:
-                            self.logger.warning(f"Could not verify spell checking languages: {e}")
-                    except Exception as e:
-                        self.logger.error(f"Failed to set spell checking languages: {e}")
-                else:
-                    self.logger.warning("No spell checking languages configured")
+            if languages is not None and languages != applied["languages"]:
+                web_context.set_spell_checking_languages(list(languages))
+                applied["languages"] = languages
+                self.logger.info(f"Spell checking languages set to {list(languages)}")
+            
+            self.logger.debug("Spell checking configuration up to date")
         except Exception as e:
             self.logger.error(f"Failed to configure spell checking: {e}")
     
+    def _get_requested_spell_checking_languages(self):
+        """Get the languages the settings ask for, before validation."""
+        if self.settings.get_boolean("spell-checking-auto-detect"):
+            return [get_system_language()]
+        return self.settings.get_strv("spell-checking-languages") or [get_system_language()]
+    
     def _get_spell_checking_languages(self):
-        """Get the list of spell checking languages to use."""
+        """
+        Get the spell checking languages, matched to the installed dictionaries.
+        
+        Returns:
+            Tuple of (languages to use, requested languages without a dictionary)
+        """
+        requested = self._get_requested_spell_checking_languages()
         try:
-            auto_detect = self.settings.get_boolean("spell-checking-auto-detect")
-            
-            if auto_detect:
-                # Auto-detect from system locale
-                import locale
-                import os
-                
-                try:
-                    # Get the current locale
-                    current_locale = locale.getlocale()[0]
-                    if current_locale:
-                        return [current_locale]
-                    else:
-                        # Fallback to environment variables
-                        lang = os.environ.get('LANG', 'en_US.UTF-8')
-                        lang_code = lang.split('.')[0]  # Extract just the language part
-                        return [lang_code]
-                except Exception as e:
-                    self.logger.warning(f"Failed to auto-detect locale: {e}")
-                    return ['en_US']  # Fallback
-            else:
-                # Use custom languages from settings
-                languages = self.settings.get_strv("spell-checking-languages")
-                return languages if languages else ['en_US']  # Fallback
+            return self.dictionary_catalog.resolve(requested)
         except Exception as e:
             self.logger.error(f"Error getting spell checking languages: {e}")
-            return ['en_US']  # Fallback
+            return requested, []
+    
+    def get_spell_checking_status(self):
+        """
+        Get the spell checking languages for display.
+        
+        Returns:
+            Tuple of (languages in use, languages without a dictionary,
+            whether the dictionary catalog has loaded)
+        """
+        if not self.dictionary_catalog.is_loaded:
+            return self._get_requested_spell_checking_languages(), [], False
+        languages, missing = self._get_spell_checking_languages()
+        return languages, missing, True
+    
+    def _on_dictionary_catalog_loaded(self, languages):
+        """Configure spell checking once the installed dictionaries are known."""
+        self.logger.info(f"Spell checking dictionaries available: {sorted(languages)}")
+        self._update_spell_checking()
+        if self.settings_dialog is not None:
+            self.settings_dialog.refresh_spell_checking_languages()
+        return False
     
     def _update_spell_checking(self):
         """Update spell checking configuration (called from settings dialog)."""
         try:
-            # Get the default WebContext (WebKitGTK 6.0 approach)
-            web_context = WebKit.WebContext.get_default()
+            web_context = getattr(self, 'web_context', None)
             if web_context:
                 self._configure_spell_checking(web_context)
-                self.logger.info("Spell checking configuration updated")
+                self.logger.debug("Spell checking configuration updated")
             else:
-                self.logger.warning("No default WebContext available for spell checking update")
+                self.logger.warning("No WebContext available for spell checking update")
         except Exception as e:
             self.logger.error(f"Failed to update spell checking: {e}")
     
     def _on_settings_action(self, action, param):
         """Handle settings action."""
-        settings_dialog = KarereSettingsDialog(self)
-        settings_dialog.present(self)
+        # Built on first use and reused afterwards
+        if self.settings_dialog is None:
+            self.settings_dialog = KarereSettingsDialog(self)
+        self.settings_dialog.present_for(self)
     
     def _on_about_action(self, action, param):
         """Handle about action."""
@@ -610,66 +949,27 @@ class KarereWindow(Adw.ApplicationWindow):
             self.logger.error(f"Error handling window focus change: {e}")
 
     def setup_download_directory(self):
-        """Set up the downloads directory with comprehensive error handling."""
-        # List of preferred download directories in order of preference
-        preferred_dirs = [
-            os.path.join(os.path.expanduser('~'), 'Downloads'),
-            os.path.join(os.path.expanduser('~'), 'Desktop'),
-            os.path.expanduser('~'),
-            '/tmp'
-        ]
-        
-        for downloads_dir in preferred_dirs:
-            try:
-                # Check if directory exists
-                if not os.path.exists(downloads_dir):
-                    try:
-                        os.makedirs(downloads_dir, exist_ok=True)
-                        self.logger.info(f"Created downloads directory: {downloads_dir}")
-                    except PermissionError:
-                        self.logger.warning(f"Permission denied creating directory: {downloads_dir}")
-                        continue
-                    except OSError as e:
-                        self.logger.warning(f"OS error creating directory {downloads_dir}: {e}")
-                        continue
-                
-                # Check if directory is writable
-                if not os.access(downloads_dir, os.W_OK):
-                    self.logger.warning(f"Directory not writable: {downloads_dir}")
-                    continue
-                
-                # Check available disk space (at least 100MB)
-                try:
-                    statvfs = os.statvfs(downloads_dir)
-                    free_bytes = statvfs.f_frsize * statvfs.f_bavail
-                    if free_bytes < 100 * 1024 * 1024:  # 100MB
-                        self.logger.warning(f"Insufficient disk space in {downloads_dir}: {free_bytes} bytes")
-                        continue
-                except (OSError, AttributeError):
-                    # statvfs not available on some systems
-                    self.logger.debug(f"Could not check disk space for {downloads_dir}")
-                
-                # Directory is suitable
-                self.downloads_dir = downloads_dir
-                self.logger.info(f"Downloads directory set to: {self.downloads_dir}")
-                return
-                
-            except Exception as e:
-                self.logger.error(f"Error checking downloads directory {downloads_dir}: {e}")
-                continue
-        
-        # If we get here, no suitable directory was found
-        self.logger.error("No suitable downloads directory found")
-        self.downloads_dir = os.path.expanduser('~')  # Last resort
+        """Set up the downloads directory; its health is checked asynchronously."""
+        self.download_directory_monitor = DownloadDirectoryMonitor(
+            directory_changed_callback=self._on_downloads_directory_changed,
+            unavailable_callback=self._on_downloads_directory_unavailable
+        )
+        self.download_directory_monitor.start()
+        self.downloads_dir = self.download_directory_monitor.path
+        self.logger.info(f"Downloads directory candidate: {self.downloads_dir}")
+
+    def _on_downloads_directory_changed(self, path):
+        """Switch to a fallback downloads directory."""
+        self.downloads_dir = path
+        self.filename_allocator = FilenameAllocator(path)
+
+    def _on_downloads_directory_unavailable(self):
+        """Warn that no suitable downloads directory was found."""
         self._show_error_dialog("Download Directory Error", 
                                "Could not find a suitable downloads directory. Downloads may not work properly.")
 
     def _on_decide_policy(self, webview, decision, decision_type):
         """Handle policy decisions including downloads and navigation."""
-        from gi.repository import WebKit
-        
-        
-        
         # Check if this is a navigation decision (link click)
         if decision_type == WebKit.PolicyDecisionType.NAVIGATION_ACTION:
             pass  # Handle navigation actions
@@ -732,8 +1032,6 @@ class KarereWindow(Adw.ApplicationWindow):
     
     def _on_permission_request(self, webview, request):
         """Handle WebKit permission requests, including notification permissions."""
-        from gi.repository import WebKit
-        
         try:
             self.logger.info(f"Permission request received: {type(request)}")
             
@@ -752,9 +1050,17 @@ class KarereWindow(Adw.ApplicationWindow):
             self.logger.error(f"Error handling permission request: {e}")
             return False
     
-    def _on_show_notification(self, webview, notification):
+    def _get_notification_title(self, title, page):
+        """Prefix a notification title with the account name when there are several accounts."""
+        if len(self.account_pages) > 1:
+            return f"{page.account.name}: {title}"
+        return title
+    
+    def _on_show_notification(self, webview, notification, page):
         """Handle native WebKit notifications from WhatsApp Web."""
         self.logger.info("WEBKIT SHOW-NOTIFICATION SIGNAL TRIGGERED!")
+        received_at = time.monotonic()
+        get_metrics().increment("notifications_received")
         
         try:
             # Extract notification data from WebKitNotification
@@ -770,20 +1076,26 @@ class KarereWindow(Adw.ApplicationWindow):
                 self.logger.info("Calling app.send_notification...")
                 try:
                     self.app.send_notification(
-                        title,
+                        self._get_notification_title(title, page),
                         body,
                         notification_type="web_notification",
                         notification_id=notification_id,
-                        tag=tag
+                        tag=tag,
+                        account_id=page.account.id
                     )
+                    get_metrics().record_timing("notification_dispatch", time.monotonic() - received_at)
                     self.logger.info("Successfully called app.send_notification")
                 except Exception as send_error:
                     self.logger.error(f"Error in app.send_notification: {send_error}")
             else:
                 self.logger.error("app.send_notification method not available!")
                 
+            # Mark the account's tab unless the user is looking at it
+            if page.tab_page and page.tab_page != self.tab_view.get_selected_page():
+                page.tab_page.set_needs_attention(True)
+            
             # Handle notification click by connecting to the clicked signal
-            notification.connect("clicked", self._on_notification_clicked)
+            notification.connect("clicked", self._on_notification_clicked, page)
             notification.connect("closed", self._on_notification_closed)
             
             self.logger.info("WebKit notification handler completed successfully")
@@ -795,10 +1107,11 @@ class KarereWindow(Adw.ApplicationWindow):
             self.logger.error(f"Traceback: {traceback.format_exc()}")
             return False  # Let WebKit handle it
     
-    def _on_notification_clicked(self, notification):
+    def _on_notification_clicked(self, notification, page):
         """Handle when a web notification is clicked."""
         try:
-            # Focus the window when notification is clicked
+            # Focus the window on the account the notification came from
+            self.select_account(page.account.id)
             self.present()
             self.logger.info("Notification clicked - focusing window")
         except Exception as e:
@@ -811,46 +1124,17 @@ class KarereWindow(Adw.ApplicationWindow):
         except Exception as e:
             self.logger.error(f"Error handling notification close: {e}")
     
+    def _on_link_rules_changed(self, settings, key):
+        """Recompile link routing rules when the user changes them."""
+        self.link_router.set_user_rules(
+            settings.get_strv("link-internal-domains"),
+            settings.get_strv("link-external-domains")
+        )
+        self.logger.info("Link routing rules updated")
+    
     def _should_open_externally(self, uri):
         """Determine if a URI should be opened in the external browser."""
-        if not uri:
-            return False
-        
-        
-        # Parse the URI to check domain
-        try:
-            from urllib.parse import urlparse
-            parsed = urlparse(uri)
-            domain = parsed.netloc.lower()
-            scheme = parsed.scheme.lower()
-            
-            
-            # Always handle internal schemes internally
-            if scheme in ['data', 'blob', 'javascript', 'about']:
-                return False
-            
-            # WhatsApp domains that should stay internal
-            whatsapp_domains = [
-                'web.whatsapp.com',
-                'whatsapp.com',
-                'www.whatsapp.com',
-                'static.whatsapp.net',
-                'pps.whatsapp.net'
-            ]
-            
-            # If it's a WhatsApp domain, allow internal navigation
-            if any(domain == wd or domain.endswith('.' + wd) for wd in whatsapp_domains):
-                return False
-            
-            # If there's no domain (relative URLs), keep internal
-            if not domain:
-                return False
-            
-            # Only open external domains in browser
-            return True
-            
-        except Exception as e:
-            return False
+        return self.link_router.should_open_externally(uri)
     
     def _open_external_link(self, uri):
         """Open a URI in the system's default browser using Flatpak portal."""
@@ -890,6 +1174,14 @@ class KarereWindow(Adw.ApplicationWindow):
         except Exception as e:
             self.logger.error(f"Failed to open external link {user_data}: {e}")
     
+    def _create_resumable_transfer(self, job, progress_callback, done_callback):
+        """Resume a journaled download with the cookies of the account it came from."""
+        page = self.account_pages.get(job.account_id or DEFAULT_ACCOUNT_ID)
+        if page is None:
+            raise RuntimeError(f"account {job.account_id} no longer exists")
+        return create_resumable_transfer(job, progress_callback, done_callback,
+                                         cookie_manager=page.network_session.get_cookie_manager())
+    
     def _handle_download(self, webview, decision, response):
         """Handle download requests from WhatsApp Web with comprehensive error handling."""
         try:
@@ -926,79 +1218,34 @@ class KarereWindow(Adw.ApplicationWindow):
                 decision.ignore()
                 return True
             
-            # Check if downloads directory is writable
-            if not os.access(self.downloads_dir, os.W_OK):
-                self.logger.error(f"Downloads directory not writable: {self.downloads_dir}")
-                self._show_error_dialog("Download Error", 
-                                       "Downloads directory is not writable. Please check permissions.")
+            # Check the downloads directory from the cached health state
+            directory_error = self.download_directory_monitor.check_for_download()
+            if directory_error:
+                self.logger.error(f"Downloads directory unusable: {directory_error}")
+                self._show_error_dialog("Download Error", directory_error)
                 decision.ignore()
                 return True
             
-            # Check available disk space (at least 10MB for safety)
+            # Reserve a unique filename
             try:
-                statvfs = os.statvfs(self.downloads_dir)
-                free_bytes = statvfs.f_frsize * statvfs.f_bavail
-                if free_bytes < 10 * 1024 * 1024:  # 10MB
-                    self.logger.error(f"Insufficient disk space: {free_bytes} bytes")
-                    self._show_error_dialog("Download Error", 
-                                           "Insufficient disk space for download. Please free up space and try again.")
-                    decision.ignore()
-                    return True
-            except (OSError, AttributeError):
-                # statvfs not available on some systems
-                self.logger.debug("Could not check disk space for download")
-            
-            # Ensure unique filename
-            counter = 1
-            base_name, ext = os.path.splitext(suggested_filename)
-            file_path = os.path.join(self.downloads_dir, suggested_filename)
-            
-            while os.path.exists(file_path):
-                new_filename = f"{base_name}_{counter}{ext}"
-                file_path = os.path.join(self.downloads_dir, new_filename)
-                counter += 1
-                
-                # Prevent infinite loop
-                if counter > 1000:
-                    self.logger.error("Too many files with similar names")
-                    self._show_error_dialog("Download Error", 
-                                           "Too many files with similar names. Please clean up downloads directory.")
-                    decision.ignore()
-                    return True
-            
-            # Start the download manually
+                file_path = self.filename_allocator.allocate(suggested_filename)
+            except OSError as e:
+                self.logger.error(f"Could not reserve download file for {suggested_filename}: {e}")
+                self._show_error_dialog("Download Error", 
+                                       "Could not create the download file. Please check the downloads directory.")
+                decision.ignore()
+                return True
+            
+            # Queue the download; it starts once a download slot is free
             try:
-                from gi.repository import WebKit
-                download = webview.download_uri(uri)
-                if download:
-                    try:
-                        download.set_destination(file_path)
-                        
-                        # Connect to download completion
-                        download.connect("finished", self._on_download_finished)
-                        download.connect("failed", self._on_download_failed)
-                        
-                        # Send notification about download start
-                        if hasattr(self.app, 'send_notification'):
-                            self.app.send_notification(
-                                "Download Started",
-                                f"Starting download: {os.path.basename(file_path)}"
-                            )
-                        
-                        self.logger.info(f"Download started: {file_path}")
-                        
-                    except Exception as e:
-                        self.logger.error(f"Error setting up download: {e}")
-                        self._show_error_dialog("Download Error", 
-                                               "Failed to set up download. Please try again.")
-                else:
-                    self.logger.error("Failed to create download object")
-                    self._show_error_dialog("Download Error", 
-                                           "Failed to start download. Please try again.")
+                page = self._get_account_page_for_webview(webview)
+                self.download_manager.enqueue(uri, file_path, webview=webview,
+                                              account_id=page.account.id if page else None)
             except Exception as e:
-                self.logger.error(f"Error starting download: {e}")
+                self.filename_allocator.release(file_path)
+                self.logger.error(f"Error queueing download: {e}")
                 self._show_error_dialog("Download Error", 
-                                       "Failed to start download. Please check your network connection.")
+                                       "Failed to start download. Please try again.")
             
             # Prevent the default action
             decision.ignore()
@@ -1011,46 +1258,82 @@ class KarereWindow(Adw.ApplicationWindow):
             decision.ignore()
             return True
 
-    def _on_download_finished(self, download):
-        """Handle completed downloads."""
-        try:
-            destination = download.get_destination()
-            if destination:
-                from urllib.parse import urlparse
-                parsed = urlparse(destination)
-                filename = os.path.basename(parsed.path)
-                
-                
-                # Send completion notification
-                if hasattr(self.app, 'send_notification'):
-                    self.app.send_notification(
-                        "Download Complete",
-                        f"Downloaded: {filename}"
-                    )
-                    
-        except Exception as e:
-            self.logger.error(f"Error handling download completion: {e}")
+    def _on_download_started(self, job):
+        """Notify when a queued download starts transferring."""
+        if hasattr(self.app, 'send_notification'):
+            self.app.send_notification(
+                "Download Started",
+                f"Starting download: {job.filename}"
+            )
+
+    def _on_download_progress(self, job):
+        """Handle throttled download progress updates."""
+        eta = f"{job.eta_seconds:.0f}s" if job.eta_seconds is not None else "unknown"
+        self.logger.debug(f"Download {job.filename}: {job.fraction:.0%} at "
+                          f"{job.bytes_per_second / 1024:.0f} KiB/s, ETA {eta}")
 
-    def _on_download_failed(self, download, error):
-        """Handle failed downloads."""
+    def _on_download_job_finished(self, job):
+        """Handle completed and failed downloads."""
         try:
-            destination = download.get_destination()
-            filename = "file"
-            if destination:
-                from urllib.parse import urlparse
-                parsed = urlparse(destination)
-                filename = os.path.basename(parsed.path)
+            if job.state == DownloadJob.COMPLETED:
+                self.filename_allocator.record(job.destination)
+            elif job.state == DownloadJob.FAILED:
+                self.filename_allocator.release(job.destination)
+            else:
+                # Cancelled on shutdown: keep the reservation for resuming
+                return
             
+            if job.state == DownloadJob.COMPLETED and self.settings.get_boolean("download-post-processing"):
+                # The completion notification is sent once processing is done
+                self.download_pipeline.submit(
+                    job.destination,
+                    strip_metadata=self.settings.get_boolean("strip-image-metadata"),
+                    sort_mode=self.settings.get_string("download-sort-mode"),
+                    dedup_mode=self.settings.get_string("download-dedup-mode")
+                )
+                return
             
-            # Send failure notification
-            if hasattr(self.app, 'send_notification'):
+            if not hasattr(self.app, 'send_notification'):
+                return
+            
+            if job.state == DownloadJob.COMPLETED:
+                self.app.send_notification(
+                    "Download Complete",
+                    f"Downloaded: {job.filename}"
+                )
+            elif job.state == DownloadJob.FAILED:
                 self.app.send_notification(
                     "Download Failed",
-                    f"Failed to download: {filename}"
+                    f"Failed to download: {job.filename}"
                 )
                 
         except Exception as e:
-            self.logger.error(f"Error handling download failure: {e}")
+            self.logger.error(f"Error handling download completion: {e}")
+
+    def _on_download_processed(self, result):
+        """Notify about a download once post-processing has finished."""
+        try:
+            if not hasattr(self.app, 'send_notification'):
+                return
+            
+            if result["dropped"]:
+                # Point at the copy that was already on disk
+                message = f"Already downloaded: {result['path']}"
+            else:
+                message = f"Downloaded: {os.path.basename(result['path'])}"
+            
+            self.app.send_notification(
+                "Download Complete",
+                message,
+                icon_file=result["thumbnail"]
+            )
+            
+        except Exception as e:
+            self.logger.error(f"Error handling processed download: {e}")
+
+    def _on_max_concurrent_downloads_changed(self, settings, key):
+        """Apply a new concurrent download limit."""
+        self.download_manager.set_max_concurrent(settings.get_int(key))
     
     def restore_window_state(self):
         """Restore window state from settings."""
@@ -1085,109 +1368,142 @@ class KarereWindow(Adw.ApplicationWindow):
                 self.maximize()
                 self.logger.info("Window maximized state restored")
             
+            # Persist later changes as they happen, not only at shutdown
+            self._window_state_source_id = None
+            for prop in ("default-width", "default-height", "maximized"):
+                self.connect(f"notify::{prop}", self._on_window_geometry_changed)
+            
         except Exception as e:
             self.logger.error(f"Failed to restore window state: {e}")
     
+    def _on_window_geometry_changed(self, window, param):
+        """Schedule a window state save once resizing settles."""
+        if self._window_state_source_id:
+            GLib.source_remove(self._window_state_source_id)
+        self._window_state_source_id = GLib.timeout_add(
+            WINDOW_STATE_SAVE_DELAY_MS, self._on_window_state_save_timeout
+        )
+    
+    def _on_window_state_save_timeout(self):
+        self._window_state_source_id = None
+        self._write_window_state()
+        return False
+    
+    def flush_window_state(self):
+        """Write a pending window state change immediately."""
+        source_id = getattr(self, '_window_state_source_id', None)
+        if source_id:
+            GLib.source_remove(source_id)
+            self._window_state_source_id = None
+        self._write_window_state()
+    
+    def _write_window_state(self):
+        """Write changed window geometry in a single settings transaction."""
+        try:
+            is_maximized = self.is_maximized()
+            values = {"window-maximized": GLib.Variant("b", is_maximized)}
+            if not is_maximized:
+                # Keep the unmaximized size so un-maximizing after a restart works
+                width, height = self.get_default_size()
+                if width > 0 and height > 0:
+                    values["window-width"] = GLib.Variant("i", width)
+                    values["window-height"] = GLib.Variant("i", height)
+            
+            changed = {key: value for key, value in values.items()
+                       if not self.settings.get_value(key).equal(value)}
+            if not changed:
+                return
+            
+            # Batch the keys so they reach dconf as one write
+            self.settings.hold()
+            try:
+                for key, value in changed.items():
+                    self.settings.set_value(key, value)
+            finally:
+                self.settings.release()
+            self.logger.debug(f"Window state saved: {', '.join(changed)}")
+            
+        except Exception as e:
+            self.logger.error(f"Failed to save window state: {e}")
+    
     def cleanup_webview(self):
-        """Clean up WebView resources."""
+        """Clean up the WebView resources of all accounts."""
         try:
-            if hasattr(self, 'webview') and self.webview:
+            if self.account_pages:
                 self.logger.info("Cleaning up WebView resources")
                 
-                # Stop any ongoing loads
-                self.webview.stop_loading()
-                
-                # Clear any pending JavaScript operations
-                try:
-                    if hasattr(self.webview, 'evaluate_javascript'):
-                        self.webview.evaluate_javascript("window.stop();", -1, None, None, None, None, None)
-                    elif hasattr(self.webview, 'run_javascript'):
-                        self.webview.run_javascript("window.stop();", None, None, None)
-                    else:
-                        self.logger.debug("No JavaScript execution method available")
-                except Exception as e:
-                    self.logger.debug(f"JavaScript cleanup failed: {e}")
-                
-                # Disconnect signal handlers
-                self._disconnect_webview_signals()
-                
-                # Clean up website data manager
-                if hasattr(self, 'website_data_manager') and self.website_data_manager:
-                    self._cleanup_website_data_manager()
-                
-                # Clean up network session
-                if hasattr(self, 'network_session') and self.network_session:
-                    self._cleanup_network_session()
+                for page in self.account_pages.values():
+                    self._cleanup_account_page(page)
                 
                 self.logger.info("WebView cleanup completed")
                 
         except Exception as e:
             self.logger.error(f"Failed to clean up WebView: {e}")
     
-    def _disconnect_webview_signals(self):
-        """Disconnect WebView signal handlers."""
+    def _cleanup_account_page(self, page):
+        """Stop an account's WebView and release its network session."""
         try:
-            if hasattr(self, 'webview') and self.webview:
-                self.logger.debug("Disconnecting WebView signals")
-                
-                # Disconnect all signal handlers
-                self.webview.disconnect_by_func(self._on_load_changed)
-                self.webview.disconnect_by_func(self._on_decide_policy)
+            # Stop reconnect attempts before stopping loads
+            if page.reconnect_manager:
+                page.reconnect_manager.shutdown()
+            
+            if page.webview:
+                # Stop any ongoing loads
+                page.webview.stop_loading()
                 
-                # Disconnect other signal handlers if they exist
-                if hasattr(self, '_on_load_failed'):
-                    self.webview.disconnect_by_func(self._on_load_failed)
+                # Clear any pending JavaScript operations
+                try:
+                    page.webview.evaluate_javascript("window.stop();", -1, None, None, None, None, None)
+                except Exception as e:
+                    self.logger.debug(f"JavaScript cleanup failed: {e}")
                 
-                self.logger.debug("WebView signals disconnected")
+                # Disconnect signal handlers
+                self._disconnect_webview_signals(page.webview)
+            
+            # Clean up network session
+            if page.network_session:
+                self._cleanup_network_session(page)
                 
         except Exception as e:
-            self.logger.error(f"Failed to disconnect WebView signals: {e}")
+            self.logger.error(f"Failed to clean up account {page.account.id}: {e}")
     
-    def _cleanup_website_data_manager(self):
-        """Clean up website data manager."""
-        try:
-            if hasattr(self, 'website_data_manager') and self.website_data_manager:
-                self.logger.debug("Cleaning up website data manager")
-                
-                # Clear any cached data if needed
-                # Note: Be careful not to clear persistent data like cookies
-                # unless explicitly requested by the user
-                
-                self.logger.debug("Website data manager cleanup completed")
-                
-        except Exception as e:
-            self.logger.error(f"Failed to clean up website data manager: {e}")
+    def _disconnect_webview_signals(self, webview):
+        """Disconnect WebView signal handlers."""
+        self.logger.debug("Disconnecting WebView signals")
+        for handler in (self._on_load_changed_with_error_handling, self._on_load_failed,
+                        self._on_decide_policy, self._on_show_notification,
+                        self._on_permission_request, self._on_resource_load_started):
+            try:
+                webview.disconnect_by_func(handler)
+            except Exception as e:
+                self.logger.debug(f"Could not disconnect {handler.__name__}: {e}")
+        self.logger.debug("WebView signals disconnected")
     
-    def _cleanup_network_session(self):
-        """Clean up network session."""
+    def _cleanup_network_session(self, page):
+        """Clean up an account's network session."""
         try:
-            if hasattr(self, 'network_session') and self.network_session:
-                self.logger.debug("Cleaning up network session")
-                
-                # Clean up any pending network operations
-                # Note: NetworkSession cleanup is mostly handled by WebKit
-                
-                self.logger.debug("Network session cleanup completed")
+            self.logger.debug(f"Cleaning up network session of account {page.account.id}")
+            
+            # Clean up any pending network operations
+            # Note: NetworkSession cleanup is mostly handled by WebKit
+            
+            self.logger.debug("Network session cleanup completed")
                 
         except Exception as e:
             self.logger.error(f"Failed to clean up network session: {e}")
     
     def cleanup_downloads(self):
-        """Clean up any active downloads."""
+        """Cancel queued and active downloads."""
         try:
-            if hasattr(self, 'active_downloads') and self.active_downloads:
+            if getattr(self, 'download_manager', None):
                 self.logger.info("Cleaning up active downloads")
-                
-                # Cancel any active downloads
-                for download in self.active_downloads:
-                    try:
-                        download.cancel()
-                        self.logger.debug(f"Cancelled download: {download.get_destination()}")
-                    except Exception as e:
-                        self.logger.warning(f"Failed to cancel download: {e}")
-                
-                self.active_downloads.clear()
-                self.logger.info("Active downloads cleanup completed")
+                self.download_manager.cancel_all()
+            
+            if getattr(self, 'download_pipeline', None):
+                self.download_pipeline.shutdown()
+            
+            if getattr(self, 'download_directory_monitor', None):
+                self.download_directory_monitor.stop()
                 
         except Exception as e:
             self.logger.error(f"Failed to clean up downloads: {e}")